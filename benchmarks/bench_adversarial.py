@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cooklang_parser import CooklangParser  # noqa: E402
+from cooklang_parser.hardened import Limits  # noqa: E402
+from cooklang_parser.quantity import parse_duration, parse_quantity  # noqa: E402
+
+# Lines built from a repeated fragment, between a head and a tail, that
+# never completes a match. Each size doubles the line; with a linear scanner
+# the time per byte stays flat, with a backtracking one it doubles too. The
+# spaced amounts are single components whose quantity or duration only
+# fails to parse at its end, which is what normalize_quantities and
+# timer_seconds see.
+FAMILIES = {
+    "unclosed ingredients": ("", "@a{ ", ""),
+    "unclosed timers": ("", "~{", ""),
+    "unclosed images": ("", "![", ""),
+    "open conditions": ("", "If @a{} is b, ", ""),
+    "block comments": ("", "[--]", ""),
+    "spaced quantities": ("@a{1", " ", "x!}"),
+    "spaced durations": ("~{1", " ", "x!}"),
+}
+OPTIONS = {"normalize_quantities": True, "timer_seconds": True}
+
+
+def clear_caches():
+    # Parsed quantities and durations are cached; every run parses afresh.
+    parse_quantity.cache_clear()
+    parse_duration.cache_clear()
+
+
+def measure(parser, text, repeat):
+    best = min(
+        timeit.repeat(
+            lambda: parser.parse_recipe(text),
+            setup=clear_caches,
+            number=1,
+            repeat=repeat,
+        )
+    )
+    return best / len(text.encode("utf-8")) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parse time per byte on adversarial recipe text"
+    )
+    parser.add_argument("--sizes", type=int, default=5, help="number of doublings")
+    parser.add_argument("--start", type=int, default=1024, help="first size in bytes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--engines", default="extractors,lexer,hardened", help="comma-separated"
+    )
+    parser.add_argument(
+        "--options",
+        action="store_true",
+        help="also measure each engine with normalize_quantities and timer_seconds",
+    )
+    args = parser.parse_args()
+
+    engines = {}
+    for engine in args.engines.split(","):
+        settings = {"engine": engine}
+        if engine == "hardened":
+            # No limits, so the scanner itself is measured on every size.
+            settings["limits"] = Limits(None, None, None)
+        engines[engine] = CooklangParser(**settings)
+        if args.options:
+            engines[f"{engine}, options"] = CooklangParser(**settings, **OPTIONS)
+
+    sizes = [args.start << shift for shift in range(args.sizes)]
+    print(f"{'ns/byte':44}" + "".join(f"{size:>10}" for size in sizes))
+    for family, (head, fragment, tail) in FAMILIES.items():
+        # The line is not the last one, so conditions need a closing ".".
+        texts = [
+            head + fragment * (size // len(fragment)) + tail + "\nServe.\n"
+            for size in sizes
+        ]
+        for engine, cooklang in engines.items():
+            row = [measure(cooklang, text, args.repeat) for text in texts]
+            label = f"{family} ({engine})"
+            print(f"{label:44}" + "".join(f"{value:10.1f}" for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import PROFILES, generate_corpus  # noqa: E402
+from cooklang_parser import CooklangParser, binary  # noqa: E402
+
+
+def measure(function, items, repeat):
+    best = min(
+        timeit.repeat(lambda: [function(item) for item in items], number=1, repeat=repeat)
+    )
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Size and speed of the binary format against json"
+    )
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="medium")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cooklang = CooklangParser()
+    recipes = [
+        cooklang.parse_recipe(text)
+        for text in generate_corpus(args.profile, args.count, args.seed)
+    ]
+    encoded = {
+        "json": [json.dumps(recipe).encode("utf-8") for recipe in recipes],
+        "binary": [binary.dumps(recipe) for recipe in recipes],
+    }
+    dump = {
+        "json": lambda recipe: json.dumps(recipe).encode("utf-8"),
+        "binary": binary.dumps,
+    }
+    load = {"json": json.loads, "binary": binary.loads}
+
+    print(f"{args.count} {args.profile} recipes")
+    for name in ("json", "binary"):
+        size = sum(map(len, encoded[name])) / len(recipes)
+        dump_time = measure(dump[name], recipes, args.repeat)
+        load_time = measure(load[name], encoded[name], args.repeat)
+        print(
+            f"{name:8} {size:10.0f} bytes/recipe "
+            f"{dump_time:8.1f} us dump {load_time:8.1f} us load"
+        )
+    metadata = measure(
+        lambda data: binary.loads(data, sections=("metadata",)),
+        encoded["binary"],
+        args.repeat,
+    )
+    print(f"binary metadata only {metadata:8.1f} us load")
+
+
+if __name__ == "__main__":
+    main()
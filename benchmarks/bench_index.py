@@ -0,0 +1,100 @@
+import argparse
+import os
+import random
+import sys
+import timeit
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cooklang_parser.index import RecipeIndex  # noqa: E402
+from cooklang_parser.indexfile import IndexReader, write_index  # noqa: E402
+
+# Synthetic parse results with Zipf-distributed ingredient names, so a few
+# staples are in most recipes and most names in very few, as in real
+# corpora. Parsing is not measured; see bench_suite.py for that.
+
+
+def generate_recipes(count, vocabulary, seed):
+    rng = random.Random(seed)
+    names = [f"ingredient {rank}" for rank in range(vocabulary)]
+    weights = list(accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    units = ["g", "ml", "cup", None]
+    cookware = ["pot", "pan", "bowl", "oven", "whisk", "baking sheet", "wok"]
+    for _ in range(count):
+        chosen = set(rng.choices(names, cum_weights=weights, k=rng.randint(3, 15)))
+        yield {
+            "ingredients": [
+                {"name": name, "quantity": "1", "unit": rng.choice(units)}
+                for name in chosen
+            ],
+            "cookware": rng.sample(cookware, rng.randint(0, 3)),
+        }
+
+
+def measure(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query time of RecipeIndex")
+    parser.add_argument("--count", type=int, default=300000)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--pantry", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--file", help="also write an index file here and query it through mmap"
+    )
+    args = parser.parse_args()
+
+    start = timeit.default_timer()
+    index = RecipeIndex()
+    for recipe in generate_recipes(args.count, args.vocabulary, args.seed):
+        index.add(recipe)
+    print(f"build: {timeit.default_timer() - start:.1f} s for {args.count} recipes")
+
+    rng = random.Random(args.seed)
+    pantry = [f"ingredient {rank}" for rank in range(args.pantry // 2)]
+    pantry += [
+        f"ingredient {rng.randrange(args.vocabulary)}" for _ in range(args.pantry // 2)
+    ]
+    queries = {
+        "superset (2 names)": lambda: index.superset(pantry[:2]),
+        "subset": lambda: index.subset(pantry),
+        "subset, missing 1": lambda: index.subset(pantry, missing=1),
+        "subset, missing 2": lambda: index.subset(pantry, missing=2),
+        "subset with cookware": lambda: index.subset(pantry, 1, ["pot", "pan"]),
+    }
+    for label, query in queries.items():
+        matches = len(query())
+        print(f"{label:24}{measure(query, args.repeat):8.2f} ms {matches:8} recipes")
+    recipe = index.add({"ingredients": [{"name": "ingredient 0"}]})
+    index.remove(recipe)
+    label = "subset after an update"
+    print(f"{label:24}{measure(queries['subset'], 1):8.2f} ms")
+
+    if args.file:
+        recipes = generate_recipes(args.count, args.vocabulary, args.seed)
+        write_index(args.file, enumerate(recipes))
+        size = os.path.getsize(args.file) / 1e6
+        start = timeit.default_timer()
+        reader = IndexReader(args.file)
+        opened = (timeit.default_timer() - start) * 1e3
+        print(f"index file: {size:.1f} MB, opened in {opened:.2f} ms")
+        with reader:
+            start = timeit.default_timer()
+            reader.subset(pantry)
+            first = (timeit.default_timer() - start) * 1e3
+            print(f"{'first subset (cold)':24}{first:8.2f} ms")
+            for label, query in {
+                "superset (2 names)": lambda: reader.superset(pantry[:2]),
+                "subset": lambda: reader.subset(pantry),
+                "subset, missing 1": lambda: reader.subset(pantry, missing=1),
+                "recipe(12345)": lambda: reader.recipe(12345 % len(reader)),
+            }.items():
+                print(f"{label:24}{measure(query, args.repeat):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
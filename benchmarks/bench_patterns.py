@@ -0,0 +1,62 @@
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cooklang_parser import CooklangParser  # noqa: E402
+
+RECIPE = """
+-- This is a hearty breakfast recipe
+>> source: https://example.com
+>> servings: 4
+Poke holes in @potatoes{2} with a fork.
+Place @bacon strips{500%g} on a baking sheet and glaze with @maple syrup{1/2%tbsp}.
+Slowly add @milk{1%litre} [- TODO check units -], keep mixing until smooth.
+Place the potatoes into a #pot and bring to a boil in a #large pan{}.
+If @eggs{} is cooked, skip the next step.
+Use @butter{50g} (or @margarine{50g}) for frying.
+Boil @eggs{2} for ~eggs{3%minutes}. ![Breakfast](images/breakfast.jpg)
+"""
+
+
+def measure(parser, text, number, repeat, purge):
+    if purge:
+
+        def run():
+            re.purge()
+            parser.parse_recipe(text)
+
+    else:
+
+        def run():
+            parser.parse_recipe(text)
+
+    best = min(timeit.repeat(run, number=number, repeat=repeat))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-recipe latency of CooklangParser.parse_recipe"
+    )
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--lines", type=int, default=1)
+    args = parser.parse_args()
+
+    text = RECIPE * args.lines
+    cooklang = CooklangParser()
+    warm = measure(cooklang, text, args.number, args.repeat, purge=False)
+    # re.purge() empties the re module cache before every parse, as happens
+    # when other code in a long-running worker evicts our patterns.
+    cold = measure(cooklang, text, args.number, args.repeat, purge=True)
+    print(f"recipe size:         {len(text)} bytes")
+    print(f"warm re cache:       {warm:8.1f} us/recipe")
+    print(f"evicted re cache:    {cold:8.1f} us/recipe")
+
+
+if __name__ == "__main__":
+    main()
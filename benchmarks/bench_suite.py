@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import PROFILES, generate_corpus  # noqa: E402
+from cooklang_parser import CooklangParser  # noqa: E402
+
+# Recipes per profile at --scale 1, sized so each profile takes well under a
+# second per pass.
+COUNTS = {
+    "small": 400,
+    "medium": 60,
+    "huge": 3,
+    "dense": 60,
+    "comments": 20,
+    "adversarial": 10,
+}
+
+# Extractors run on the raw text (comments) or on the comment-free text, as
+# in parse_recipe.
+RAW_EXTRACTORS = ["extract_comments", "remove_comments"]
+EXTRACTORS = [
+    "extract_metadata",
+    "extract_ingredients",
+    "extract_cookware",
+    "extract_steps",
+    "extract_timers",
+    "extract_conditions",
+    "extract_ingredient_substitutions",
+    "extract_images",
+]
+
+
+def best_time(function, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            function(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(function, texts):
+    tracemalloc.start()
+    try:
+        results = [function(text) for text in texts]
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del results
+    return peak
+
+
+def run_profile(profile, count, seed, repeat, engines):
+    texts = generate_corpus(profile, count, seed)
+    size = sum(len(text.encode("utf-8")) for text in texts)
+    results = {}
+
+    for engine in engines:
+        parser = CooklangParser(engine=engine)
+        seconds = best_time(parser.parse_recipe, texts, repeat)
+        results[f"{profile}/{engine}/parse_recipe"] = {
+            "seconds": seconds,
+            "recipes_per_s": count / seconds,
+            "mb_per_s": size / seconds / 1e6,
+            "peak_kib": peak_memory(parser.parse_recipe, texts) / 1024,
+        }
+
+    if "extractors" in engines:
+        parser = CooklangParser()
+        cleaned = [parser.remove_comments(text) for text in texts]
+        for name in RAW_EXTRACTORS + EXTRACTORS:
+            inputs = texts if name in RAW_EXTRACTORS else cleaned
+            seconds = best_time(getattr(parser, name), inputs, repeat)
+            results[f"{profile}/extractors/{name}"] = {
+                "seconds": seconds,
+                "mb_per_s": size / seconds / 1e6,
+            }
+
+    return {"recipes": count, "bytes": size}, results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, entry in sorted(results.items()):
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        ratio = entry["seconds"] / previous["seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(
+            f"{key:55} {previous['seconds'] * 1e3:10.2f} ms "
+            f"-> {entry['seconds'] * 1e3:10.2f} ms  x{ratio:5.2f}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Timings, throughput and peak memory on synthetic corpora"
+    )
+    parser.add_argument(
+        "--profiles", nargs="+", choices=sorted(PROFILES), default=list(COUNTS)
+    )
+    parser.add_argument("--engines", nargs="+", default=["extractors", "lexer"])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="slowdown ratio above which --compare reports a regression",
+    )
+    args = parser.parse_args()
+
+    corpora = {}
+    results = {}
+    for profile in args.profiles:
+        count = max(1, int(COUNTS[profile] * args.scale))
+        corpora[profile], profile_results = run_profile(
+            profile, count, args.seed, args.repeat, args.engines
+        )
+        results.update(profile_results)
+
+    for key, entry in results.items():
+        line = f"{key:55} {entry['seconds'] * 1e3:10.2f} ms {entry['mb_per_s']:8.2f} MB/s"
+        if "recipes_per_s" in entry:
+            line += f" {entry['recipes_per_s']:10.0f} recipes/s"
+            line += f" {entry['peak_kib']:10.0f} KiB peak"
+        print(line)
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "corpora": corpora,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        print()
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
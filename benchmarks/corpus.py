@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The generator lives with the tests, which check the engines against it;
+# this module writes its corpora out as .cook files.
+from cooklang_parser.tests.corpus import PROFILES, generate_corpus  # noqa: E402
+
+
+def write_corpus(texts, directory, prefix="recipe"):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index, text in enumerate(texts):
+        path = os.path.join(directory, f"{prefix}-{index:05d}.cook")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic .cook corpus")
+    parser.add_argument("directory")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="medium")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = generate_corpus(args.profile, args.count, args.seed)
+    paths = write_corpus(texts, args.directory, args.profile)
+    size = sum(map(len, texts))
+    print(f"wrote {len(paths)} recipes ({size} bytes) to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
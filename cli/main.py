@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import sys
+from fractions import Fraction
+
+# The parser package is imported only after the arguments are parsed, so
+# --help and usage errors return without loading it, and recipes are
+# serialized as they come back from the workers.
+
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(
+        prog="cooklang", description="Parse Cooklang recipes into JSON."
+    )
+    parser.add_argument(
+        "paths", nargs="+", help=".cook files or directories to search for them"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["json", "jsonl"],
+        default="json",
+        help="one JSON document (default) or one JSON object per line",
+    )
+    parser.add_argument("-o", "--output", help="write to this file instead of stdout")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes; 0 uses one per CPU (default: 1)",
+    )
+    parser.add_argument("--chunksize", type=int, default=32)
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="write recipes as they finish instead of in input order",
+    )
+    parser.add_argument(
+        "--engine", choices=["extractors", "lexer", "hardened"], default="extractors"
+    )
+    parser.add_argument(
+        "--sections", help="comma-separated sections to extract, e.g. metadata,ingredients"
+    )
+    parser.add_argument(
+        "--normalize",
+        action="store_true",
+        help="add numeric amounts in grams or millilitres to ingredients",
+    )
+    parser.add_argument(
+        "--structured-steps",
+        action="store_true",
+        help="group steps by paragraph, with the positions of their ingredients",
+    )
+    parser.add_argument(
+        "--timer-seconds",
+        action="store_true",
+        help="add durations in seconds to timers and total timer time per recipe",
+    )
+    parser.add_argument("--indent", type=int, help="indent JSON output")
+    parser.add_argument("--encoding", default="utf-8")
+    return parser
+
+
+def expand_paths(paths):
+    from cooklang_parser.files import iter_cook_files
+
+    for path in paths:
+        if os.path.isdir(path):
+            yield from iter_cook_files(path)
+        else:
+            yield path
+
+
+def to_json(recipe):
+    # Normalized amounts and timer durations are Quantity tuples of
+    # Fractions, which json would write as bare arrays of strings. They
+    # become {"min", "max", "unit"} objects, with whole numbers as ints and
+    # the others as exact "n/d" strings.
+    from cooklang_parser.quantity import Quantity
+
+    def number(value):
+        if value.denominator == 1:
+            return value.numerator
+        return f"{value.numerator}/{value.denominator}"
+
+    def convert(value):
+        kind = type(value)
+        if kind is Quantity:
+            return {
+                "min": convert(value.value),
+                "max": convert(value.maximum),
+                "unit": value.unit,
+            }
+        if kind is Fraction:
+            return number(value)
+        if kind is dict:
+            return {key: convert(item) for key, item in value.items()}
+        if kind is list or kind is tuple:
+            return [convert(item) for item in value]
+        return value
+
+    return convert(recipe)
+
+
+def parse_paths(parser, paths, args):
+    sections = None
+    if args.sections:
+        sections = [section.strip() for section in args.sections.split(",")]
+
+    def parse(text):
+        return parser.parse_recipe(text, sections)
+
+    workers = args.workers or None
+    if workers == 1:
+        for path in paths:
+            try:
+                with open(path, encoding=args.encoding) as recipe_file:
+                    yield path, parse(recipe_file.read()), None
+            except Exception as error:
+                yield path, None, error
+        return
+
+    # Files are read as parse_many pulls them; read errors are kept aside
+    # and reported in place of the empty text sent for that file.
+    in_flight = {}
+    read_errors = {}
+
+    def texts():
+        for index, path in enumerate(paths):
+            in_flight[index] = path
+            try:
+                with open(path, encoding=args.encoding) as recipe_file:
+                    yield recipe_file.read()
+            except (OSError, UnicodeDecodeError) as error:
+                read_errors[index] = error
+                yield ""
+
+    results = parser.parse_many(
+        texts(), workers, args.chunksize, ordered=not args.unordered
+    )
+    for result in results:
+        path = in_flight.pop(result.index)
+        error = read_errors.pop(result.index, result.error)
+        yield path, None if error else result.recipe, error
+
+
+def write_json(results, output, indent, single):
+    errors = 0
+    if single:
+        path, recipe, error = next(results)
+        if error is not None:
+            print(f"{path}: {error}", file=sys.stderr)
+            return 1
+        output.write(json.dumps(recipe, indent=indent) + "\n")
+        return 0
+
+    output.write("{")
+    separator = "\n" if indent is None else "\n" + " " * indent
+    first = True
+    for path, recipe, error in results:
+        if error is not None:
+            print(f"{path}: {error}", file=sys.stderr)
+            errors += 1
+            continue
+        value = json.dumps(recipe, indent=indent)
+        if indent is not None:
+            value = value.replace("\n", separator)
+        output.write(("" if first else ",") + separator + json.dumps(path) + ": " + value)
+        output.flush()
+        first = False
+    output.write("\n}\n")
+    return 1 if errors else 0
+
+
+def write_jsonl(results, output):
+    errors = 0
+    for path, recipe, error in results:
+        if error is None:
+            record = {"path": path, "recipe": recipe}
+        else:
+            record = {"path": path, "error": f"{type(error).__name__}: {error}"}
+            errors += 1
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    args = build_argument_parser().parse_args(argv)
+    if args.workers < 0:
+        print("cooklang: --workers must not be negative", file=sys.stderr)
+        return 2
+    if args.chunksize < 1:
+        print("cooklang: --chunksize must be positive", file=sys.stderr)
+        return 2
+
+    from cooklang_parser.parser import SECTION_NAMES, CooklangParser
+
+    if args.sections:
+        unknown = {section.strip() for section in args.sections.split(",")}
+        unknown -= SECTION_NAMES
+        if unknown:
+            names = ", ".join(sorted(unknown))
+            print(f"cooklang: unknown sections: {names}", file=sys.stderr)
+            return 2
+
+    parser = CooklangParser(
+        engine=args.engine,
+        normalize_quantities=args.normalize,
+        structured_steps=args.structured_steps,
+        timer_seconds=args.timer_seconds,
+    )
+    single = len(args.paths) == 1 and not os.path.isdir(args.paths[0])
+    results = parse_paths(parser, expand_paths(args.paths), args)
+    if args.normalize or args.timer_seconds:
+        results = (
+            (path, None if recipe is None else to_json(recipe), error)
+            for path, recipe, error in results
+        )
+
+    output = sys.stdout
+    if args.output:
+        output = open(args.output, "w", encoding="utf-8")
+    try:
+        if args.format == "jsonl":
+            return write_jsonl(results, output)
+        return write_json(results, output, args.indent, single)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def cli():
+    sys.exit(main())
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,3 +1,19 @@
+from cooklang_parser.batch import BatchResult
+from cooklang_parser.cache import ParseCache, shared_cache
+from cooklang_parser.hardened import LimitExceeded, Limits
+from cooklang_parser.lazy import ParsedRecipe
+from cooklang_parser.model import Recipe
 from cooklang_parser.parser import CooklangParser
+from cooklang_parser.profiling import ParseProfile
 
-__all__ = ["CooklangParser"]
+__all__ = [
+    "BatchResult",
+    "CooklangParser",
+    "LimitExceeded",
+    "Limits",
+    "ParseCache",
+    "ParseProfile",
+    "ParsedRecipe",
+    "Recipe",
+    "shared_cache",
+]
@@ -0,0 +1,149 @@
+import asyncio
+import codecs
+import os
+from collections import deque
+from itertools import islice
+
+from .files import iter_cook_files
+from .parser import CooklangParser
+
+# Parsing is CPU-bound, so every parse runs in an executor: by default a
+# process pool owned by the AsyncParser, which keeps the event loop and its
+# thread free of parser work. A semaphore bounds the parses submitted at
+# any time; callers beyond the limit wait on it instead of queueing work in
+# the executor, and directory iteration only starts new parses as results
+# are consumed.
+
+READ_SIZE = 65536
+LIST_BATCH = 256
+
+
+class AsyncParser:
+    def __init__(self, parser=None, executor=None, workers=None, limit=None):
+        self.parser = parser if parser is not None else CooklangParser()
+        self.workers = workers or os.cpu_count() or 1
+        self.limit = limit or self.workers * 2
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(self.workers)
+        return self._executor
+
+    def close(self):
+        # Blocks until the pool's running parses finish; from a coroutine
+        # use aclose, which waits in the loop's default thread pool instead.
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def aclose(self):
+        if self._owns_executor and self._executor is not None:
+            executor, self._executor = self._executor, None
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, executor.shutdown)
+
+    async def _run(self, function, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, function, *args)
+
+    async def parse_recipe(self, text, sections=None):
+        return await self._run(self.parser.parse_recipe, text, sections)
+
+    async def parse_file(self, path, encoding="utf-8"):
+        # The file is read by the executor as well, not on the event loop.
+        return await self._run(self.parser.parse_file, path, encoding)
+
+    async def parse_stream(self, stream, encoding="utf-8", max_bytes=None):
+        limits = self.parser.limits
+        if max_bytes is None and limits is not None:
+            # Stop reading as soon as the hardened engine would reject it.
+            max_bytes = limits.max_bytes
+        text = await read_stream(stream, encoding, max_bytes)
+        return await self.parse_recipe(text)
+
+    async def parse_directory(self, root, encoding="utf-8", ordered=True):
+        loop = asyncio.get_running_loop()
+        paths = iter_cook_files(root)
+        pending = deque()
+
+        async def parse(path):
+            return path, await self.parse_file(path, encoding)
+
+        async def next_done():
+            if ordered:
+                return [await pending.popleft()]
+            done, waiting = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            pending.clear()
+            pending.extend(waiting)
+            return [task.result() for task in done]
+
+        try:
+            while True:
+                # Listing the directory is blocking I/O too, so it is done in
+                # batches in the loop's default thread pool.
+                batch = await loop.run_in_executor(
+                    None, list, islice(paths, LIST_BATCH)
+                )
+                if not batch:
+                    break
+                for path in batch:
+                    pending.append(asyncio.ensure_future(parse(path)))
+                    while len(pending) >= self.limit:
+                        for result in await next_done():
+                            yield result
+            while pending:
+                for result in await next_done():
+                    yield result
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+async def read_stream(stream, encoding="utf-8", max_bytes=None):
+    # Accepts an object with a read(n) coroutine, such as asyncio.StreamReader,
+    # or any async iterable of bytes chunks.
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parts = []
+    size = 0
+    if hasattr(stream, "read"):
+
+        async def chunks():
+            while True:
+                chunk = await stream.read(READ_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+        source = chunks()
+    else:
+        source = stream
+    async for chunk in source:
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            raise ValueError(f"Recipe exceeds {max_bytes} bytes")
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+async def aparse_recipe(text, parser=None, executor=None, sections=None):
+    parser = parser if parser is not None else CooklangParser()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, parser.parse_recipe, text, sections)
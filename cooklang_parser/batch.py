@@ -0,0 +1,91 @@
+import copy
+import os
+from collections import deque, namedtuple
+from itertools import islice
+
+BatchResult = namedtuple("BatchResult", ["index", "recipe", "error"])
+
+_worker_parser = None
+
+
+def _init_worker(parser):
+    global _worker_parser
+    _worker_parser = parser
+    if parser.profiler is not None:
+        # The parent keeps what it has recorded so far; workers only send
+        # back what they record themselves.
+        parser.profiler.clear()
+
+
+def _parse_one(parser, index, text):
+    try:
+        return BatchResult(index, parser.parse_recipe(text), None)
+    except Exception as error:
+        return BatchResult(index, None, error)
+
+
+def _parse_chunk(chunk):
+    results = [_parse_one(_worker_parser, index, text) for index, text in chunk]
+    profiler = _worker_parser.profiler
+    if profiler is None:
+        return results, None
+    recorded = copy.deepcopy(profiler)
+    profiler.clear()
+    return results, recorded
+
+
+def _collect(parser, future):
+    results, recorded = future.result()
+    if recorded is not None:
+        parser.profiler.merge(recorded)
+    return results
+
+
+def _chunks(texts, chunksize):
+    items = enumerate(texts)
+    while True:
+        chunk = list(islice(items, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_many(parser, texts, workers=None, chunksize=32, ordered=True):
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for index, text in enumerate(texts):
+            yield _parse_one(parser, index, text)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    # Only a few chunks per worker are in flight at a time, so the input
+    # iterable is consumed lazily and memory stays bounded.
+    limit = workers * 4
+    chunks = _chunks(texts, chunksize)
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(parser,)
+    ) as executor:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_parse_chunk, chunk))
+                if len(pending) >= limit:
+                    yield from _collect(parser, pending.popleft())
+            while pending:
+                yield from _collect(parser, pending.popleft())
+        else:
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(_parse_chunk, chunk))
+                if len(pending) >= limit:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from _collect(parser, future)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from _collect(parser, future)
@@ -0,0 +1,504 @@
+import json
+import struct
+import sys
+from array import array
+from fractions import Fraction
+
+from .quantity import Quantity
+
+# Binary encoding of parse_recipe results.
+#
+# A stream starts with MAGIC and a format version byte and is followed by
+# records, each prefixed with its length as a little-endian u32. A record is
+#
+#     flags (u8), string table size (u32), integer stream size (u32),
+#     string table, integer stream
+#
+# The string table holds every distinct string of the recipe once, joined
+# with NUL (or as a JSON array when a string contains NUL). Index 0 stands
+# for None, so strings are numbered from 1. An empty blob is either no
+# strings or the one string "", which the STRINGS flag tells apart. The
+# integer stream is an array of u8, u16 or u32 (the narrowest that fits),
+# stored little-endian.
+#
+# Recipes with the shape parse_recipe produces are written section by
+# section with fixed fields, so dict keys are never stored. Anything else,
+# such as the extra fields of normalize_quantities, falls back to a tagged
+# encoding of the whole record.
+
+MAGIC = b"CKLB"
+VERSION = 2
+HEADER = MAGIC + bytes([VERSION])
+
+RECORD_HEADER = struct.Struct("<BII")
+LENGTH = struct.Struct("<I")
+
+GENERIC = 1
+JSON_TABLE = 2
+STRINGS = 4
+WIDTH_SHIFT = 3
+TYPECODES = ("B", "H", "I" if array("I").itemsize == 4 else "L")
+
+SECTIONS = (
+    "metadata",
+    "ingredients",
+    "cookware",
+    "steps",
+    "timers",
+    "conditions",
+    "substitutions",
+    "comments",
+    "images",
+)
+SECTION_CODES = {name: code for code, name in enumerate(SECTIONS)}
+(
+    METADATA,
+    INGREDIENTS,
+    COOKWARE,
+    STEPS,
+    TIMERS,
+    CONDITIONS,
+    SUBSTITUTIONS,
+    COMMENTS,
+    IMAGES,
+) = range(len(SECTIONS))
+
+TEXT, INGREDIENT, COOKWARE_STEP, TIMER, UNNAMED_TIMER, NOTE = range(6)
+STEP_SHAPES = {
+    ("type", "value"): TEXT,
+    ("type", "name", "quantity", "unit"): INGREDIENT,
+    ("type", "name"): COOKWARE_STEP,
+    ("type", "name", "duration"): TIMER,
+    ("type", "duration"): UNNAMED_TIMER,
+}
+STEP_TYPES = {
+    TEXT: "text",
+    INGREDIENT: "ingredient",
+    COOKWARE_STEP: "cookware",
+    TIMER: "timer",
+    UNNAMED_TIMER: "timer",
+    NOTE: "note",
+}
+INGREDIENT_KEYS = ("name", "quantity", "unit")
+CONDITION_KEYS = ("ingredient", "condition", "action")
+SUBSTITUTION_KEYS = ("primary", "substitute")
+COMMENT_KEYS = ("type", "name")
+IMAGE_KEYS = ("description", "path")
+
+# Tags of the generic encoding.
+T_STR, T_LIST, T_TUPLE, T_DICT, T_INT, T_BIGINT, T_TRUE, T_FALSE = range(8)
+T_FRACTION, T_QUANTITY, T_FLOAT = range(8, 11)
+SMALL_INT = 1 << 31
+
+
+class _NotSchema(Exception):
+    pass
+
+
+class _Encoder:
+    def __init__(self):
+        self.strings = {}
+        self.table = []
+        self.ints = []
+
+    def string(self, value):
+        if value is None:
+            return 0
+        if type(value) is not str:
+            raise _NotSchema
+        index = self.strings.get(value)
+        if index is None:
+            self.table.append(value)
+            index = self.strings[value] = len(self.table)
+        return index
+
+    def strings_of(self, item, keys):
+        if type(item) is not dict or tuple(item) != keys:
+            raise _NotSchema
+        self.ints.extend(self.string(item[key]) for key in keys)
+
+    def schema(self, recipe):
+        ints = self.ints
+        if type(recipe) is not dict:
+            raise _NotSchema
+        ints.append(len(recipe))
+        for name, value in recipe.items():
+            code = SECTION_CODES.get(name)
+            if code is None or type(value) is not (dict if code == METADATA else list):
+                raise _NotSchema
+            ints.append(code)
+            ints.append(len(value))
+            if code == METADATA:
+                for key, item in value.items():
+                    ints.append(self.string(key))
+                    ints.append(self.string(item))
+            elif code == INGREDIENTS:
+                for item in value:
+                    self.strings_of(item, INGREDIENT_KEYS)
+            elif code == COOKWARE:
+                ints.extend(self.string(item) for item in value)
+            elif code == STEPS:
+                for item in value:
+                    self.step(item)
+            elif code == TIMERS:
+                for item in value:
+                    if type(item) is not tuple or len(item) != 2:
+                        raise _NotSchema
+                    ints.append(self.string(item[0]))
+                    ints.append(self.string(item[1]))
+            elif code == CONDITIONS:
+                for item in value:
+                    self.strings_of(item, CONDITION_KEYS)
+            elif code == SUBSTITUTIONS:
+                for item in value:
+                    if type(item) is not dict or tuple(item) != SUBSTITUTION_KEYS:
+                        raise _NotSchema
+                    self.strings_of(item["primary"], INGREDIENT_KEYS)
+                    self.strings_of(item["substitute"], INGREDIENT_KEYS)
+            elif code == COMMENTS:
+                for item in value:
+                    if type(item) is not dict or tuple(item) != COMMENT_KEYS:
+                        raise _NotSchema
+                    if item["type"] != "comment":
+                        raise _NotSchema
+                    ints.append(self.string(item["name"]))
+            else:
+                for item in value:
+                    self.strings_of(item, IMAGE_KEYS)
+
+    def step(self, item):
+        if type(item) is not dict:
+            raise _NotSchema
+        keys = tuple(item)
+        kind = STEP_SHAPES.get(keys)
+        if kind == COOKWARE_STEP and item["type"] == "note":
+            kind = NOTE
+        if kind is None or STEP_TYPES[kind] != item["type"]:
+            raise _NotSchema
+        self.ints.append(kind)
+        self.ints.extend(self.string(item[key]) for key in keys[1:])
+
+    def generic(self, value):
+        ints = self.ints
+        kind = type(value)
+        if value is None or kind is str:
+            ints.append(T_STR)
+            ints.append(self.string(value))
+        elif kind is bool:
+            ints.append(T_TRUE if value else T_FALSE)
+        elif kind is int:
+            if -SMALL_INT <= value < SMALL_INT:
+                ints.append(T_INT)
+                ints.append(value << 1 if value >= 0 else (-value << 1) - 1)
+            else:
+                ints.append(T_BIGINT)
+                ints.append(self.string(str(value)))
+        elif kind is float:
+            ints.append(T_FLOAT)
+            ints.append(self.string(repr(value)))
+        elif kind is Fraction:
+            ints.append(T_FRACTION)
+            self.generic(value.numerator)
+            self.generic(value.denominator)
+        elif kind is Quantity:
+            ints.append(T_QUANTITY)
+            for item in value:
+                self.generic(item)
+        elif kind is dict:
+            ints.append(T_DICT)
+            ints.append(len(value))
+            for key, item in value.items():
+                self.generic(key)
+                self.generic(item)
+        elif kind is list or kind is tuple:
+            ints.append(T_LIST if kind is list else T_TUPLE)
+            ints.append(len(value))
+            for item in value:
+                self.generic(item)
+        else:
+            raise TypeError(f"Cannot encode {kind.__name__} values")
+
+
+def encode_record(recipe):
+    encoder = _Encoder()
+    flags = 0
+    try:
+        encoder.schema(recipe)
+    except _NotSchema:
+        encoder = _Encoder()
+        encoder.generic(recipe)
+        flags |= GENERIC
+
+    table = encoder.table
+    blob = "\0".join(table)
+    if blob.count("\0") != max(len(table) - 1, 0):
+        blob = json.dumps(table, ensure_ascii=False)
+        flags |= JSON_TABLE
+    blob = blob.encode("utf-8")
+    if table:
+        flags |= STRINGS
+
+    largest = max(encoder.ints, default=0)
+    width = 0 if largest < 1 << 8 else 1 if largest < 1 << 16 else 2
+    ints = array(TYPECODES[width], encoder.ints)
+    if sys.byteorder == "big":
+        ints.byteswap()
+    ints = ints.tobytes()
+    flags |= width << WIDTH_SHIFT
+    return RECORD_HEADER.pack(flags, len(blob), len(ints)) + blob + ints
+
+
+def decode_record(buffer, sections=None):
+    buffer = memoryview(buffer)
+    flags, blob_size, ints_size = RECORD_HEADER.unpack_from(buffer)
+    start = RECORD_HEADER.size
+    blob = str(buffer[start : start + blob_size], "utf-8")
+    start += blob_size
+    ints = array(TYPECODES[flags >> WIDTH_SHIFT])
+    ints.frombytes(buffer[start : start + ints_size])
+    if sys.byteorder == "big":
+        ints.byteswap()
+
+    strings = [None]
+    if flags & JSON_TABLE:
+        strings.extend(json.loads(blob))
+    elif flags & STRINGS:
+        strings.extend(blob.split("\0"))
+    if flags & GENERIC:
+        recipe = _decode_generic(strings, ints.tolist())
+        if sections is None:
+            return recipe
+        return {name: value for name, value in recipe.items() if name in sections}
+    return _decode_schema(strings, ints.tolist(), sections)
+
+
+def _decode_schema(strings, values, sections):
+    recipe = {}
+    offset = 1
+    for _ in range(values[0]):
+        code, count = values[offset], values[offset + 1]
+        offset += 2
+        name = SECTIONS[code]
+        wanted = sections is None or name in sections
+        if code == METADATA:
+            end = offset + 2 * count
+            if wanted:
+                recipe[name] = {
+                    strings[key]: strings[value]
+                    for key, value in zip(
+                        values[offset:end:2], values[offset + 1 : end : 2]
+                    )
+                }
+        elif code == INGREDIENTS:
+            end = offset + 3 * count
+            if wanted:
+                recipe[name] = [
+                    {
+                        "name": strings[ingredient],
+                        "quantity": strings[quantity],
+                        "unit": strings[unit],
+                    }
+                    for ingredient, quantity, unit in zip(
+                        values[offset:end:3],
+                        values[offset + 1 : end : 3],
+                        values[offset + 2 : end : 3],
+                    )
+                ]
+        elif code == COOKWARE:
+            end = offset + count
+            if wanted:
+                recipe[name] = [strings[index] for index in values[offset:end]]
+        elif code == STEPS:
+            steps, end = _decode_steps(strings, values, offset, count, wanted)
+            if wanted:
+                recipe[name] = steps
+        elif code == TIMERS:
+            end = offset + 2 * count
+            if wanted:
+                recipe[name] = [
+                    (strings[timer], strings[duration])
+                    for timer, duration in zip(
+                        values[offset:end:2], values[offset + 1 : end : 2]
+                    )
+                ]
+        elif code == CONDITIONS:
+            end = offset + 3 * count
+            if wanted:
+                recipe[name] = [
+                    {
+                        "ingredient": strings[values[position]],
+                        "condition": strings[values[position + 1]],
+                        "action": strings[values[position + 2]],
+                    }
+                    for position in range(offset, end, 3)
+                ]
+        elif code == SUBSTITUTIONS:
+            end = offset + 6 * count
+            if wanted:
+                recipe[name] = [
+                    {
+                        "primary": _ingredient(strings, values, position),
+                        "substitute": _ingredient(strings, values, position + 3),
+                    }
+                    for position in range(offset, end, 6)
+                ]
+        elif code == COMMENTS:
+            end = offset + count
+            if wanted:
+                recipe[name] = [
+                    {"type": "comment", "name": strings[index]}
+                    for index in values[offset:end]
+                ]
+        else:
+            end = offset + 2 * count
+            if wanted:
+                recipe[name] = [
+                    {"description": strings[description], "path": strings[path]}
+                    for description, path in zip(
+                        values[offset:end:2], values[offset + 1 : end : 2]
+                    )
+                ]
+        offset = end
+    return recipe
+
+
+def _ingredient(strings, values, position):
+    return {
+        "name": strings[values[position]],
+        "quantity": strings[values[position + 1]],
+        "unit": strings[values[position + 2]],
+    }
+
+
+def _decode_steps(strings, values, offset, count, wanted):
+    if not wanted:
+        # Only the field counts are needed to find the end of the section.
+        for _ in range(count):
+            kind = values[offset]
+            offset += 4 if kind == INGREDIENT else 3 if kind == TIMER else 2
+        return None, offset
+    steps = []
+    append = steps.append
+    for _ in range(count):
+        kind = values[offset]
+        if kind == TEXT:
+            append({"type": "text", "value": strings[values[offset + 1]]})
+            offset += 2
+        elif kind == INGREDIENT:
+            append(
+                {
+                    "type": "ingredient",
+                    "name": strings[values[offset + 1]],
+                    "quantity": strings[values[offset + 2]],
+                    "unit": strings[values[offset + 3]],
+                }
+            )
+            offset += 4
+        elif kind == TIMER:
+            append(
+                {
+                    "type": "timer",
+                    "name": strings[values[offset + 1]],
+                    "duration": strings[values[offset + 2]],
+                }
+            )
+            offset += 3
+        elif kind == UNNAMED_TIMER:
+            append({"type": "timer", "duration": strings[values[offset + 1]]})
+            offset += 2
+        else:
+            append({"type": STEP_TYPES[kind], "name": strings[values[offset + 1]]})
+            offset += 2
+    return steps, offset
+
+
+def _decode_generic(strings, values):
+    next_int = iter(values).__next__
+
+    def value():
+        tag = next_int()
+        if tag == T_STR:
+            return strings[next_int()]
+        if tag == T_DICT:
+            return {value(): value() for _ in range(next_int())}
+        if tag == T_LIST:
+            return [value() for _ in range(next_int())]
+        if tag == T_TUPLE:
+            return tuple([value() for _ in range(next_int())])
+        if tag == T_INT:
+            number = next_int()
+            return number >> 1 if not number & 1 else -((number + 1) >> 1)
+        if tag == T_TRUE:
+            return True
+        if tag == T_FALSE:
+            return False
+        if tag == T_BIGINT:
+            return int(strings[next_int()])
+        if tag == T_FLOAT:
+            return float(strings[next_int()])
+        if tag == T_FRACTION:
+            return Fraction(value(), value())
+        if tag == T_QUANTITY:
+            return Quantity(value(), value(), value())
+        raise ValueError(f"Unknown tag {tag} in record")
+
+    return value()
+
+
+def _check_header(data):
+    if len(data) < len(HEADER) or bytes(data[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a binary recipe stream")
+    version = data[len(MAGIC)]
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary recipe format version {version}")
+
+
+def dumps(recipe):
+    record = encode_record(recipe)
+    return HEADER + LENGTH.pack(len(record)) + record
+
+
+def loads(data, sections=None):
+    data = memoryview(data)
+    _check_header(data)
+    (size,) = LENGTH.unpack_from(data, len(HEADER))
+    start = len(HEADER) + LENGTH.size
+    return decode_record(data[start : start + size], sections)
+
+
+class RecipeWriter:
+    def __init__(self, file):
+        self.file = file
+        self.count = 0
+        file.write(HEADER)
+
+    def write(self, recipe):
+        record = encode_record(recipe)
+        self.file.write(LENGTH.pack(len(record)))
+        self.file.write(record)
+        self.count += 1
+
+    def write_many(self, recipes):
+        for recipe in recipes:
+            self.write(recipe)
+
+
+class RecipeReader:
+    def __init__(self, file, sections=None):
+        self.file = file
+        self.sections = sections
+        _check_header(file.read(len(HEADER)))
+
+    def __iter__(self):
+        read = self.file.read
+        while True:
+            prefix = read(LENGTH.size)
+            if not prefix:
+                return
+            if len(prefix) < LENGTH.size:
+                raise ValueError("Truncated binary recipe stream")
+            (size,) = LENGTH.unpack(prefix)
+            record = read(size)
+            if len(record) < size:
+                raise ValueError("Truncated binary recipe stream")
+            yield decode_record(record, self.sections)
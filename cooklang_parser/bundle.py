@@ -0,0 +1,179 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from .parser import CooklangParser
+
+# Bundle files hold many recipes in one file:
+#
+#     HEADER
+#     recipe text, DELIMITER, recipe text, DELIMITER, ...
+#     NUL padding to a multiple of 8 bytes
+#     offsets: count + 1 little-endian u64, the start of every recipe and
+#              the end of the last delimiter
+#     names: the recipe names in UTF-8, joined with NUL
+#     FOOTER: offsets position (u64), count (u64), names size (u64), MAGIC
+#
+# Recipes are stored as UTF-8 Cooklang text, each followed by DELIMITER, an
+# ASCII record separator line that recipe text cannot contain, so the data
+# can also be split without the index. The reader memory-maps the file and
+# only touches the pages of the recipes it decodes: the offsets are used in
+# place, and the names are decoded the first time a recipe is looked up by
+# name. Pages of a mapped file are not copied into the process, so iterating
+# over a bundle larger than memory leaves the kernel free to drop the pages
+# already read.
+
+MAGIC = b"CKBN"
+VERSION = 1
+HEADER = MAGIC + bytes([VERSION]) + b"\n"
+DELIMITER = b"\x1e\n"
+FOOTER = struct.Struct("<QQQ4s")
+OFFSET = array("Q").itemsize
+
+
+class BundleWriter:
+    def __init__(self, file):
+        self.file = file
+        self.names = []
+        self._seen = set()
+        self._offsets = array("Q", [len(HEADER)])
+        file.write(HEADER)
+
+    @property
+    def count(self):
+        return len(self.names)
+
+    def add(self, text, name=None):
+        data = text.encode("utf-8")
+        if DELIMITER[:1] in data:
+            raise ValueError("Recipe text contains the bundle delimiter")
+        if name is None:
+            name = str(self.count)
+        if "\0" in name or name in self._seen:
+            raise ValueError(f"Invalid or duplicate recipe name: {name!r}")
+        self.file.write(data)
+        self.file.write(DELIMITER)
+        self._seen.add(name)
+        self.names.append(name)
+        self._offsets.append(self._offsets[-1] + len(data) + len(DELIMITER))
+        return self.count - 1
+
+    def add_many(self, recipes):
+        # Accepts (name, text) pairs.
+        for name, text in recipes:
+            self.add(text, name)
+
+    def finish(self):
+        # Writes the index; the file itself is left open.
+        end = self._offsets[-1]
+        padding = -end % OFFSET
+        offsets = self._offsets
+        if sys.byteorder == "big":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        names = "\0".join(self.names).encode("utf-8")
+        self.file.write(bytes(padding))
+        self.file.write(offsets.tobytes())
+        self.file.write(names)
+        self.file.write(FOOTER.pack(end + padding, self.count, len(names), MAGIC))
+
+
+def write_bundle(path, recipes):
+    # Writes (name, text) pairs to a new bundle and returns their number.
+    with open(path, "wb") as bundle_file:
+        writer = BundleWriter(bundle_file)
+        writer.add_many(recipes)
+        writer.finish()
+    return writer.count
+
+
+class BundleReader:
+    def __init__(self, path, parser=None):
+        self.parser = parser if parser is not None else CooklangParser()
+        with open(path, "rb") as bundle_file:
+            self._map = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._offsets = None
+        self._ids = None
+        try:
+            self._read_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_index(self):
+        size = len(self._map)
+        if size < len(HEADER) + FOOTER.size or self._map[: len(HEADER)] != HEADER:
+            raise ValueError("Not a recipe bundle")
+        index, count, names_size, magic = FOOTER.unpack_from(
+            self._map, size - FOOTER.size
+        )
+        names_start = index + (count + 1) * OFFSET
+        if (
+            magic != MAGIC
+            or index % OFFSET
+            or names_start + names_size != size - FOOTER.size
+        ):
+            raise ValueError("Corrupt recipe bundle index")
+        offsets = self._view[index:names_start]
+        if sys.byteorder == "big":
+            offsets = array("Q", offsets.tobytes())
+            offsets.byteswap()
+        else:
+            offsets = offsets.cast("Q")
+        self._offsets = offsets
+        self._count = count
+        self._names = (names_start, names_start + names_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._map.closed:
+            return
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._view.release()
+        self._map.close()
+
+    def __len__(self):
+        return self._count
+
+    def names(self):
+        if not self._count:
+            return []
+        start, end = self._names
+        return str(self._view[start:end], "utf-8").split("\0")
+
+    def index(self, name):
+        if self._ids is None:
+            self._ids = {name: index for index, name in enumerate(self.names())}
+        return self._ids[name]
+
+    def text(self, key):
+        # key is a recipe's position in the bundle or its name.
+        index = self.index(key) if isinstance(key, str) else key
+        if not 0 <= index < self._count:
+            raise IndexError(f"Recipe index out of range: {index}")
+        start = self._offsets[index]
+        end = self._offsets[index + 1] - len(DELIMITER)
+        return str(self._view[start:end], "utf-8")
+
+    def parse(self, key, sections=None):
+        return self.parser.parse_recipe(self.text(key), sections)
+
+    def texts(self):
+        for index in range(self._count):
+            yield self.text(index)
+
+    def __iter__(self):
+        for text in self.texts():
+            yield self.parser.parse_recipe(text)
+
+    def parse_many(self, workers=None, chunksize=32, ordered=True):
+        # BatchResult indexes are the recipes' positions in the bundle.
+        return self.parser.parse_many(self.texts(), workers, chunksize, ordered)
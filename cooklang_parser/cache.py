@@ -0,0 +1,71 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def copy_recipe(value):
+    if isinstance(value, dict):
+        return {key: copy_recipe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_recipe(item) for item in value]
+    return value
+
+
+def text_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class ParseCache:
+    def __init__(self, maxsize=1024):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(state["maxsize"])
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, text, options=()):
+        return options, text_digest(text)
+
+    def get(self, key):
+        with self._lock:
+            recipe = self._entries.get(key)
+            if recipe is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy_recipe(recipe)
+
+    def put(self, key, recipe):
+        recipe = copy_recipe(recipe)
+        with self._lock:
+            self._entries[key] = recipe
+            self._entries.move_to_end(key)
+            if self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+shared_cache = ParseCache()
@@ -0,0 +1,224 @@
+import math
+from array import array
+from fractions import Fraction
+from itertools import compress
+
+from .index import normalize_name
+from .quantity import (
+    BASE_UNITS,
+    UNITS,
+    canonical_unit,
+    convert,
+    normalize,
+    parse_quantity,
+)
+
+NO_CODE = -1
+
+
+class StringTable:
+    def __init__(self):
+        self.strings = []
+        self.codes = {}
+
+    def __len__(self):
+        return len(self.strings)
+
+    def encode(self, value):
+        if value is None:
+            return NO_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def decode(self, code):
+        return None if code == NO_CODE else self.strings[code]
+
+
+def quantity_value(quantity):
+    if quantity is None:
+        return math.nan
+    try:
+        return float(Fraction(quantity))
+    except (ValueError, ZeroDivisionError):
+        return math.nan
+
+
+def base_amount(ingredient):
+    # The lower bound of an ingredient's amount in its base unit (g, ml or
+    # s) and that unit, from the base_amount of normalize_quantities parsers
+    # or else from its quantity and unit; NaN and None when unknown.
+    if "base_amount" in ingredient:
+        amount = ingredient["base_amount"]
+    else:
+        quantity, unit = ingredient["quantity"], ingredient["unit"]
+        amount = None
+        if quantity:
+            amount = normalize(parse_quantity(f"{quantity}%{unit or ''}"))
+    if amount is None:
+        return math.nan, None
+    return float(amount.value), amount.unit
+
+
+class ColumnarCorpus:
+    def __init__(self):
+        self.keys = []
+        self.names = StringTable()
+        self.units = StringTable()
+        self.durations = StringTable()
+        self.ingredient_recipe = array("l")
+        self.ingredient_name = array("l")
+        self.ingredient_quantity = array("d")
+        self.ingredient_unit = array("l")
+        # Case-folded names, and amounts converted to g, ml or s, for select.
+        self.ingredient_folded_name = array("l")
+        self.ingredient_base_quantity = array("d")
+        self.ingredient_base_unit = array("l")
+        self.ingredient_offsets = array("l", [0])
+        self.cookware_recipe = array("l")
+        self.cookware_name = array("l")
+        self.cookware_offsets = array("l", [0])
+        self.timer_recipe = array("l")
+        self.timer_name = array("l")
+        self.timer_duration = array("l")
+        self.timer_offsets = array("l", [0])
+        # Total timer time per recipe, from the timing of timer_seconds
+        # parsers; NaN when a recipe has none.
+        self.total_seconds = array("d")
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_texts(cls, parser, texts):
+        corpus = cls()
+        for text in texts:
+            corpus.add(parser.parse_recipe(text))
+        return corpus
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        corpus = cls()
+        for key, parsed_recipe in pairs:
+            corpus.add(parsed_recipe, key)
+        return corpus
+
+    def add(self, parsed_recipe, key=None):
+        recipe = len(self.keys)
+        self.keys.append(recipe if key is None else key)
+
+        for ingredient in parsed_recipe.get("ingredients", ()):
+            self.ingredient_recipe.append(recipe)
+            self.ingredient_name.append(self.names.encode(ingredient["name"]))
+            self.ingredient_quantity.append(quantity_value(ingredient["quantity"]))
+            self.ingredient_unit.append(self.units.encode(ingredient["unit"]))
+            self.ingredient_folded_name.append(
+                self.names.encode(normalize_name(ingredient["name"]))
+            )
+            quantity, unit = base_amount(ingredient)
+            self.ingredient_base_quantity.append(quantity)
+            self.ingredient_base_unit.append(self.units.encode(unit))
+        self.ingredient_offsets.append(len(self.ingredient_name))
+
+        for name in parsed_recipe.get("cookware", ()):
+            self.cookware_recipe.append(recipe)
+            self.cookware_name.append(self.names.encode(name))
+        self.cookware_offsets.append(len(self.cookware_name))
+
+        for name, duration in parsed_recipe.get("timers", ()):
+            self.timer_recipe.append(recipe)
+            self.timer_name.append(self.names.encode(name))
+            self.timer_duration.append(self.durations.encode(duration))
+        self.timer_offsets.append(len(self.timer_name))
+
+        timing = parsed_recipe.get("timing")
+        self.total_seconds.append(
+            float(timing["total_seconds"]) if timing else math.nan
+        )
+        return recipe
+
+    def ingredients(self, recipe):
+        start, end = self.ingredient_offsets[recipe], self.ingredient_offsets[recipe + 1]
+        return [
+            {
+                "name": self.names.decode(self.ingredient_name[row]),
+                "quantity": self.ingredient_quantity[row],
+                "unit": self.units.decode(self.ingredient_unit[row]),
+            }
+            for row in range(start, end)
+        ]
+
+    def cookware(self, recipe):
+        start, end = self.cookware_offsets[recipe], self.cookware_offsets[recipe + 1]
+        return [self.names.decode(code) for code in self.cookware_name[start:end]]
+
+    def timers(self, recipe):
+        start, end = self.timer_offsets[recipe], self.timer_offsets[recipe + 1]
+        return [
+            (
+                self.names.decode(self.timer_name[row]),
+                self.durations.decode(self.timer_duration[row]),
+            )
+            for row in range(start, end)
+        ]
+
+    def _rows(self, column, value):
+        code = self.names.codes.get(value)
+        if code is None:
+            return []
+        # map/compress keep the scan over the code column in C.
+        return list(compress(range(len(column)), map(code.__eq__, column)))
+
+    def select(self, ingredient, unit=None, min_quantity=None, max_quantity=None):
+        # Names match case-insensitively. With a unit known to the quantity
+        # module, rows in any unit of the same kind match, and the bounds
+        # are converted to its base unit; other units match as written.
+        rows = self._rows(self.ingredient_folded_name, normalize_name(ingredient))
+        quantities = self.ingredient_quantity
+        if unit is not None:
+            canonical = canonical_unit(unit)
+            if canonical in UNITS:
+                base = BASE_UNITS[UNITS[canonical][0]]
+                if min_quantity is not None:
+                    min_quantity = float(convert(min_quantity, canonical, base))
+                if max_quantity is not None:
+                    max_quantity = float(convert(max_quantity, canonical, base))
+                unit_column = self.ingredient_base_unit
+                quantities = self.ingredient_base_quantity
+                unit = base
+            else:
+                unit_column = self.ingredient_unit
+            unit_code = self.units.codes.get(unit, len(self.units))
+            rows = [row for row in rows if unit_column[row] == unit_code]
+        if min_quantity is not None:
+            rows = [row for row in rows if quantities[row] >= min_quantity]
+        if max_quantity is not None:
+            rows = [row for row in rows if quantities[row] <= max_quantity]
+        recipes = self.ingredient_recipe
+        return sorted({recipes[row] for row in rows})
+
+    def select_cookware(self, name):
+        recipes = self.cookware_recipe
+        return sorted({recipes[row] for row in self._rows(self.cookware_name, name)})
+
+    def select_total_time(self, min_seconds=None, max_seconds=None):
+        return [
+            recipe
+            for recipe, seconds in enumerate(self.total_seconds)
+            if seconds == seconds
+            and (min_seconds is None or seconds >= min_seconds)
+            and (max_seconds is None or seconds <= max_seconds)
+        ]
+
+    def ingredient_totals(self, unit=None):
+        totals = {}
+        unit_code = None if unit is None else self.units.codes.get(unit, len(self.units))
+        for name, quantity, code in zip(
+            self.ingredient_name, self.ingredient_quantity, self.ingredient_unit
+        ):
+            if quantity != quantity or (unit_code is not None and code != unit_code):
+                continue
+            totals[name] = totals.get(name, 0.0) + quantity
+        return {self.names.decode(name): total for name, total in totals.items()}
@@ -0,0 +1,100 @@
+import os
+from collections import deque
+
+from .patterns import LINE_COMMENT_START
+
+COOK_EXTENSION = ".cook"
+
+
+def iter_cook_files(root, extension=COOK_EXTENSION):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(extension):
+                yield os.path.join(dirpath, filename)
+
+
+def read_recipe(path, encoding="utf-8"):
+    with open(path, encoding=encoding) as recipe_file:
+        return recipe_file.read()
+
+
+def strip_block_comments(raw, in_block):
+    # Returns the parts of a raw line outside block comments and whether the
+    # line ends inside one, matching remove_comments for closed comments.
+    parts = []
+    position = 0
+    while True:
+        if in_block:
+            end = raw.find("-]", position)
+            if end < 0:
+                return "".join(parts), True
+            position = end + 2
+            in_block = False
+        opening = raw.find("[-", position)
+        if opening < 0:
+            parts.append(raw[position:])
+            return "".join(parts), False
+        parts.append(raw[position:opening])
+        position = opening + 2
+        in_block = True
+
+
+def iter_header(lines):
+    # Yields the leading lines made of metadata, comments and blank space,
+    # then the first line with other content, and stops reading.
+    in_block = False
+    for raw in lines:
+        yield raw
+        if LINE_COMMENT_START.match(raw):
+            continue
+        rest, in_block = strip_block_comments(raw, in_block)
+        rest = rest.strip()
+        if rest and not rest.startswith(">>"):
+            return
+
+
+def read_header(source, encoding="utf-8"):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding=encoding) as recipe_file:
+            return "".join(iter_header(recipe_file))
+    lines = (
+        line.decode(encoding) if isinstance(line, bytes) else line for line in source
+    )
+    return "".join(iter_header(lines))
+
+
+def read_metadata(parser, source, encoding="utf-8"):
+    return parser.extract_metadata(parser.remove_comments(read_header(source, encoding)))
+
+
+def scan_metadata(parser, root, encoding="utf-8"):
+    for path in iter_cook_files(root):
+        yield path, read_metadata(parser, path, encoding)
+
+
+def parse_file(parser, path, encoding="utf-8"):
+    return parser.parse_recipe(read_recipe(path, encoding))
+
+
+def parse_directory(parser, root, encoding="utf-8", workers=1, chunksize=32):
+    paths = iter_cook_files(root)
+    if workers == 1:
+        for path in paths:
+            yield path, parse_file(parser, path, encoding)
+        return
+
+    # Files are read lazily as parse_many pulls them, so only the recipes
+    # currently in flight are held in memory alongside their paths.
+    in_flight = deque()
+
+    def texts():
+        for path in paths:
+            in_flight.append(path)
+            yield read_recipe(path, encoding)
+
+    for result in parser.parse_many(texts(), workers, chunksize):
+        path = in_flight.popleft()
+        if result.error is not None:
+            raise result.error
+        yield path, result.recipe
@@ -0,0 +1,206 @@
+import re
+from collections import namedtuple
+
+from . import lexer
+from .lexer import Token
+from .patterns import METADATA, SUBSTITUTION
+
+# Hardened engine: the lexer's token stream, produced by a scanner that runs
+# in time linear in the length of the input. The step component, condition
+# and image patterns used by the other engines take quadratic time on lines
+# full of unclosed markup ("@a{@a{@a{...", "![![![..."), because every
+# failed match scans to the end of the line again. Here those patterns are
+# matched by hand with the same results:
+#
+# - a run of name characters ([\w\s-]) is matched once and never backtracked
+#   into, since the character that has to follow it ("{" or ",") can never be
+#   part of the run, and runs end at the next "@", "#", "~" or "+";
+# - a search for the closing "}", "." or "](" either ends the match, and the
+#   next search starts after it, or finds nothing, in which case no later
+#   match on the line can succeed at that point either.
+#
+# Every character is therefore looked at a bounded number of times. The
+# metadata and substitution patterns are anchored or cannot run past the
+# next "@", so they are used as they are. Block comments are stripped by
+# lexer.tokenize, which is linear as well.
+#
+# Input limits are checked before the text is scanned and raise
+# LimitExceeded, a ValueError; None disables a limit. Malformed markup that
+# the other engines reject with a TypeError or ZeroDivisionError raises a
+# ValueError here, so a single except clause covers any untrusted input.
+
+Limits = namedtuple(
+    "Limits",
+    ["max_bytes", "max_tokens", "max_line_length"],
+    defaults=(1 << 20, 100000, 10000),
+)
+
+RUN = re.compile(r"[\w\s-]*")
+WORD = re.compile(r"\w*")
+SIGIL = re.compile(r"[@#~+]")
+
+
+class LimitExceeded(ValueError):
+    pass
+
+
+def check_text(text, limits):
+    max_bytes = limits.max_bytes
+    if max_bytes is not None and (
+        len(text) > max_bytes
+        or len(text.encode("utf-8", "surrogatepass")) > max_bytes
+    ):
+        raise LimitExceeded(f"Recipe exceeds {max_bytes} bytes")
+    max_line_length = limits.max_line_length
+    if max_line_length is not None and len(text) > max_line_length:
+        if max(map(len, text.split("\n"))) > max_line_length:
+            raise LimitExceeded(f"Line exceeds {max_line_length} characters")
+
+
+def tokenize(text, parser, limits, final=True, scan=None):
+    check_text(text, limits)
+    max_tokens = limits.max_tokens
+    tokens = lexer.tokenize(text, parser, final, scan or scan_line)
+    try:
+        for count, token in enumerate(tokens, 1):
+            if max_tokens is not None and count > max_tokens:
+                raise LimitExceeded(f"Recipe exceeds {max_tokens} tokens")
+            yield token
+    except (TypeError, ZeroDivisionError) as error:
+        raise ValueError(f"Malformed recipe: {error}") from error
+
+
+def iter_components(line):
+    # The spans of STEP_COMPONENT.finditer(line).
+    closed = True
+    match = SIGIL.search(line)
+    while match:
+        start = match.start()
+        sigil = match.group()
+        run_end = RUN.match(line, start + 1).end()
+        named = run_end > start + 1
+        end = -1
+        if sigil == "@" or sigil == "~":
+            if (named or sigil == "~") and closed and line.startswith("{", run_end):
+                end = line.find("}", run_end + 1)
+                if end < 0:
+                    # No later "@" or "~" on the line can be closed either.
+                    closed = False
+                else:
+                    end += 1
+        elif named and line.startswith("{}", run_end):
+            end = run_end + 2
+        elif sigil == "#":
+            end = WORD.match(line, start + 1).end()
+            if end == start + 1:
+                end = -1
+        if end < 0:
+            match = SIGIL.search(line, start + 1)
+        else:
+            yield start, end
+            match = SIGIL.search(line, end)
+
+
+def split_components(text):
+    # The parts of STEP_COMPONENT.split(text).
+    parts = []
+    last_end = 0
+    for start, end in iter_components(text):
+        parts.append(text[last_end:start])
+        parts.append(text[start:end])
+        last_end = end
+    parts.append(text[last_end:])
+    return parts
+
+
+def iter_conditions(line, final):
+    # The matches of CONDITION.finditer(line), or LINE_CONDITION when the
+    # line is not the last one, as (start, end, groups).
+    start = line.find("If @")
+    while start >= 0:
+        end = -1
+        name_end = RUN.match(line, start + 4).end()
+        if name_end > start + 4 and line.startswith("{} is ", name_end):
+            value_end = RUN.match(line, name_end + 6).end()
+            if value_end > name_end + 6 and line.startswith(", ", value_end):
+                action_start = value_end + 2
+                action_end = line.find(".", action_start)
+                if action_end >= 0:
+                    end = action_end + 1
+                elif final:
+                    action_end = end = len(line)
+                else:
+                    return
+                groups = (
+                    line[start + 4 : name_end],
+                    line[name_end + 6 : value_end],
+                    line[action_start:action_end],
+                )
+                yield start, end, groups
+        start = line.find("If @", start + 1 if end < 0 else end)
+
+
+def iter_images(line):
+    # The matches of IMAGE.finditer(line), as (start, end, groups).
+    start = line.find("![")
+    while start >= 0:
+        middle = line.find("](", start + 2)
+        if middle < 0:
+            return
+        end = line.find(")", middle + 2)
+        if end < 0:
+            return
+        yield start, end + 1, (line[start + 2 : middle], line[middle + 2 : end])
+        start = line.find("![", end + 1)
+
+
+def scan_line(line, number, final, parser, base=0):
+    stripped = line.strip()
+    if not stripped:
+        return
+    if len(stripped) != len(line):
+        base += line.find(stripped[0])
+    line = stripped
+    if line.startswith(">>"):
+        match = METADATA.match(line)
+        if match:
+            key, value = match.groups()
+            value = (key.lower(), value.strip())
+            yield Token("metadata", value, line, number, base, base + len(line))
+        return
+
+    last_end = 0
+    for start, end in iter_components(line):
+        if start > last_end:
+            value = line[last_end:start].strip()
+            text = line[last_end:start]
+            yield Token("text", value, text, number, base + last_end, base + start)
+        text = line[start:end]
+        component = parser.parse_step_component(text)
+        yield Token(
+            component["type"], component, text, number, base + start, base + end
+        )
+        last_end = end
+    if last_end < len(line):
+        text = line[last_end:]
+        end = base + len(line)
+        yield Token("text", text.strip(), text, number, base + last_end, end)
+
+    if "If @" in line:
+        for start, end, groups in iter_conditions(line, final):
+            condition = parser.parse_condition(groups)
+            text = line[start:end]
+            yield Token("condition", condition, text, number, base + start, base + end)
+    if "(or @" in line:
+        for match in SUBSTITUTION.finditer(line):
+            substitution = parser.parse_substitution(match.groups())
+            start, end = match.span()
+            text = match.group()
+            yield Token(
+                "substitution", substitution, text, number, base + start, base + end
+            )
+    if "![" in line:
+        for start, end, (description, path) in iter_images(line):
+            image = {"description": description.strip(), "path": path.strip()}
+            text = line[start:end]
+            yield Token("image", image, text, number, base + start, base + end)
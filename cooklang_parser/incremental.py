@@ -0,0 +1,378 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from fractions import Fraction
+from itertools import accumulate
+
+from . import lexer
+
+# The document is kept as a list of raw lines grouped into units: runs of
+# lines that start and end outside a block comment. Each unit is tokenized on
+# its own. The sections of all units are stored back to back in flat lists, so
+# an edit re-tokenizes only the units it touches and splices their sections
+# into place. The sections built from them (sorted ingredients and cookware,
+# metadata, comments and timer totals) are patched in place with the
+# difference as well, so neither an edit nor assembling the recipe it returns
+# does work for the rest of the document. The recipe shares these sections,
+# which later edits keep updating.
+
+FIELDS = (
+    "metadata",
+    "steps",
+    "timers",
+    "conditions",
+    "substitutions",
+    "comments",
+    "block_comments",
+    "images",
+)
+
+BLOCK = 128
+
+
+class PrefixSums:
+    # A list of sizes that is spliced in place, kept in blocks of BLOCK to
+    # 2 * BLOCK entries along with the number of entries and the sum of the
+    # sizes of each block and their running totals. Lookups find the block
+    # before looking inside it and a splice rebuilds only the blocks it
+    # touches, so edits do not pay for the rest of the document.
+    def __init__(self, sizes=()):
+        self.blocks = []
+        self.counts = []
+        self.sums = []
+        self.ends = []
+        self.totals = []
+        self.splice(0, 0, sizes)
+
+    def __len__(self):
+        return self.ends[-1] if self.ends else 0
+
+    def _locate(self, index):
+        # The block holding entry index and its index within the block; the
+        # end of the list falls just after the last block.
+        ends = self.ends
+        block = bisect_right(ends, index)
+        return block, index - (ends[block - 1] if block else 0)
+
+    def total(self, index):
+        # The sum of the first index sizes.
+        block, offset = self._locate(index)
+        total = self.totals[block - 1] if block else 0
+        if offset:
+            total += sum(self.blocks[block][:offset])
+        return total
+
+    def find(self, value):
+        # The index of the entry that value falls in.
+        totals = self.totals
+        block = bisect_right(totals, value)
+        index = self.ends[block - 1] if block else 0
+        if block < len(self.blocks):
+            before = totals[block - 1] if block else 0
+            index += bisect_right(list(accumulate(self.blocks[block])), value - before)
+        return index
+
+    def splice(self, start, end, sizes):
+        blocks = self.blocks
+        first, head = self._locate(start)
+        last, tail = self._locate(end)
+        merged = list(sizes)
+        if first == last < len(blocks) and blocks[first][head:tail] == merged:
+            return
+        if first < len(blocks):
+            merged[:0] = blocks[first][:head]
+        if last < len(blocks):
+            merged.extend(blocks[last][tail:])
+            last += 1
+        # Short runs join a neighbouring block, so blocks stay large.
+        if len(merged) < BLOCK and last < len(blocks):
+            merged.extend(blocks[last])
+            last += 1
+        if len(merged) < BLOCK and first:
+            first -= 1
+            merged[:0] = blocks[first]
+        count = len(merged) // BLOCK or (1 if merged else 0)
+        pieces = [
+            merged[len(merged) * piece // count : len(merged) * (piece + 1) // count]
+            for piece in range(count)
+        ]
+        counts = list(map(len, pieces))
+        sums = list(map(sum, pieces))
+        blocks[first:last] = pieces
+        # The running totals only move when the blocks change in size.
+        if counts == self.counts[first:last] and sums == self.sums[first:last]:
+            return
+        self.counts[first:last] = counts
+        self.sums[first:last] = sums
+        for running, measures in ((self.ends, self.counts), (self.totals, self.sums)):
+            base = running[first - 1] if first else 0
+            running[first:] = map(base.__add__, accumulate(measures[first:]))
+
+
+class IncrementalRecipe:
+    def __init__(self, parser, text=""):
+        self.parser = parser
+        self.lines = text.split("\n")
+        self._line_sizes = PrefixSums(len(line) + 1 for line in self.lines)
+        self._length = len(text) + 1
+        # Units are stored as their numbers of lines, with their sections and
+        # labels that increase along the document. A unit keeps its label
+        # while it exists, so positions given as (label, index) stay
+        # comparable when edits above them shift the lines.
+        self._units = PrefixSums()
+        self._sections = []
+        self._labels = []
+        self._flat = {field: [] for field in FIELDS}
+        self._sizes = {field: PrefixSums() for field in FIELDS}
+        self._metadata = {}
+        self._comments = []
+        # Every ingredient key (name, quantity, unit) maps to the sorted
+        # (label, index, component) positions it appears at, and every name
+        # to its keys. The ingredients section holds one entry per key in
+        # the order of the sorted ranks list: by name, then by position of
+        # the first appearance for names with several keys.
+        self._positions = {}
+        self._names = {}
+        self._ranks = {}
+        self._order = []
+        self._ingredients = []
+        self._cookware_counts = Counter()
+        self._cookware = []
+        # Timer count, total and max_total, and the sorted upper bounds.
+        self._timing = [0, 0, 0]
+        self._longest = []
+        self._recipe = None
+        self._splice(0, *self._reunitize(0, 0, 0, 0))
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    @property
+    def recipe(self):
+        if self._recipe is None:
+            self._recipe = self._assemble()
+        return self._recipe
+
+    def edit(self, offset, deleted, inserted):
+        line_sizes = self._line_sizes
+        end_offset = offset + deleted
+        if offset < 0 or deleted < 0 or end_offset > self._length - 1:
+            raise ValueError(f"Edit out of range: {offset}+{deleted}")
+
+        first = line_sizes.find(offset)
+        last = line_sizes.find(end_offset)
+        head = self.lines[first][: offset - line_sizes.total(first)]
+        tail = self.lines[last][end_offset - line_sizes.total(last) :]
+        replacement = (head + inserted + tail).split("\n")
+        removed = self.lines[first : last + 1]
+        self.lines[first : last + 1] = replacement
+
+        changed_end = first + len(replacement)
+        delta = len(replacement) - len(removed)
+        anchor = first
+        if changed_end >= len(self.lines) - 1:
+            # The last two lines decide where "$" matches in conditions.
+            anchor = max(0, min(first, len(self.lines) - 2))
+        unit = self._units.find(anchor)
+        resume = self._units.find(last) + 1
+        try:
+            resume, new_units = self._reunitize(unit, resume, changed_end, delta)
+        except Exception:
+            self.lines[first:changed_end] = removed
+            raise
+        line_sizes.splice(first, last + 1, [len(line) + 1 for line in replacement])
+        self._length += len(inserted) - deleted
+        self._splice(unit, resume, new_units)
+        self._recipe = None
+        return self.recipe
+
+    def _reunitize(self, unit, resume, changed_end, delta):
+        lines = self.lines
+        total = len(lines)
+        units = self._units
+        start = units.total(unit)
+        trailing = total > 1 and not lines[-1]
+        stop = len(units)
+        new_units = []
+        line = start
+        in_block = False
+        while line < total:
+            in_block = lexer.ends_in_block_comment(lines[line], in_block)
+            line += 1
+            if in_block or (trailing and line == total - 1):
+                continue
+            new_units.append((line - start, self._tokenize(start, line)))
+            start = line
+            if line >= changed_end:
+                while resume < stop and units.total(resume) + delta < line:
+                    resume += 1
+                if resume < stop and units.total(resume) + delta == line:
+                    return resume, new_units
+        if line > start:
+            new_units.append((line - start, self._tokenize(start, line)))
+        return stop, new_units
+
+    def _tokenize(self, start, end):
+        text = "\n".join(self.lines[start:end])
+        final = end == len(self.lines)
+        return lexer.collect(self.parser.tokenize(text, final))
+
+    def _splice(self, unit, resume, new_units):
+        removed = self._sections[unit:resume]
+        added = [sections for _, sections in new_units]
+        for field in FIELDS:
+            sizes = self._sizes[field]
+            begin = sizes.total(unit)
+            end = sizes.total(resume)
+            items = [item for sections in added for item in getattr(sections, field)]
+            self._flat[field][begin:end] = items
+            # Line comments come before block comments, whose flat list
+            # starts after the already spliced line comments.
+            if field == "comments":
+                self._comments[begin:end] = items
+            elif field == "block_comments":
+                offset = len(self._flat["comments"])
+                self._comments[offset + begin : offset + end] = items
+            sizes.splice(unit, resume, [len(getattr(s, field)) for s in added])
+
+        if any(sections.metadata for sections in removed + added):
+            self._metadata.clear()
+            self._metadata.update(self._flat["metadata"])
+        labels = self._new_labels(unit, resume, len(added))
+        old_labels = self._labels[unit:resume]
+        self._patch_ingredients(zip(old_labels, removed), zip(labels, added))
+        self._patch_cookware(removed, added)
+        if self.parser.timer_seconds:
+            self._patch_timing(removed, added)
+        self._labels[unit:resume] = labels
+        self._sections[unit:resume] = added
+        self._units.splice(unit, resume, [count for count, _ in new_units])
+
+    def _new_labels(self, unit, resume, count):
+        # Labels for count units replacing those from unit to resume: the
+        # replaced labels are reused, and any further ones are spread evenly
+        # between the last of them and the label of the unit that follows.
+        labels = self._labels
+        reused = labels[unit:resume][:count]
+        extra = count - len(reused)
+        if not extra:
+            return reused
+        low = reused[-1] if reused else labels[unit - 1] if unit else 0
+        step = Fraction(labels[resume] - low, extra + 1) if resume < len(labels) else 1
+        return reused + [low + step * number for number in range(1, extra + 1)]
+
+    def _patch_ingredients(self, removed, added):
+        positions = self._positions
+        touched = {}
+        for label, sections in removed:
+            for index, component in enumerate(sections.ingredients):
+                key = (component["name"], component["quantity"], component["unit"])
+                entries = positions[key]
+                del entries[bisect_left(entries, (label, index))]
+                touched.setdefault(key[0], set()).add(key)
+        for label, sections in added:
+            for index, component in enumerate(sections.ingredients):
+                key = (component["name"], component["quantity"], component["unit"])
+                insort(positions.setdefault(key, []), (label, index, component))
+                touched.setdefault(key[0], set()).add(key)
+
+        # Touched keys are re-ranked, and so is every key of a name that
+        # gains or loses its only key, since the position then starts or
+        # stops counting.
+        stale = set()
+        for name, keys in touched.items():
+            named = self._names.setdefault(name, set())
+            single = len(named) == 1
+            for key in keys:
+                if positions[key]:
+                    named.add(key)
+                else:
+                    named.discard(key)
+                    del positions[key]
+            stale.update(keys)
+            if single != (len(named) == 1):
+                stale.update(named)
+            if not named:
+                del self._names[name]
+
+        order = self._order
+        ingredients = self._ingredients
+        for key in stale:
+            rank = self._ranks.pop(key, None)
+            if rank is not None:
+                index = bisect_left(order, rank)
+                del order[index]
+                del ingredients[index]
+        for key in stale:
+            if key not in positions:
+                continue
+            # Extra fields such as normalized amounts come from the first
+            # component with each key.
+            label, index, component = positions[key][0]
+            rank = (key[0], label, index) if len(self._names[key[0]]) > 1 else (key[0],)
+            self._ranks[key] = rank
+            index = bisect_left(order, rank)
+            order.insert(index, rank)
+            ingredients.insert(
+                index,
+                {field: value for field, value in component.items() if field != "type"},
+            )
+
+    def _patch_cookware(self, removed, added):
+        counts = self._cookware_counts
+        cookware = self._cookware
+        for sections in removed:
+            for name in sections.cookware:
+                counts[name] -= 1
+                if not counts[name]:
+                    del counts[name]
+                    del cookware[bisect_left(cookware, name)]
+        for sections in added:
+            for name in sections.cookware:
+                if name not in counts:
+                    insort(cookware, name)
+                counts[name] += 1
+
+    def _patch_timing(self, removed, added):
+        # The same sums as timer_totals, kept exact by the Fraction amounts.
+        timing = self._timing
+        longest = self._longest
+        for sign, units in ((-1, removed), (1, added)):
+            for sections in units:
+                for component in sections.steps:
+                    if component["type"] != "timer" or component.get("seconds") is None:
+                        continue
+                    seconds = component["seconds"]
+                    timing[0] += sign
+                    timing[1] += sign * seconds.value
+                    timing[2] += sign * seconds.maximum
+                    if sign > 0:
+                        insort(longest, seconds.maximum)
+                    else:
+                        del longest[bisect_left(longest, seconds.maximum)]
+
+    def _assemble(self):
+        flat = self._flat
+        parsed_recipe = {}
+        if self._metadata:
+            parsed_recipe["metadata"] = self._metadata
+        if self._ingredients:
+            parsed_recipe["ingredients"] = self._ingredients
+        if self._cookware:
+            parsed_recipe["cookware"] = self._cookware
+        for field in ("steps", "timers", "conditions", "substitutions"):
+            if flat[field]:
+                parsed_recipe[field] = flat[field]
+        if self._comments:
+            parsed_recipe["comments"] = self._comments
+        if flat["images"]:
+            parsed_recipe["images"] = flat["images"]
+        count, total, max_total = self._timing
+        if count:
+            parsed_recipe["timing"] = {
+                "timers": count,
+                "total_seconds": total,
+                "max_total_seconds": max_total,
+                "longest_seconds": max(0, self._longest[-1]),
+            }
+        return parsed_recipe
@@ -0,0 +1,261 @@
+import sys
+from array import array
+from itertools import compress
+
+# An inverted index from normalized ingredient and cookware names to the
+# recipes that use them, for "what can I cook" queries over a corpus.
+#
+# Recipe ids are assigned in order and never reused, so every posting list
+# stays sorted. A name used by few recipes keeps its ids in an array; once
+# that array would take more room than one bit per recipe it becomes a
+# bitmap. Queries turn the postings they touch into Python ints and combine
+# them with bitwise operations, which run in C over the whole corpus at
+# once:
+#
+# - superset: the recipes using every given name, the AND of their postings;
+# - subset: the recipes whose names are all among the given ones, up to
+#   "missing" exceptions. The postings of the given names are added up in a
+#   bit-sliced counter (slice i holds bit i of every recipe's count of
+#   given names), and each group of recipes with the same number of names n
+#   keeps those whose count is at least n - missing.
+#
+# The ints built from postings are cached until the name's recipes change.
+
+FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def normalize_name(name):
+    return sys.intern(" ".join(name.casefold().split()))
+
+
+def members(bits):
+    # The positions of the set bits of a non-negative int, in order. Few
+    # members are found with str.find, which skips runs of zeros in C.
+    if not bits:
+        return []
+    digits = bin(bits)[:1:-1]
+    if digits.count("1") * 16 > len(digits):
+        flags = digits.encode("ascii").translate(FLAGS)
+        return list(compress(range(len(flags)), flags))
+    positions = []
+    find = digits.find
+    position = find("1")
+    while position >= 0:
+        positions.append(position)
+        position = find("1", position + 1)
+    return positions
+
+
+def at_least(slices, threshold):
+    # The recipes whose bit-sliced count is at least threshold.
+    if threshold.bit_length() > len(slices):
+        return 0
+    greater = 0
+    equal = -1
+    for position in range(len(slices) - 1, -1, -1):
+        bits = slices[position]
+        if threshold >> position & 1:
+            equal &= bits
+        else:
+            greater |= equal & bits
+            equal &= ~bits
+    return greater | equal
+
+
+def within(postings, counts, bits, missing):
+    # The recipes with at most missing names outside the given ones.
+    # postings are the ints of the given names found in the corpus and
+    # counts maps a number of names to the recipes with that many, which
+    # bits turns into an int.
+    slices = []
+    for carry in postings:
+        position = 0
+        while carry:
+            if position == len(slices):
+                slices.append(carry)
+                break
+            current = slices[position]
+            slices[position] = current ^ carry
+            carry &= current
+            position += 1
+    result = 0
+    for count, recipes in counts.items():
+        needed = count - missing
+        if needed <= 0:
+            result |= bits(recipes)
+        elif needed <= len(postings):
+            result |= bits(recipes) & at_least(slices, needed)
+    return result
+
+
+class Postings:
+    __slots__ = ("ids", "bitmap", "_bits")
+
+    def __init__(self):
+        self.ids = array("l")
+        self.bitmap = None
+        self._bits = None
+
+    def __len__(self):
+        if self.bitmap is None:
+            return len(self.ids)
+        return bin(self.bits()).count("1")
+
+    def __bool__(self):
+        if self.bitmap is None:
+            return bool(self.ids)
+        return any(self.bitmap)
+
+    def add(self, recipe):
+        self._bits = None
+        if self.bitmap is None:
+            self.ids.append(recipe)
+            if len(self.ids) * self.ids.itemsize * 8 > recipe:
+                self.bitmap = bytearray((recipe >> 3) + 1)
+                for member in self.ids:
+                    self.bitmap[member >> 3] |= 1 << (member & 7)
+                self.ids = None
+            return
+        index = recipe >> 3
+        if index >= len(self.bitmap):
+            self.bitmap.extend(bytes(index + 1 - len(self.bitmap)))
+        self.bitmap[index] |= 1 << (recipe & 7)
+
+    def remove(self, recipe):
+        self._bits = None
+        if self.bitmap is None:
+            self.ids.remove(recipe)
+        else:
+            self.bitmap[recipe >> 3] &= ~(1 << (recipe & 7)) & 0xFF
+
+    def bits(self):
+        if self._bits is None:
+            bitmap = self.bitmap
+            if bitmap is None:
+                bitmap = bytearray((self.ids[-1] >> 3) + 1 if self.ids else 0)
+                for member in self.ids:
+                    bitmap[member >> 3] |= 1 << (member & 7)
+            self._bits = int.from_bytes(bitmap, "little")
+        return self._bits
+
+
+class RecipeIndex:
+    def __init__(self):
+        self.keys = []
+        self.ingredients = {}
+        self.cookware = {}
+        self._recipes = []
+        self._size = 0
+        self._live = Postings()
+        # Recipes by their number of distinct ingredient and cookware names.
+        self._ingredient_counts = {}
+        self._cookware_counts = {}
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, recipe):
+        return 0 <= recipe < len(self._recipes) and self._recipes[recipe] is not None
+
+    @classmethod
+    def from_texts(cls, parser, texts):
+        index = cls()
+        for text in texts:
+            index.add(parser.parse_recipe(text))
+        return index
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        index = cls()
+        for key, parsed_recipe in pairs:
+            index.add(parsed_recipe, key)
+        return index
+
+    def add(self, parsed_recipe, key=None):
+        recipe = len(self._recipes)
+        self.keys.append(recipe if key is None else key)
+        ingredients = {
+            normalize_name(ingredient["name"])
+            for ingredient in parsed_recipe.get("ingredients", ())
+        }
+        cookware = {normalize_name(name) for name in parsed_recipe.get("cookware", ())}
+        ingredients.discard("")
+        cookware.discard("")
+        ingredients, cookware = tuple(sorted(ingredients)), tuple(sorted(cookware))
+        self._recipes.append((ingredients, cookware))
+        self._size += 1
+        self._live.add(recipe)
+        self._post(recipe, ingredients, self.ingredients, self._ingredient_counts)
+        self._post(recipe, cookware, self.cookware, self._cookware_counts)
+        return recipe
+
+    def _post(self, recipe, names, table, counts):
+        for name in names:
+            postings = table.get(name)
+            if postings is None:
+                postings = table[name] = Postings()
+            postings.add(recipe)
+        postings = counts.get(len(names))
+        if postings is None:
+            postings = counts[len(names)] = Postings()
+        postings.add(recipe)
+
+    def remove(self, recipe):
+        if recipe not in self:
+            raise KeyError(recipe)
+        ingredients, cookware = self._recipes[recipe]
+        self._recipes[recipe] = None
+        self._size -= 1
+        self._live.remove(recipe)
+        self._unpost(recipe, ingredients, self.ingredients, self._ingredient_counts)
+        self._unpost(recipe, cookware, self.cookware, self._cookware_counts)
+
+    def _unpost(self, recipe, names, table, counts):
+        for name in names:
+            table[name].remove(recipe)
+            if not table[name]:
+                del table[name]
+        counts[len(names)].remove(recipe)
+        if not counts[len(names)]:
+            del counts[len(names)]
+
+    def names(self, recipe):
+        # The normalized (ingredients, cookware) names of a recipe, sorted.
+        if recipe not in self:
+            raise KeyError(recipe)
+        return self._recipes[recipe]
+
+    def superset(self, ingredients=(), cookware=()):
+        # Recipes that use every given ingredient and piece of cookware.
+        bits = self._live.bits()
+        queries = ((ingredients, self.ingredients), (cookware, self.cookware))
+        for names, table in queries:
+            for name in names:
+                postings = table.get(normalize_name(name))
+                if postings is None:
+                    return []
+                bits &= postings.bits()
+        return members(bits)
+
+    def subset(self, ingredients, missing=0, cookware=None):
+        # Recipes that need nothing but the given ingredients, apart from at
+        # most missing others, and, when cookware is given, no other cookware.
+        bits = self._within(
+            ingredients, self.ingredients, self._ingredient_counts, missing
+        )
+        if cookware is not None and bits:
+            bits &= self._within(cookware, self.cookware, self._cookware_counts, 0)
+        return members(bits)
+
+    def _within(self, names, table, counts, missing):
+        postings = [
+            table[name].bits()
+            for name in {normalize_name(name) for name in names}
+            if name in table
+        ]
+        return within(postings, counts, Postings.bits, missing)
+
+    def missing(self, recipe, ingredients):
+        # The ingredients of a recipe that are not among the given ones.
+        have = {normalize_name(name) for name in ingredients}
+        return [name for name in self.names(recipe)[0] if name not in have]
@@ -0,0 +1,463 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from .binary import decode_record, encode_record
+from .index import members, normalize_name, within
+
+# Index files hold a RecipeIndex and the parse results it was built from in
+# one file that is memory-mapped and queried in place:
+#
+#     HEADER
+#     arrays, each starting at a multiple of 8 bytes
+#     directory: (offset, size in bytes) of every array in ARRAYS, as u64
+#     FOOTER: directory position (u64), recipe count (u64), MAGIC
+#
+# Integers are little-endian. The records are parse results encoded with
+# binary.encode_record, back to back, with the offsets of every record and
+# the end of the last one, so VERSION changes with the binary record
+# format too. String tables are UTF-8 strings back to back with their
+# offsets; ingredient, cookware and unit names are sorted, so a name is
+# found by binary search and its position in the table is its code.
+#
+# The postings of a name are its recipe ids, sorted u32, unless those take
+# at least as many bytes as a bitmap of every recipe, padded to a multiple
+# of 4 bytes, in which case they are that bitmap: the size of a posting
+# tells which it is. Recipes are also posted by their number of distinct
+# ingredient and cookware names, for subset queries. Rows list the
+# ingredient name and unit codes and the cookware name codes of each
+# recipe, in the order of the parse result.
+#
+# Opening a file only reads the footer and the directory. Everything else
+# is read through the mapping when a query needs it, so a reader is ready
+# at once whatever the size of the corpus, and processes that map the same
+# file share its pages in the page cache. Queries turn bitmaps into ints
+# straight from the mapping each time; only the ints built from id lists,
+# which take a Python loop, are kept, for the POSTING_CACHE most recently
+# used names.
+
+MAGIC = b"CKIX"
+VERSION = 2
+HEADER = MAGIC + bytes([VERSION]) + b"\n"
+ALIGNMENT = 8
+NO_CODE = 0xFFFFFFFF
+FOOTER = struct.Struct("<QQ4s")
+DIRECTORY_ENTRY = struct.Struct("<QQ")
+U32 = "I" if array("I").itemsize == 4 else "L"
+POSTING_CACHE = 256
+
+ARRAYS = (
+    ("records", "B"),
+    ("record_offsets", "Q"),
+    ("keys", "B"),
+    ("key_offsets", "Q"),
+    ("ingredient_names", "B"),
+    ("ingredient_name_offsets", "Q"),
+    ("cookware_names", "B"),
+    ("cookware_name_offsets", "Q"),
+    ("units", "B"),
+    ("unit_offsets", "Q"),
+    ("ingredient_postings", "B"),
+    ("ingredient_posting_offsets", "Q"),
+    ("cookware_postings", "B"),
+    ("cookware_posting_offsets", "Q"),
+    ("ingredient_counts", U32),
+    ("ingredient_count_postings", "B"),
+    ("ingredient_count_posting_offsets", "Q"),
+    ("cookware_counts", U32),
+    ("cookware_count_postings", "B"),
+    ("cookware_count_posting_offsets", "Q"),
+    ("ingredient_rows", "Q"),
+    ("ingredient_row_names", U32),
+    ("ingredient_row_units", U32),
+    ("cookware_rows", "Q"),
+    ("cookware_row_names", U32),
+)
+
+
+def little_endian(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def read_array(typecode, view):
+    # Arrays are used in place on little-endian machines.
+    if sys.byteorder == "big":
+        values = array(typecode)
+        values.frombytes(view)
+        values.byteswap()
+        return values
+    return view.cast(typecode)
+
+
+def bitmap_size(count):
+    return (count + 31) // 32 * 4
+
+
+def string_table(strings):
+    data = bytearray()
+    offsets = array("Q", [0])
+    for string in strings:
+        data += string.encode("utf-8")
+        offsets.append(len(data))
+    return data, offsets
+
+
+def posting_table(postings, count):
+    # postings are sorted arrays of recipe ids.
+    data = bytearray()
+    offsets = array("Q", [0])
+    size = bitmap_size(count)
+    for ids in postings:
+        if len(ids) * 4 < size:
+            data += little_endian(ids).tobytes()
+        else:
+            bitmap = bytearray(size)
+            for recipe in ids:
+                bitmap[recipe >> 3] |= 1 << (recipe & 7)
+            data += bitmap
+        offsets.append(len(data))
+    return data, offsets
+
+
+class IndexWriter:
+    def __init__(self, file):
+        self.file = file
+        self.keys = []
+        self._record_offsets = array("Q", [0])
+        self._codes = ({}, {}, {})
+        self._postings = ([], [])
+        self._counts = ({}, {})
+        self._rows = (array("Q", [0]), array("Q", [0]))
+        self._row_codes = (array(U32), array(U32), array(U32))
+        file.write(HEADER)
+        self._position = len(HEADER)
+        self._pad()
+        self._records_start = self._position
+
+    @property
+    def count(self):
+        return len(self.keys)
+
+    def _pad(self):
+        padding = -self._position % ALIGNMENT
+        self.file.write(bytes(padding))
+        self._position += padding
+
+    def _write(self, data):
+        self.file.write(data)
+        self._position += len(data)
+
+    def _code(self, kind, name):
+        codes = self._codes[kind]
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(codes)
+            if kind < 2:
+                self._postings[kind].append(array(U32))
+        return code
+
+    def add(self, parsed_recipe, key=None):
+        recipe = self.count
+        self.keys.append(str(recipe if key is None else key))
+        record = encode_record(parsed_recipe)
+        self._write(record)
+        self._record_offsets.append(self._record_offsets[-1] + len(record))
+
+        ingredient_names, ingredient_units, cookware_names = self._row_codes
+        recipe_names = (set(), set())
+        for ingredient in parsed_recipe.get("ingredients", ()):
+            name = normalize_name(ingredient["name"])
+            if not name:
+                continue
+            recipe_names[0].add(self._code(0, name))
+            ingredient_names.append(self._code(0, name))
+            unit = ingredient["unit"]
+            ingredient_units.append(NO_CODE if unit is None else self._code(2, unit))
+        for name in parsed_recipe.get("cookware", ()):
+            name = normalize_name(name)
+            if name:
+                recipe_names[1].add(self._code(1, name))
+                cookware_names.append(self._code(1, name))
+        for kind, codes in enumerate(recipe_names):
+            for code in codes:
+                self._postings[kind][code].append(recipe)
+            self._counts[kind].setdefault(len(codes), array(U32)).append(recipe)
+        self._rows[0].append(len(ingredient_names))
+        self._rows[1].append(len(cookware_names))
+        return recipe
+
+    def add_many(self, recipes):
+        # Accepts (key, parsed_recipe) pairs.
+        for key, parsed_recipe in recipes:
+            self.add(parsed_recipe, key)
+
+    def finish(self):
+        # Writes the tables; the file itself is left open.
+        count = self.count
+        arrays = {"record_offsets": self._record_offsets}
+        arrays["keys"], arrays["key_offsets"] = string_table(self.keys)
+        remaps = []
+        for kind, prefix in enumerate(("ingredient", "cookware", "unit")):
+            codes = self._codes[kind]
+            names = sorted(codes)
+            remap = array(U32, [0]) * len(names)
+            for position, name in enumerate(names):
+                remap[codes[name]] = position
+            remaps.append(remap)
+            table = "units" if kind == 2 else f"{prefix}_names"
+            offsets = "unit_offsets" if kind == 2 else f"{prefix}_name_offsets"
+            arrays[table], arrays[offsets] = string_table(names)
+            if kind == 2:
+                break
+            postings = [self._postings[kind][codes[name]] for name in names]
+            data, offsets = posting_table(postings, count)
+            arrays[f"{prefix}_postings"] = data
+            arrays[f"{prefix}_posting_offsets"] = offsets
+            sizes = sorted(self._counts[kind])
+            data, offsets = posting_table(
+                [self._counts[kind][size] for size in sizes], count
+            )
+            arrays[f"{prefix}_counts"] = array(U32, sizes)
+            arrays[f"{prefix}_count_postings"] = data
+            arrays[f"{prefix}_count_posting_offsets"] = offsets
+            arrays[f"{prefix}_rows"] = self._rows[kind]
+        names, units, cookware = self._row_codes
+        arrays["ingredient_row_names"] = array(U32, (remaps[0][code] for code in names))
+        arrays["ingredient_row_units"] = array(
+            U32, (NO_CODE if code == NO_CODE else remaps[2][code] for code in units)
+        )
+        arrays["cookware_row_names"] = array(
+            U32, (remaps[1][code] for code in cookware)
+        )
+
+        directory = [(self._records_start, self._position - self._records_start)]
+        for name, _ in ARRAYS[1:]:
+            self._pad()
+            data = arrays[name]
+            if isinstance(data, array):
+                data = little_endian(data).tobytes()
+            directory.append((self._position, len(data)))
+            self._write(data)
+        self._pad()
+        position = self._position
+        for entry in directory:
+            self._write(DIRECTORY_ENTRY.pack(*entry))
+        self._write(FOOTER.pack(position, count, MAGIC))
+
+
+def write_index(path, recipes):
+    # Writes (key, parsed_recipe) pairs to a new index file and returns
+    # their number.
+    with open(path, "wb") as index_file:
+        writer = IndexWriter(index_file)
+        writer.add_many(recipes)
+        writer.finish()
+    return writer.count
+
+
+class StringTable:
+    # A read-only sequence over a string table of an index file.
+    def __init__(self, data, offsets):
+        self._data = data
+        self._offsets = offsets
+        self._codes = None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, code):
+        if not 0 <= code < len(self):
+            raise IndexError(f"String index out of range: {code}")
+        return str(self._data[self._offsets[code] : self._offsets[code + 1]], "utf-8")
+
+    def __iter__(self):
+        for code in range(len(self)):
+            yield self[code]
+
+    def find(self, string):
+        # The code of a string in a sorted table, or None.
+        code = bisect_left(self, string)
+        if code < len(self) and self[code] == string:
+            return code
+        return None
+
+    def index(self, string):
+        # The code of a string in any table; builds a dict on first use.
+        if self._codes is None:
+            self._codes = {value: code for code, value in enumerate(self)}
+        return self._codes[string]
+
+
+class IndexReader:
+    def __init__(self, path):
+        with open(path, "rb") as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._arrays = []
+        self._bits = OrderedDict()
+        try:
+            self._read_directory()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_directory(self):
+        size = len(self._map)
+        if size < len(HEADER) + FOOTER.size or self._map[: len(HEADER)] != HEADER:
+            raise ValueError("Not a recipe index file")
+        position, count, magic = FOOTER.unpack_from(self._map, size - FOOTER.size)
+        if (
+            magic != MAGIC
+            or position + len(ARRAYS) * DIRECTORY_ENTRY.size != size - FOOTER.size
+        ):
+            raise ValueError("Corrupt recipe index file")
+        arrays = {}
+        for number, (name, typecode) in enumerate(ARRAYS):
+            offset, length = DIRECTORY_ENTRY.unpack_from(
+                self._map, position + number * DIRECTORY_ENTRY.size
+            )
+            if offset % ALIGNMENT or offset + length > position:
+                raise ValueError("Corrupt recipe index file")
+            view = self._view[offset : offset + length]
+            self._arrays.append(view)
+            if typecode != "B":
+                view = read_array(typecode, view)
+                if isinstance(view, memoryview):
+                    self._arrays.append(view)
+            arrays[name] = view
+        self._count = count
+        self._records = arrays["records"]
+        self._record_offsets = arrays["record_offsets"]
+        self.keys = StringTable(arrays["keys"], arrays["key_offsets"])
+        self.units = StringTable(arrays["units"], arrays["unit_offsets"])
+        self._tables = {}
+        for prefix in ("ingredient", "cookware"):
+            self._tables[prefix] = (
+                StringTable(
+                    arrays[f"{prefix}_names"], arrays[f"{prefix}_name_offsets"]
+                ),
+                (arrays[f"{prefix}_postings"], arrays[f"{prefix}_posting_offsets"]),
+                {size: code for code, size in enumerate(arrays[f"{prefix}_counts"])},
+                (
+                    arrays[f"{prefix}_count_postings"],
+                    arrays[f"{prefix}_count_posting_offsets"],
+                ),
+                arrays[f"{prefix}_rows"],
+                arrays[f"{prefix}_row_names"],
+            )
+        self.ingredient_names = self._tables["ingredient"][0]
+        self.cookware_names = self._tables["cookware"][0]
+        self._row_units = arrays["ingredient_row_units"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._map.closed:
+            return
+        for view in reversed(self._arrays):
+            view.release()
+        self._view.release()
+        self._map.close()
+
+    def __len__(self):
+        return self._count
+
+    def _recipe_id(self, key):
+        # key is a recipe's id or its key.
+        recipe = self.keys.index(key) if isinstance(key, str) else key
+        if not 0 <= recipe < self._count:
+            raise IndexError(f"Recipe index out of range: {recipe}")
+        return recipe
+
+    def recipe(self, key, sections=None):
+        # The parse result of a recipe, decoded from the mapping.
+        recipe = self._recipe_id(key)
+        start = self._record_offsets[recipe]
+        end = self._record_offsets[recipe + 1]
+        return decode_record(self._records[start:end], sections)
+
+    def ingredients(self, key):
+        # The (name, unit) rows of a recipe's ingredients.
+        recipe = self._recipe_id(key)
+        _, _, _, _, rows, names = self._tables["ingredient"]
+        units = self._row_units
+        return [
+            (
+                self.ingredient_names[names[row]],
+                None if units[row] == NO_CODE else self.units[units[row]],
+            )
+            for row in range(rows[recipe], rows[recipe + 1])
+        ]
+
+    def names(self, key):
+        # The normalized (ingredients, cookware) names of a recipe, sorted.
+        recipe = self._recipe_id(key)
+        result = []
+        for prefix in ("ingredient", "cookware"):
+            table, _, _, _, rows, names = self._tables[prefix]
+            codes = sorted(set(names[rows[recipe] : rows[recipe + 1]]))
+            result.append(tuple(table[code] for code in codes))
+        return tuple(result)
+
+    def _posting(self, prefix, kind, code):
+        data, offsets = self._tables[prefix][kind]
+        start, end = offsets[code], offsets[code + 1]
+        if end - start == bitmap_size(self._count):
+            return int.from_bytes(data[start:end], "little")
+        cache_key = (prefix, kind, code)
+        bits = self._bits.get(cache_key)
+        if bits is not None:
+            self._bits.move_to_end(cache_key)
+            return bits
+        ids = read_array(U32, data[start:end])
+        bitmap = bytearray(bitmap_size(self._count))
+        for recipe in ids:
+            bitmap[recipe >> 3] |= 1 << (recipe & 7)
+        bits = self._bits[cache_key] = int.from_bytes(bitmap, "little")
+        if len(self._bits) > POSTING_CACHE:
+            self._bits.popitem(last=False)
+        return bits
+
+    def superset(self, ingredients=(), cookware=()):
+        # Recipes that use every given ingredient and piece of cookware.
+        bits = (1 << self._count) - 1
+        for names, prefix in ((ingredients, "ingredient"), (cookware, "cookware")):
+            table = self._tables[prefix][0]
+            for name in names:
+                code = table.find(normalize_name(name))
+                if code is None:
+                    return []
+                bits &= self._posting(prefix, 1, code)
+        return members(bits)
+
+    def subset(self, ingredients, missing=0, cookware=None):
+        # Recipes that need nothing but the given ingredients, apart from at
+        # most missing others, and, when cookware is given, no other cookware.
+        bits = self._within("ingredient", ingredients, missing)
+        if cookware is not None and bits:
+            bits &= self._within("cookware", cookware, 0)
+        return members(bits)
+
+    def _within(self, prefix, names, missing):
+        table, _, counts, _, _, _ = self._tables[prefix]
+        codes = {table.find(normalize_name(name)) for name in names}
+        codes.discard(None)
+        postings = [self._posting(prefix, 1, code) for code in codes]
+        return within(
+            postings, counts, lambda code: self._posting(prefix, 3, code), missing
+        )
+
+    def missing(self, key, ingredients):
+        # The ingredients of a recipe that are not among the given ones.
+        have = {normalize_name(name) for name in ingredients}
+        return [name for name in self.names(key)[0] if name not in have]
@@ -0,0 +1,94 @@
+from collections.abc import Mapping
+
+from .parser import SECTIONS
+from .utils import timer_totals
+
+EXTRACTORS = dict(SECTIONS)
+# timing is computed from the steps when the parser has timer_seconds set.
+NAMES = tuple(EXTRACTORS) + ("timing",)
+
+# A read-only mapping with the same keys and values as parse_recipe, where
+# each section is extracted the first time it is looked up. Lookups of a
+# single key (recipe["steps"], recipe.get("metadata"), "images" in recipe)
+# only run that section's extractor; iteration, len() and comparisons need
+# every section and extract them all.
+
+
+class ParsedRecipe(Mapping):
+    def __init__(self, parser, text):
+        self._parser = parser
+        self._text = text
+        self._clean_text = None
+        self._sections = {}
+
+    @property
+    def text(self):
+        return self._text
+
+    @property
+    def clean_text(self):
+        if self._clean_text is None:
+            parser = self._parser
+            self._clean_text = parser._call(
+                "remove_comments", parser.remove_comments, self._text
+            )
+        return self._clean_text
+
+    def section(self, name):
+        if name in self._sections:
+            return self._sections[name]
+        if name not in NAMES:
+            raise KeyError(name)
+        parser = self._parser
+        if name == "timing":
+            value = {}
+            if parser.timer_seconds:
+                value = timer_totals(self.section("steps"))
+            self._sections[name] = value
+            return value
+        if parser.engine != "extractors":
+            # The lexer produces every section in one pass.
+            parsed_recipe = parser._call(
+                parser.engine, parser._parse_tokens, self._text
+            )
+            for section in EXTRACTORS:
+                empty = {} if section == "metadata" else []
+                self._sections[section] = parsed_recipe.get(section, empty)
+            return self._sections[name]
+        if name == "comments" or (name == "metadata" and "[-" not in self._text):
+            # Metadata lines can only be hidden by block comments.
+            text = self._text
+        else:
+            text = self.clean_text
+        extractor = EXTRACTORS[name]
+        value = self._sections[name] = parser._call(
+            extractor, getattr(parser, extractor), text
+        )
+        return value
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in NAMES:
+            raise AttributeError(name)
+        return self.section(name)
+
+    def __getitem__(self, name):
+        value = self.section(name)
+        if not value:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return name in NAMES and bool(self.section(name))
+
+    def __iter__(self):
+        return (name for name in NAMES if self.section(name))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        computed = ", ".join(self._sections)
+        return f"ParsedRecipe(computed=[{computed}])"
+
+    def to_dict(self):
+        return dict(self)
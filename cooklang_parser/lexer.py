@@ -0,0 +1,384 @@
+from bisect import bisect_right
+from collections import namedtuple
+
+from .patterns import (
+    CONDITION,
+    IMAGE,
+    LINE_COMMENT,
+    LINE_COMMENT_START,
+    LINE_CONDITION,
+    METADATA,
+    STEP_COMPONENT,
+    SUBSTITUTION,
+    TIMER,
+)
+from .utils import group_steps
+
+# Single-pass engine: the text is walked line by line exactly once, block
+# comments are stripped on the fly and every line is scanned for markup with
+# one combined pattern. The resulting token stream carries enough information
+# to build every section of the dict returned by CooklangParser.parse_recipe.
+#
+# Markup is always read per (comment-free) line, so the few constructs the
+# regex extractors match across line breaks, and bare ``word@name`` ingredients,
+# are not reproduced. Ingredient names follow the step grammar, which does not
+# allow "&". Metadata and "--" comment lines are taken whole: ingredients,
+# cookware and timers written in a metadata value are not collected, and a
+# "[- ... -]" inside a line comment is not reported as a block comment, where
+# the extractors find both.
+
+# start and end are offsets into the tokenized text. A token from a line
+# with block comments removed spans the comments as well.
+Token = namedtuple("Token", ["type", "value", "text", "line", "start", "end"])
+
+STEP_TYPES = frozenset(["text", "ingredient", "cookware", "timer", "note"])
+
+
+def tokenize(text, parser, final=True, scan=None):
+    if scan is None:
+        scan = scan_line
+    lines = text.split("\n")
+    last = len(lines) - 1
+    if last > 0 and not lines[last]:
+        last -= 1
+    if not final:
+        last = len(lines)
+
+    # Token spans are offsets into text. Lines pieced together around block
+    # comments carry (position in line, offset in text) segments, which
+    # rescan uses to map token positions back; shift is the offset minus
+    # the position for the part of the line read from the current raw line.
+    block = None
+    prefix = ""
+    prefix_segments = None
+    block_origin = 0
+    block_line_origin = 0
+    start = 0
+    origin = 0
+    for number, raw in enumerate(lines):
+        line_origin = origin
+        origin += len(raw) + 1
+        if LINE_COMMENT_START.match(raw):
+            match = LINE_COMMENT.match(raw)
+            if match:
+                yield Token(
+                    "comment",
+                    match.group(1).strip(),
+                    raw,
+                    number,
+                    line_origin,
+                    line_origin + len(raw),
+                )
+            if block is not None:
+                block.append(raw)
+            line = ""
+        else:
+            line = raw
+
+        position = 0
+        shift = line_origin
+        segments = []
+        if block is not None:
+            end = line.find("-]")
+            if end < 0:
+                if not LINE_COMMENT_START.match(raw):
+                    block.append(line)
+                continue
+            block.append(line[:end])
+            body = "\n".join(block)
+            yield Token(
+                "block_comment",
+                body.strip(),
+                "[-" + body + "-]",
+                start,
+                block_origin,
+                line_origin + end + 2,
+            )
+            line = prefix + line[end + 2 :]
+            position = len(prefix)
+            shift = line_origin + end + 2 - position
+            segments = prefix_segments
+            block = None
+
+        # The text around block comments is collected and joined once, so a
+        # line with many comments is not rebuilt for each of them.
+        kept = [line[:position]]
+        size = position
+        while True:
+            opening = line.find("[-", position)
+            if opening < 0:
+                break
+            kept.append(line[position:opening])
+            segments.append((size, position + shift))
+            size += opening - position
+            end = line.find("-]", opening + 2)
+            if end < 0:
+                block = [line[opening + 2 :]]
+                prefix = "".join(kept)
+                prefix_segments = segments
+                block_origin = opening + shift
+                block_line_origin = line_origin
+                start = number
+                break
+            body = line[opening + 2 : end]
+            yield Token(
+                "block_comment",
+                body.strip(),
+                "[-" + body + "-]",
+                number,
+                opening + shift,
+                end + 2 + shift,
+            )
+            position = end + 2
+
+        if block is None:
+            if segments:
+                kept.append(line[position:])
+                segments.append((size, position + shift))
+                line = "".join(kept)
+                yield from rescan(scan, line, number, number >= last, parser, segments)
+            else:
+                yield from scan(line, number, number >= last, parser, shift)
+
+    if block is not None:
+        # An unterminated block comment is kept as regular text.
+        tail = (prefix + "[-" + "\n".join(block)).split("\n")
+        prefix_segments.append((len(prefix), block_origin))
+        yield from rescan(scan, tail[0], start, start >= last, parser, prefix_segments)
+        origin = block_line_origin
+        for offset in range(1, len(tail)):
+            origin += len(lines[start + offset - 1]) + 1
+            number = start + offset
+            if LINE_COMMENT_START.match(lines[number]):
+                # Already emitted as a comment.
+                continue
+            yield from scan(tail[offset], number, number >= last, parser, origin)
+
+
+def rescan(scan, line, number, final, parser, segments):
+    positions = [position for position, _ in segments]
+
+    def locate(position):
+        first, offset = segments[bisect_right(positions, position) - 1]
+        return offset + position - first
+
+    for token in scan(line, number, final, parser, 0):
+        end = locate(token.end - 1) + 1 if token.end > token.start else None
+        start = locate(token.start)
+        yield token._replace(start=start, end=start if end is None else end)
+
+
+def ends_in_block_comment(raw, in_block):
+    # Mirrors the block comment handling in tokenize for a single raw line.
+    if LINE_COMMENT_START.match(raw):
+        return in_block
+    position = 0
+    if in_block:
+        end = raw.find("-]")
+        if end < 0:
+            return True
+        position = end + 2
+    while True:
+        opening = raw.find("[-", position)
+        if opening < 0:
+            return False
+        end = raw.find("-]", opening + 2)
+        if end < 0:
+            return True
+        position = end + 2
+
+
+def scan_line(line, number, final, parser, base=0):
+    stripped = line.strip()
+    if not stripped:
+        return
+    if len(stripped) != len(line):
+        base += line.find(stripped[0])
+    line = stripped
+    if line.startswith(">>"):
+        match = METADATA.match(line)
+        if match:
+            key, value = match.groups()
+            yield Token(
+                "metadata",
+                (key.lower(), value.strip()),
+                line,
+                number,
+                base,
+                base + len(line),
+            )
+        return
+
+    last_end = 0
+    for match in STEP_COMPONENT.finditer(line):
+        start, end = match.span()
+        if start > last_end:
+            value = line[last_end:start].strip()
+            text = line[last_end:start]
+            yield Token("text", value, text, number, base + last_end, base + start)
+        text = match.group()
+        component = parser.parse_step_component(text)
+        yield Token(
+            component["type"], component, text, number, base + start, base + end
+        )
+        last_end = end
+    if last_end < len(line):
+        yield Token(
+            "text",
+            line[last_end:].strip(),
+            line[last_end:],
+            number,
+            base + last_end,
+            base + len(line),
+        )
+
+    if "If @" in line:
+        pattern = CONDITION if final else LINE_CONDITION
+        for match in pattern.finditer(line):
+            condition = parser.parse_condition(match.groups())
+            start, end = match.span()
+            yield Token(
+                "condition", condition, match.group(), number, base + start, base + end
+            )
+    if "(or @" in line:
+        for match in SUBSTITUTION.finditer(line):
+            substitution = parser.parse_substitution(match.groups())
+            start, end = match.span()
+            text = match.group()
+            yield Token(
+                "substitution", substitution, text, number, base + start, base + end
+            )
+    if "![" in line:
+        for match in IMAGE.finditer(line):
+            description, path = match.groups()
+            image = {"description": description.strip(), "path": path.strip()}
+            start, end = match.span()
+            yield Token("image", image, match.group(), number, base + start, base + end)
+
+
+Sections = namedtuple(
+    "Sections",
+    [
+        "metadata",
+        "ingredients",
+        "cookware",
+        "steps",
+        "timers",
+        "conditions",
+        "substitutions",
+        "comments",
+        "block_comments",
+        "images",
+        "paragraphs",
+    ],
+)
+
+
+def collect(tokens):
+    sections = Sections([], [], [], [], [], [], [], [], [], [], [])
+    steps = sections.steps
+    # paragraphs holds the index of the first step component of every
+    # paragraph. A line continues the paragraph of the previous step line
+    # when it follows it directly, or when a block comment spanning the
+    # lines in between joined them (joined maps the line a block comment
+    # ends on to the line its joined text starts on).
+    paragraphs = sections.paragraphs
+    joined = {}
+    step_line = -2
+    for token in tokens:
+        kind = token.type
+        if kind in STEP_TYPES:
+            line = token.line
+            if line != step_line:
+                if line != step_line + 1 and joined.get(line) != step_line + 1:
+                    paragraphs.append(len(steps))
+                step_line = line
+            component = token.value
+            if kind == "text":
+                steps.append({"type": "text", "value": component})
+                continue
+            steps.append(component)
+            if kind == "ingredient":
+                sections.ingredients.append(component)
+            elif kind == "cookware":
+                sections.cookware.append(component["name"])
+            elif kind == "timer":
+                match = TIMER.fullmatch(token.text)
+                if match:
+                    sections.timers.append(match.groups())
+        elif kind == "metadata":
+            sections.metadata.append(token.value)
+        elif kind == "comment":
+            sections.comments.append({"type": "comment", "name": token.value})
+        elif kind == "block_comment":
+            sections.block_comments.append({"type": "comment", "name": token.value})
+            if "\n" in token.text:
+                end = token.line + token.text.count("\n")
+                joined[end] = joined.get(token.line, token.line)
+        elif kind == "condition":
+            sections.conditions.append(token.value)
+        elif kind == "substitution":
+            sections.substitutions.append(token.value)
+        elif kind == "image":
+            sections.images.append(token.value)
+    return sections
+
+
+def finish(parts, structured=False):
+    metadata = {}
+    ingredients = []
+    seen = set()
+    cookware = set()
+    steps = []
+    paragraphs = []
+    timers = []
+    conditions = []
+    substitutions = []
+    comments = []
+    block_comments = []
+    images = []
+
+    for part in parts:
+        metadata.update(part.metadata)
+        for component in part.ingredients:
+            key = (component["name"], component["quantity"], component["unit"])
+            if key not in seen:
+                seen.add(key)
+                ingredients.append(
+                    {key: value for key, value in component.items() if key != "type"}
+                )
+        cookware.update(part.cookware)
+        paragraphs.extend(len(steps) + start for start in part.paragraphs)
+        steps.extend(part.steps)
+        timers.extend(part.timers)
+        conditions.extend(part.conditions)
+        substitutions.extend(part.substitutions)
+        comments.extend(part.comments)
+        block_comments.extend(part.block_comments)
+        images.extend(part.images)
+
+    parsed_recipe = {}
+    if metadata:
+        parsed_recipe["metadata"] = metadata
+    if ingredients:
+        parsed_recipe["ingredients"] = sorted(ingredients, key=lambda x: x["name"])
+    if cookware:
+        parsed_recipe["cookware"] = sorted(cookware)
+    if steps:
+        parsed_recipe["steps"] = group_steps(steps, paragraphs) if structured else steps
+    if timers:
+        parsed_recipe["timers"] = timers
+    if conditions:
+        parsed_recipe["conditions"] = conditions
+    if substitutions:
+        parsed_recipe["substitutions"] = substitutions
+    comments.extend(block_comments)
+    if comments:
+        parsed_recipe["comments"] = comments
+    if images:
+        parsed_recipe["images"] = images
+    return parsed_recipe
+
+
+def build_recipe(tokens, structured=False):
+    return finish([collect(tokens)], structured)
@@ -0,0 +1,277 @@
+from sys import intern
+
+# Compact alternative to the nested dicts returned by parse_recipe. Every
+# class uses __slots__, repeated strings (names, units, quantities) are
+# interned and identical ingredients within a recipe share one object.
+# to_dict() reproduces the exact parse_recipe shape.
+
+
+def _intern(value):
+    return intern(value) if value is not None else None
+
+
+class _Model:
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__
+        )
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, slot) for slot in self.__slots__))
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+class Text(_Model):
+    __slots__ = ("value",)
+    type = "text"
+
+    def __init__(self, value):
+        self.value = value
+
+    def to_dict(self):
+        return {"type": "text", "value": self.value}
+
+
+class Ingredient(_Model):
+    __slots__ = ("name", "quantity", "unit")
+    type = "ingredient"
+
+    def __init__(self, name, quantity=None, unit=None):
+        self.name = _intern(name)
+        self.quantity = _intern(quantity)
+        self.unit = _intern(unit)
+
+    def to_dict(self, component=False):
+        if component:
+            return {
+                "type": "ingredient",
+                "name": self.name,
+                "quantity": self.quantity,
+                "unit": self.unit,
+            }
+        return {"name": self.name, "quantity": self.quantity, "unit": self.unit}
+
+
+class Cookware(_Model):
+    __slots__ = ("name",)
+    type = "cookware"
+
+    def __init__(self, name):
+        self.name = _intern(name)
+
+    def to_dict(self):
+        return {"type": "cookware", "name": self.name}
+
+
+class Timer(_Model):
+    __slots__ = ("name", "duration")
+    type = "timer"
+
+    def __init__(self, name, duration):
+        self.name = _intern(name)
+        self.duration = _intern(duration)
+
+    def to_dict(self):
+        if self.name is None:
+            return {"type": "timer", "duration": self.duration}
+        return {"type": "timer", "name": self.name, "duration": self.duration}
+
+
+class Note(_Model):
+    __slots__ = ("name",)
+    type = "note"
+
+    def __init__(self, name):
+        self.name = name
+
+    def to_dict(self):
+        return {"type": "note", "name": self.name}
+
+
+class Comment(_Model):
+    __slots__ = ("name",)
+    type = "comment"
+
+    def __init__(self, name):
+        self.name = name
+
+    def to_dict(self):
+        return {"type": "comment", "name": self.name}
+
+
+class Image(_Model):
+    __slots__ = ("description", "path")
+
+    def __init__(self, description, path):
+        self.description = description
+        self.path = path
+
+    def to_dict(self):
+        return {"description": self.description, "path": self.path}
+
+
+class Condition(_Model):
+    __slots__ = ("ingredient", "condition", "action")
+
+    def __init__(self, ingredient, condition, action):
+        self.ingredient = _intern(ingredient)
+        self.condition = condition
+        self.action = action
+
+    def to_dict(self):
+        return {
+            "ingredient": self.ingredient,
+            "condition": self.condition,
+            "action": self.action,
+        }
+
+
+class Substitution(_Model):
+    __slots__ = ("primary", "substitute")
+
+    def __init__(self, primary, substitute):
+        self.primary = primary
+        self.substitute = substitute
+
+    def to_dict(self):
+        return {
+            "primary": self.primary.to_dict(),
+            "substitute": self.substitute.to_dict(),
+        }
+
+
+class Recipe(_Model):
+    __slots__ = (
+        "metadata",
+        "ingredients",
+        "cookware",
+        "steps",
+        "timers",
+        "conditions",
+        "substitutions",
+        "comments",
+        "images",
+    )
+
+    def __init__(
+        self,
+        metadata=None,
+        ingredients=(),
+        cookware=(),
+        steps=(),
+        timers=(),
+        conditions=(),
+        substitutions=(),
+        comments=(),
+        images=(),
+    ):
+        self.metadata = metadata or {}
+        self.ingredients = tuple(ingredients)
+        self.cookware = tuple(cookware)
+        self.steps = tuple(steps)
+        self.timers = tuple(timers)
+        self.conditions = tuple(conditions)
+        self.substitutions = tuple(substitutions)
+        self.comments = tuple(comments)
+        self.images = tuple(images)
+
+    def __hash__(self):
+        # metadata is the only mutable field; its items are hashed instead.
+        fields = tuple(getattr(self, slot) for slot in self.__slots__[1:])
+        return hash((frozenset(self.metadata.items()),) + fields)
+
+    @classmethod
+    def from_dict(cls, parsed_recipe):
+        ingredients = {}
+
+        def ingredient(item):
+            key = (item["name"], item["quantity"], item["unit"])
+            shared = ingredients.get(key)
+            if shared is None:
+                shared = ingredients[key] = Ingredient(*key)
+            return shared
+
+        steps = []
+        for component in parsed_recipe.get("steps", ()):
+            kind = component["type"]
+            if kind == "ingredient":
+                steps.append(ingredient(component))
+            elif kind == "cookware":
+                steps.append(Cookware(component["name"]))
+            elif kind == "timer":
+                steps.append(Timer(component.get("name"), component["duration"]))
+            elif kind == "note":
+                steps.append(Note(component["name"]))
+            else:
+                steps.append(Text(component["value"]))
+
+        return cls(
+            metadata={
+                intern(key): value
+                for key, value in parsed_recipe.get("metadata", {}).items()
+            },
+            ingredients=[ingredient(item) for item in parsed_recipe.get("ingredients", ())],
+            cookware=[intern(name) for name in parsed_recipe.get("cookware", ())],
+            steps=steps,
+            timers=[
+                (intern(name), intern(duration))
+                for name, duration in parsed_recipe.get("timers", ())
+            ],
+            conditions=[
+                Condition(item["ingredient"], item["condition"], item["action"])
+                for item in parsed_recipe.get("conditions", ())
+            ],
+            substitutions=[
+                Substitution(
+                    ingredient(item["primary"]), ingredient(item["substitute"])
+                )
+                for item in parsed_recipe.get("substitutions", ())
+            ],
+            comments=[Comment(item["name"]) for item in parsed_recipe.get("comments", ())],
+            images=[
+                Image(item["description"], item["path"])
+                for item in parsed_recipe.get("images", ())
+            ],
+        )
+
+    def to_dict(self):
+        parsed_recipe = {}
+        if self.metadata:
+            parsed_recipe["metadata"] = dict(self.metadata)
+        if self.ingredients:
+            parsed_recipe["ingredients"] = [
+                ingredient.to_dict() for ingredient in self.ingredients
+            ]
+        if self.cookware:
+            parsed_recipe["cookware"] = list(self.cookware)
+        if self.steps:
+            parsed_recipe["steps"] = [
+                step.to_dict(component=True)
+                if isinstance(step, Ingredient)
+                else step.to_dict()
+                for step in self.steps
+            ]
+        if self.timers:
+            parsed_recipe["timers"] = list(self.timers)
+        if self.conditions:
+            parsed_recipe["conditions"] = [
+                condition.to_dict() for condition in self.conditions
+            ]
+        if self.substitutions:
+            parsed_recipe["substitutions"] = [
+                substitution.to_dict() for substitution in self.substitutions
+            ]
+        if self.comments:
+            parsed_recipe["comments"] = [comment.to_dict() for comment in self.comments]
+        if self.images:
+            parsed_recipe["images"] = [image.to_dict() for image in self.images]
+        return parsed_recipe
@@ -1,9 +1,114 @@
-import re
-from .utils import parse_quantity_unit
+from time import perf_counter
+
+from . import batch, files, hardened, lexer, patterns, spans
+from .cache import ParseCache, shared_cache
+from .incremental import IncrementalRecipe
+from .model import Recipe
+from .quantity import normalize, parse_duration, parse_quantity
+from .utils import group_steps, parse_quantity_unit, timer_totals
+
+ENGINES = ("extractors", "lexer", "hardened")
+
+# Sections produced by the extractor engine, in output order. Comments are
+# extracted from the raw text before remove_comments; every other extractor
+# runs on the comment-free text.
+SECTIONS = (
+    ("metadata", "extract_metadata"),
+    ("ingredients", "extract_ingredients"),
+    ("cookware", "extract_cookware"),
+    ("steps", "extract_steps"),
+    ("timers", "extract_timers"),
+    ("conditions", "extract_conditions"),
+    ("substitutions", "extract_ingredient_substitutions"),
+    ("comments", "extract_comments"),
+    ("images", "extract_images"),
+)
+SECTION_NAMES = frozenset(section for section, _ in SECTIONS)
 
 
 class CooklangParser:
-    def parse_recipe(self, recipe_text):
+    def __init__(
+        self,
+        engine="extractors",
+        cache=None,
+        normalize_quantities=False,
+        profiler=None,
+        limits=None,
+        structured_steps=False,
+        timer_seconds=False,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        if engine == "hardened":
+            if limits is None:
+                limits = hardened.Limits()
+        elif limits is not None:
+            raise ValueError("Input limits require the hardened engine")
+        self.engine = engine
+        self.limits = limits
+        self.structured_steps = structured_steps
+        self.timer_seconds = timer_seconds
+        self.normalize_quantities = normalize_quantities
+        self.profiler = profiler
+        if cache is True:
+            cache = shared_cache
+        elif cache is False:
+            cache = None
+        elif isinstance(cache, int):
+            cache = ParseCache(cache)
+        self.cache = cache
+
+    def options(self):
+        options = (self.engine, self.normalize_quantities)
+        if self.limits is not None:
+            options += (self.limits,)
+        if self.structured_steps:
+            options += ("structured_steps",)
+        if self.timer_seconds:
+            options += ("timer_seconds",)
+        return options
+
+    def parse_recipe(self, recipe_text, sections=None):
+        if sections is not None:
+            if isinstance(sections, str):
+                sections = (sections,)
+            sections = frozenset(sections)
+            unknown = sections - SECTION_NAMES
+            if unknown:
+                raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+        if self.profiler is not None:
+            return self._call("parse_recipe", self._parse_cached, recipe_text, sections)
+        return self._parse_cached(recipe_text, sections)
+
+    def _parse_cached(self, recipe_text, sections=None):
+        if self.cache is None:
+            return self._parse_recipe(recipe_text, sections)
+        options = self.options()
+        if sections is not None:
+            options += (tuple(sorted(sections)),)
+        key = self.cache.key(recipe_text, options)
+        recipe = self.cache.get(key)
+        if recipe is None:
+            recipe = self._parse_recipe(recipe_text, sections)
+            self.cache.put(key, recipe)
+        return recipe
+
+    def _parse_recipe(self, recipe_text, sections=None):
+        parsed_recipe = self._parse_text(recipe_text, sections)
+        if self.timer_seconds and "steps" in parsed_recipe:
+            timing = timer_totals(parsed_recipe["steps"])
+            if timing:
+                parsed_recipe["timing"] = timing
+        return parsed_recipe
+
+    def _parse_text(self, recipe_text, sections=None):
+        if sections is not None or self.profiler is not None:
+            if sections is None:
+                sections = SECTION_NAMES
+            return self._parse_sections(recipe_text, sections)
+        if self.engine != "extractors":
+            return lexer.build_recipe(self.tokenize(recipe_text), self.structured_steps)
+
         comments = self.extract_comments(recipe_text)
         recipe_text = self.remove_comments(recipe_text)
 
@@ -45,20 +150,109 @@ class CooklangParser:
 
         return parsed_recipe
 
+    # Runs only the extractors for the requested sections, timing each one
+    # when a profiler is set. The straight-line pipeline in _parse_text is
+    # kept for plain full parses so they do not pay for the extra calls.
+    def _parse_sections(self, recipe_text, sections):
+        if self.engine != "extractors":
+            parsed_recipe = self._call(self.engine, self._parse_tokens, recipe_text)
+            if len(sections) == len(SECTION_NAMES):
+                return parsed_recipe
+            return {
+                section: value
+                for section, value in parsed_recipe.items()
+                if section in sections
+            }
+
+        comments = None
+        if "comments" in sections:
+            comments = self._call("extract_comments", self.extract_comments, recipe_text)
+        # Metadata lines never start with "--", so only block comments can
+        # change the metadata; the other extractors need comment-free text.
+        if sections - {"comments", "metadata"} or (
+            "metadata" in sections and "[-" in recipe_text
+        ):
+            recipe_text = self._call("remove_comments", self.remove_comments, recipe_text)
+
+        parsed_recipe = {}
+        for section, extractor in SECTIONS:
+            if section not in sections:
+                continue
+            if section == "comments":
+                value = comments
+            else:
+                value = self._call(extractor, getattr(self, extractor), recipe_text)
+            if value:
+                parsed_recipe[section] = value
+        return parsed_recipe
+
+    def _parse_tokens(self, recipe_text):
+        return lexer.build_recipe(self.tokenize(recipe_text), self.structured_steps)
+
+    def _call(self, stage, function, text, *args):
+        if self.profiler is None:
+            return function(text, *args)
+        start = perf_counter()
+        result = function(text, *args)
+        seconds = perf_counter() - start
+        self.profiler.record(stage, seconds, len(text.encode("utf-8")), len(result))
+        return result
+
+    def parse_lazy(self, recipe_text):
+        from .lazy import ParsedRecipe
+
+        return ParsedRecipe(self, recipe_text)
+
+    def parse_model(self, recipe_text):
+        if self.structured_steps:
+            raise ValueError("Recipe models need flat steps")
+        if self.normalize_quantities:
+            raise ValueError("Recipe models do not keep normalized quantities")
+        if self.timer_seconds:
+            raise ValueError("Recipe models do not keep timer durations")
+        return Recipe.from_dict(self.parse_recipe(recipe_text))
+
+    def parse_many(self, texts, workers=None, chunksize=32, ordered=True):
+        return batch.parse_many(self, texts, workers, chunksize, ordered)
+
+    def parse_file(self, path, encoding="utf-8"):
+        return files.parse_file(self, path, encoding)
+
+    def parse_directory(self, root, encoding="utf-8", workers=1, chunksize=32):
+        return files.parse_directory(self, root, encoding, workers, chunksize)
+
+    def read_metadata(self, source, encoding="utf-8"):
+        return files.read_metadata(self, source, encoding)
+
+    def scan_metadata(self, root, encoding="utf-8"):
+        return files.scan_metadata(self, root, encoding)
+
+    def parse_incremental(self, text=""):
+        if self.structured_steps:
+            raise ValueError("Incremental parsing produces flat steps only")
+        return IncrementalRecipe(self, text)
+
+    def tokenize(self, text, final=True, lazy=False):
+        if lazy:
+            return spans.tokenize(text, self, final)
+        if self.limits is not None:
+            return hardened.tokenize(text, self, self.limits, final)
+        return lexer.tokenize(text, self, final)
+
     def remove_comments(self, text):
-        text = re.sub(r"^\s*--.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"\[-.*?-\]", "", text, flags=re.DOTALL)
+        text = patterns.LINE_COMMENT_LINE.sub("", text)
+        text = patterns.BLOCK_COMMENT.sub("", text)
         return text
 
     def extract_comments(self, text):
         comments = []
         lines = text.split("\n")
         for line in lines:
-            match = re.match(r"^\s*--\s*(.+)", line)
+            match = patterns.LINE_COMMENT.match(line)
             if match:
                 comments.append({"type": "comment", "name": match.group(1).strip()})
 
-        block_comments = re.findall(r"\[-(.*?)\-\]", text, re.DOTALL)
+        block_comments = patterns.BLOCK_COMMENT.findall(text)
         for comment in block_comments:
             comments.append({"type": "comment", "name": comment.strip()})
 
@@ -70,7 +264,7 @@ class CooklangParser:
         for line in lines:
             line = line.strip()
             if line.startswith(">>"):
-                match = re.match(r"^>>\s*(\w+)\s*:\s*(.*)$", line)
+                match = patterns.METADATA.match(line)
                 if match:
                     key, value = match.groups()
                     metadata[key.lower()] = value.strip()
@@ -81,10 +275,12 @@ class CooklangParser:
         seen = set()
         detailed_seen = set()
 
-        detailed_matches = re.findall(r"@([\w\s&-]+)\{([^}]*)\}", text)
+        detailed_matches = patterns.INGREDIENT.findall(text)
         for name, details in detailed_matches:
             quantity, unit = parse_quantity_unit(details.strip())
             ingredient = {"name": name.strip(), "quantity": quantity, "unit": unit}
+            if self.normalize_quantities:
+                ingredient.update(self.quantity_fields(details))
             ingredient_tuple = (
                 ingredient["name"],
                 ingredient["quantity"],
@@ -95,11 +291,13 @@ class CooklangParser:
                 detailed_seen.add(ingredient["name"])
                 ingredients.append(ingredient)
 
-        simple_matches = re.findall(r"@([\w\s&-]+)\{([^}]*)\}|\b@([\w&-]+)\b", text)
+        simple_matches = patterns.INGREDIENT_OR_BARE.findall(text)
         for match in simple_matches:
             name = match[0] or match[2]
             if "{" not in name.strip() and name.strip() not in detailed_seen:
                 ingredient = {"name": name.strip(), "quantity": None, "unit": None}
+                if self.normalize_quantities:
+                    ingredient.update(self.quantity_fields(""))
                 ingredient_tuple = (ingredient["name"], ingredient["quantity"], "unit")
                 if ingredient_tuple not in seen:
                     seen.add(ingredient_tuple)
@@ -108,23 +306,28 @@ class CooklangParser:
         return sorted(ingredients, key=lambda x: x["name"])
 
     def extract_cookware(self, text):
-        multi_word_cookware = re.findall(r"#([^\s][\w\s-]*[^\s])\{\}", text)
-        single_word_cookware = re.findall(r"#(\w+)\b(?![\w\s-]*\{\})", text)
+        multi_word_cookware = patterns.COOKWARE_MULTI_WORD.findall(text)
+        single_word_cookware = patterns.COOKWARE_SINGLE_WORD.findall(text)
 
         cookware = list(dict.fromkeys(multi_word_cookware + single_word_cookware))
         return sorted(cookware)
 
     def extract_steps(self, text):
+        # Blank lines, which include lines that only held comments, and
+        # metadata lines end a paragraph.
         steps = []
+        paragraphs = []
+        in_paragraph = False
         for line in text.split("\n"):
             line = line.strip()
             if not line or line.startswith(">>"):
+                in_paragraph = False
                 continue
+            if not in_paragraph:
+                paragraphs.append(len(steps))
+                in_paragraph = True
             step = []
-            matches = re.finditer(
-                r"(@[\w\s-]+\{[^}]*\}|#[\w\s-]+\{\}|#[\w]+|~[\w\s-]*\{[^}]*\}|~\{[^}]*\}|\+[\w\s-]+\{\})",
-                line,
-            )
+            matches = patterns.STEP_COMPONENT.finditer(line)
             last_end = 0
             for match in matches:
                 if match.start() > last_end:
@@ -139,47 +342,58 @@ class CooklangParser:
             if last_end < len(line):
                 step.append({"type": "text", "value": line[last_end:].strip()})
             steps.extend(step)
+        if self.structured_steps:
+            return group_steps(steps, paragraphs)
         return steps
 
     def parse_step_component(self, component):
         if component.startswith("@"):
-            match = re.match(r"@([\w\s&-]+)\{([^}]*)\}", component)
+            match = patterns.INGREDIENT.match(component)
             if match:
                 name, details = match.groups()
                 quantity, unit = parse_quantity_unit(details.strip())
-                return {
+                ingredient = {
                     "type": "ingredient",
                     "name": name.strip(),
                     "quantity": quantity,
                     "unit": unit,
                 }
+                if self.normalize_quantities:
+                    ingredient.update(self.quantity_fields(details))
+                return ingredient
         elif component.startswith("#"):
-            name_match = re.match(r"#([^\s][\w\s-]*[^\s])\{\}", component)
+            name_match = patterns.COOKWARE_MULTI_WORD.match(component)
             if name_match:
                 name = name_match.group(1)
                 return {"type": "cookware", "name": name.strip()}
             else:
-                name_match = re.match(r"#(\w+)", component)
+                name_match = patterns.COOKWARE_WORD.match(component)
                 if name_match:
                     name = name_match.group(1)
                     return {"type": "cookware", "name": name.strip()}
                 else:
                     return {"type": "text", "value": component}
         elif component.startswith("~"):
-            duration_match = re.match(r"~([\w\s°-]*)\{([^}]*)\}", component)
+            duration_match = patterns.NAMED_TIMER.match(component)
             if duration_match:
                 timer_name = duration_match.group(1).strip()
                 duration = duration_match.group(2).strip()
-                return {"type": "timer", "name": timer_name, "duration": duration}
+                timer = {"type": "timer", "name": timer_name, "duration": duration}
+                if self.timer_seconds:
+                    timer["seconds"] = parse_duration(duration)
+                return timer
 
-            duration_match = re.match(r"~\{([^}]*)\}", component)
+            duration_match = patterns.UNNAMED_TIMER.match(component)
             if duration_match:
                 duration = duration_match.group(1).strip()
-                return {"type": "timer", "duration": duration}
+                timer = {"type": "timer", "duration": duration}
+                if self.timer_seconds:
+                    timer["seconds"] = parse_duration(duration)
+                return timer
 
             raise ValueError(f"Invalid timer format: {component}")
         elif component.startswith("+"):
-            match = re.match(r"\+([\w\s&-]+)\{\}", component)
+            match = patterns.NOTE.match(component)
             if match:
                 name = match.group(1)
                 return {"type": "note", "name": name.strip()}
@@ -189,80 +403,88 @@ class CooklangParser:
             return {"type": "text", "value": component}
 
     def extract_timers(self, text):
-        timers = re.findall(r"~([\w\s@#-]*)\{(\d+%?[a-zA-Z\s]+)\}", text)
+        timers = patterns.TIMER.findall(text)
         return timers
 
     def extract_conditions(self, text):
         conditions = []
-        pattern = re.compile(r"If @([\w\s-]+)\{\} is ([\w\s-]+), (.*?)(?:\.|$)")
-        matches = pattern.findall(text)
+        matches = patterns.CONDITION.findall(text)
 
         for match in matches:
-            ingredient, condition, action = match
-            action_components = []
-            for part in re.split(
-                r"(@[\w\s-]+\{[^}]*\}|#[\w\s-]+\{\}|#[\w]+|~[\w\s-]*\{[^}]*\}|~\{[^}]*\}|\+[\w\s-]+\{\})",
-                action,
-            ):
-                part = part.strip()
-                if part:
-                    if part.startswith(("@", "#", "~", "+")):
-                        component = self.parse_step_component(part)
-                        if component["type"] == "ingredient":
-                            action_components.append(component["name"])
-                        elif component["type"] == "cookware":
-                            action_components.append(component["name"])
-                        elif component["type"] == "timer":
-                            duration = component["duration"].replace("%", " ")
-                            action_components.append(duration)
-                        elif component["type"] == "note":
-                            action_components.append(component["name"])
-                    else:
-                        action_components.append(part)
-
-            action_text = " ".join(action_components).strip()
-            conditions.append(
-                {
-                    "ingredient": ingredient.strip(),
-                    "condition": condition.strip(),
-                    "action": action_text,
-                }
-            )
+            conditions.append(self.parse_condition(match))
 
         return conditions
 
+    def parse_condition(self, match):
+        ingredient, condition, action = match
+        action_components = []
+        if self.engine == "hardened":
+            parts = hardened.split_components(action)
+        else:
+            parts = patterns.STEP_COMPONENT.split(action)
+        for part in parts:
+            part = part.strip()
+            if part:
+                if part.startswith(("@", "#", "~", "+")):
+                    component = self.parse_step_component(part)
+                    if component["type"] == "ingredient":
+                        action_components.append(component["name"])
+                    elif component["type"] == "cookware":
+                        action_components.append(component["name"])
+                    elif component["type"] == "timer":
+                        duration = component["duration"].replace("%", " ")
+                        action_components.append(duration)
+                    elif component["type"] == "note":
+                        action_components.append(component["name"])
+                else:
+                    action_components.append(part)
+
+        action_text = " ".join(action_components).strip()
+        return {
+            "ingredient": ingredient.strip(),
+            "condition": condition.strip(),
+            "action": action_text,
+        }
+
     def extract_ingredient_substitutions(self, text):
         substitutions = []
-        matches = re.findall(
-            r"@([\w\s-]+)\{(\d+[a-zA-Z]*)\} \(or @([\w\s-]+)\{(\d+[a-zA-Z]*)\}\)", text
-        )
+        matches = patterns.SUBSTITUTION.findall(text)
         for match in matches:
-            primary_name, primary_details, substitute_name, substitute_details = match
-            primary_quantity, primary_unit = parse_quantity_unit(
-                primary_details.strip()
-            )
-            substitute_quantity, substitute_unit = parse_quantity_unit(
-                substitute_details.strip()
-            )
-            substitutions.append(
-                {
-                    "primary": {
-                        "name": primary_name.strip(),
-                        "quantity": primary_quantity,
-                        "unit": primary_unit,
-                    },
-                    "substitute": {
-                        "name": substitute_name.strip(),
-                        "quantity": substitute_quantity,
-                        "unit": substitute_unit,
-                    },
-                }
-            )
+            substitutions.append(self.parse_substitution(match))
         return substitutions
 
+    def parse_substitution(self, match):
+        primary_name, primary_details, substitute_name, substitute_details = match
+        primary_quantity, primary_unit = parse_quantity_unit(primary_details.strip())
+        substitute_quantity, substitute_unit = parse_quantity_unit(
+            substitute_details.strip()
+        )
+        substitution = {
+            "primary": {
+                "name": primary_name.strip(),
+                "quantity": primary_quantity,
+                "unit": primary_unit,
+            },
+            "substitute": {
+                "name": substitute_name.strip(),
+                "quantity": substitute_quantity,
+                "unit": substitute_unit,
+            },
+        }
+        if self.normalize_quantities:
+            substitution["primary"].update(self.quantity_fields(primary_details))
+            substitution["substitute"].update(
+                self.quantity_fields(substitute_details)
+            )
+        return substitution
+
+    def quantity_fields(self, details):
+        amount = parse_quantity(details.strip())
+        return {"amount": amount, "base_amount": normalize(amount)}
+
     def extract_images(self, text):
         images = []
-        image_matches = re.findall(r"!\[(.*?)\]\((.*?)\)", text)
+        image_matches = patterns.IMAGE.findall(text)
         for description, path in image_matches:
             images.append({"description": description.strip(), "path": path.strip()})
         return images
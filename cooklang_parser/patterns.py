@@ -0,0 +1,29 @@
+import re
+
+LINE_COMMENT_LINE = re.compile(r"^\s*--.*$", re.MULTILINE)
+LINE_COMMENT_START = re.compile(r"\s*--")
+LINE_COMMENT = re.compile(r"^\s*--\s*(.+)")
+BLOCK_COMMENT = re.compile(r"\[-(.*?)\-\]", re.DOTALL)
+METADATA = re.compile(r"^>>\s*(\w+)\s*:\s*(.*)$")
+
+INGREDIENT = re.compile(r"@([\w\s&-]+)\{([^}]*)\}")
+INGREDIENT_OR_BARE = re.compile(r"@([\w\s&-]+)\{([^}]*)\}|\b@([\w&-]+)\b")
+COOKWARE_MULTI_WORD = re.compile(r"#([^\s][\w\s-]*[^\s])\{\}")
+COOKWARE_SINGLE_WORD = re.compile(r"#(\w+)\b(?![\w\s-]*\{\})")
+COOKWARE_WORD = re.compile(r"#(\w+)")
+NAMED_TIMER = re.compile(r"~([\w\s°-]*)\{([^}]*)\}")
+UNNAMED_TIMER = re.compile(r"~\{([^}]*)\}")
+NOTE = re.compile(r"\+([\w\s&-]+)\{\}")
+
+STEP_COMPONENT = re.compile(
+    r"(@[\w\s-]+\{[^}]*\}|#[\w\s-]+\{\}|#[\w]+|~[\w\s-]*\{[^}]*\}|~\{[^}]*\}|\+[\w\s-]+\{\})"
+)
+TIMER = re.compile(r"~([\w\s@#-]*)\{(\d+%?[a-zA-Z\s]+)\}")
+CONDITION = re.compile(r"If @([\w\s-]+)\{\} is ([\w\s-]+), (.*?)(?:\.|$)")
+LINE_CONDITION = re.compile(r"If @([\w\s-]+)\{\} is ([\w\s-]+), (.*?)\.")
+SUBSTITUTION = re.compile(
+    r"@([\w\s-]+)\{(\d+[a-zA-Z]*)\} \(or @([\w\s-]+)\{(\d+[a-zA-Z]*)\}\)"
+)
+IMAGE = re.compile(r"!\[(.*?)\]\((.*?)\)")
+
+QUANTITY_UNIT = re.compile(r"(\d+/\d+|\d+)?%?(\s*[a-zA-Z]+)?", re.IGNORECASE)
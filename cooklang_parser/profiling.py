@@ -0,0 +1,94 @@
+import threading
+
+# A profiler is any object with a record(stage, seconds, input_bytes,
+# output_size) method. CooklangParser calls it once per extractor (or once
+# for the whole lexer pass) and once per recipe with the stage
+# "parse_recipe", so the extractor records that precede a "parse_recipe"
+# record belong to that recipe. To be used with parse_many workers a
+# profiler also needs merge(other) and clear(), like ParseProfile.
+
+RECIPE_STAGE = "parse_recipe"
+
+
+class StageStats:
+    __slots__ = ("calls", "seconds", "max_seconds", "input_bytes", "output_size")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.input_bytes = 0
+        self.output_size = 0
+
+    def add(self, seconds, input_bytes, output_size):
+        self.calls += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.input_bytes += input_bytes
+        self.output_size += output_size
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+        self.input_bytes += other.input_bytes
+        self.output_size += other.output_size
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class ParseProfile:
+    def __init__(self, keep_recipes=False):
+        self.keep_recipes = keep_recipes
+        self.stages = {}
+        self.recipes = []
+        self._current = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {
+            "keep_recipes": self.keep_recipes,
+            "stages": self.stages,
+            "recipes": self.recipes,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state["keep_recipes"])
+        self.stages = state["stages"]
+        self.recipes = state["recipes"]
+
+    def record(self, stage, seconds, input_bytes, output_size):
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.add(seconds, input_bytes, output_size)
+            if not self.keep_recipes:
+                return
+            if stage != RECIPE_STAGE:
+                self._current[stage] = self._current.get(stage, 0.0) + seconds
+                return
+            self.recipes.append(
+                {"seconds": seconds, "input_bytes": input_bytes, "stages": self._current}
+            )
+            self._current = {}
+
+    def merge(self, other):
+        with self._lock:
+            for stage, stats in other.stages.items():
+                if stage not in self.stages:
+                    self.stages[stage] = StageStats()
+                self.stages[stage].merge(stats)
+            if self.keep_recipes:
+                self.recipes.extend(other.recipes)
+        return self
+
+    def clear(self):
+        with self._lock:
+            self.stages = {}
+            self.recipes = []
+            self._current = {}
+
+    def as_dict(self):
+        return {stage: stats.as_dict() for stage, stats in self.stages.items()}
@@ -0,0 +1,151 @@
+import re
+from collections import namedtuple
+from fractions import Fraction
+from functools import lru_cache
+
+Quantity = namedtuple("Quantity", ["value", "maximum", "unit"])
+
+UNITS = {
+    "g": ("mass", Fraction(1)),
+    "kg": ("mass", Fraction(1000)),
+    "mg": ("mass", Fraction(1, 1000)),
+    "lb": ("mass", Fraction(45359237, 100000)),
+    "oz": ("mass", Fraction(45359237, 1600000)),
+    "ml": ("volume", Fraction(1)),
+    "l": ("volume", Fraction(1000)),
+    "cup": ("volume", Fraction(473176473, 2000000)),
+    "tbsp": ("volume", Fraction(473176473, 32000000)),
+    "tsp": ("volume", Fraction(473176473, 96000000)),
+    "s": ("time", Fraction(1)),
+    "min": ("time", Fraction(60)),
+    "h": ("time", Fraction(3600)),
+    "d": ("time", Fraction(86400)),
+}
+BASE_UNITS = {"mass": "g", "volume": "ml", "time": "s"}
+
+UNIT_ALIASES = {
+    alias: unit
+    for unit, aliases in {
+        "g": ["g", "gr", "gram", "grams", "gramme", "grammes"],
+        "kg": ["kg", "kilo", "kilos", "kilogram", "kilograms"],
+        "mg": ["mg", "milligram", "milligrams"],
+        "lb": ["lb", "lbs", "pound", "pounds"],
+        "oz": ["oz", "ounce", "ounces"],
+        "ml": ["ml", "milliliter", "milliliters", "millilitre", "millilitres"],
+        "l": ["l", "liter", "liters", "litre", "litres"],
+        "cup": ["cup", "cups", "c"],
+        "tbsp": ["tbsp", "tbs", "tablespoon", "tablespoons"],
+        "tsp": ["tsp", "teaspoon", "teaspoons"],
+        "s": ["s", "sec", "secs", "second", "seconds"],
+        "min": ["min", "mins", "minute", "minutes"],
+        "h": ["h", "hr", "hrs", "hour", "hours"],
+        "d": ["d", "day", "days"],
+    }.items()
+    for alias in aliases
+}
+
+VULGAR_FRACTIONS = {
+    "½": "1/2",
+    "⅓": "1/3",
+    "⅔": "2/3",
+    "¼": "1/4",
+    "¾": "3/4",
+    "⅛": "1/8",
+}
+
+# A quantity is an amount, an optional "%", and an optional unit of letters
+# that may end with a ".". Surrounding whitespace is stripped and the unit
+# and "%" are split off from the end by hand. The amount must then match
+# AMOUNT whole. No two whitespace runs of the pattern are adjacent, so a
+# failed match cannot try every way of sharing out a run of spaces, and
+# the time taken stays linear in the length of the details.
+NUMBER = r"\d+\s+\d+/\d+|\d+/\d+|\d*[.,]\d+|\d+"
+AMOUNT = re.compile(
+    rf"(?P<value>{NUMBER})(?:\s*(?:-|–|to)\s*(?P<maximum>{NUMBER}))?"
+)
+
+
+def parse_number(text):
+    if " " in text.strip():
+        whole, fraction = text.split()
+        return Fraction(whole) + Fraction(fraction)
+    return Fraction(text.replace(",", "."))
+
+
+def is_unit_character(character):
+    # Matches [^\W\d]: a word character that is not a decimal digit.
+    return (character.isalnum() or character == "_") and not character.isdecimal()
+
+
+def split_unit(details):
+    # The details without their trailing unit, and the unit or None.
+    end = len(details)
+    if details.endswith("."):
+        end -= 1
+    start = end
+    while start and is_unit_character(details[start - 1]):
+        start -= 1
+    if start == end:
+        return details, None
+    return details[:start], details[start:]
+
+
+def canonical_unit(unit):
+    if unit is None:
+        return None
+    return UNIT_ALIASES.get(unit.lower().rstrip("."))
+
+
+@lru_cache(maxsize=4096)
+def parse_quantity(details):
+    for symbol, fraction in VULGAR_FRACTIONS.items():
+        if symbol in details:
+            details = details.replace(symbol, " " + fraction).replace("  ", " ")
+    amount, unit = split_unit(details.strip())
+    amount = amount.rstrip()
+    if amount.endswith("%"):
+        amount = amount[:-1].rstrip()
+    match = AMOUNT.fullmatch(amount)
+    if not match:
+        return None
+    try:
+        value = parse_number(match.group("value"))
+        maximum = match.group("maximum")
+        maximum = parse_number(maximum) if maximum else value
+    except (ValueError, ZeroDivisionError):
+        return None
+    return Quantity(value, maximum, canonical_unit(unit) if unit else None)
+
+
+def convert(value, from_unit, to_unit, density=None):
+    source = UNITS.get(canonical_unit(from_unit))
+    target = UNITS.get(canonical_unit(to_unit))
+    if source is None or target is None:
+        raise ValueError(f"Cannot convert {from_unit} to {to_unit}")
+    value = Fraction(value) * source[1]
+    if source[0] != target[0]:
+        if "time" in (source[0], target[0]):
+            raise ValueError(f"Cannot convert {from_unit} to {to_unit}")
+        if density is None:
+            raise ValueError(f"Converting {from_unit} to {to_unit} needs a density")
+        # density is in grams per millilitre
+        density = Fraction(density)
+        value = value * density if source[0] == "volume" else value / density
+    return value / target[1]
+
+
+def normalize(quantity):
+    if quantity is None or quantity.unit not in UNITS:
+        return None
+    kind, factor = UNITS[quantity.unit]
+    return Quantity(quantity.value * factor, quantity.maximum * factor, BASE_UNITS[kind])
+
+
+@lru_cache(maxsize=4096)
+def parse_duration(duration):
+    # A timer duration such as "10%minutes", "1/2%hour" or "10-15 min" as a
+    # Quantity in seconds, or None when it has no number or no time unit.
+    seconds = normalize(parse_quantity(duration))
+    if seconds is None or seconds.unit != BASE_UNITS["time"]:
+        return None
+    return seconds
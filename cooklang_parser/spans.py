@@ -0,0 +1,201 @@
+from . import hardened, lexer
+from .hardened import iter_components, iter_conditions, iter_images
+from .patterns import (
+    CONDITION,
+    COOKWARE_MULTI_WORD,
+    COOKWARE_WORD,
+    IMAGE,
+    METADATA,
+    SUBSTITUTION,
+)
+
+# Span-only tokenization: the same token stream as CooklangParser.tokenize,
+# but text runs, step components, metadata, conditions, substitutions and
+# images are emitted as LazyTokens holding their type, line, span and a
+# reference to the scanned line. No substring is copied and no markup is
+# parsed until text or value is read; value is then computed once, exactly
+# as the eager token has it. This suits consumers that only need the kinds
+# and positions of tokens, such as syntax highlighting. Comments come from
+# the block comment pass of lexer.tokenize and stay eager.
+#
+# Markup is found with the linear-time scanner of the hardened engine,
+# which matches the same spans as the regular expressions of the lexer.
+
+SIGIL_TYPES = {"@": "ingredient", "~": "timer", "+": "note"}
+
+RUN, COMPONENT, METADATA_LINE, CONDITION_MATCH, SUBSTITUTION_MATCH, IMAGE_MATCH = (
+    range(6)
+)
+
+
+class LazyToken:
+    __slots__ = (
+        "type",
+        "line",
+        "start",
+        "end",
+        "_source",
+        "_span",
+        "_kind",
+        "_parser",
+        "_value",
+    )
+
+    def __init__(self, type, line, start, end, source, span, kind, parser):
+        self.type = type
+        self.line = line
+        self.start = start
+        self.end = end
+        self._source = source
+        self._span = span
+        self._kind = kind
+        self._parser = parser
+        self._value = None
+
+    @property
+    def text(self):
+        begin, stop = self._span
+        return self._source[begin:stop]
+
+    @property
+    def value(self):
+        parser = self._parser
+        if parser is not None:
+            if parser.engine == "hardened":
+                try:
+                    self._value = self._materialize(parser)
+                except (TypeError, ZeroDivisionError) as error:
+                    raise ValueError(f"Malformed recipe: {error}") from error
+            else:
+                self._value = self._materialize(parser)
+            self._parser = None
+        return self._value
+
+    def _materialize(self, parser):
+        text = self.text
+        kind = self._kind
+        if kind == RUN:
+            return text.strip()
+        if kind == COMPONENT:
+            return parser.parse_step_component(text)
+        if kind == METADATA_LINE:
+            key, value = METADATA.match(text).groups()
+            return (key.lower(), value.strip())
+        if kind == CONDITION_MATCH:
+            return parser.parse_condition(CONDITION.match(text).groups())
+        if kind == SUBSTITUTION_MATCH:
+            return parser.parse_substitution(SUBSTITUTION.match(text).groups())
+        description, path = IMAGE.match(text).groups()
+        return {"description": description.strip(), "path": path.strip()}
+
+    def _replace(self, start, end):
+        token = LazyToken(
+            self.type,
+            self.line,
+            start,
+            end,
+            self._source,
+            self._span,
+            self._kind,
+            self._parser,
+        )
+        token._value = self._value
+        return token
+
+    def __repr__(self):
+        return (
+            f"LazyToken(type={self.type!r}, line={self.line}, "
+            f"start={self.start}, end={self.end})"
+        )
+
+
+def component_type(line, start, end):
+    kind = SIGIL_TYPES.get(line[start])
+    if kind is not None:
+        return kind
+    # "#" markup that names no cookware is kept as text by
+    # parse_step_component.
+    if COOKWARE_MULTI_WORD.match(line, start, end) or COOKWARE_WORD.match(
+        line, start, end
+    ):
+        return "cookware"
+    return "text"
+
+
+def scan_line(line, number, final, parser, base=0):
+    stripped = line.strip()
+    if not stripped:
+        return
+    if len(stripped) != len(line):
+        base += line.find(stripped[0])
+    line = stripped
+    size = len(line)
+    if line.startswith(">>"):
+        if METADATA.match(line):
+            span = (0, size)
+            yield LazyToken(
+                "metadata", number, base, base + size, line, span, METADATA_LINE, parser
+            )
+        return
+
+    last_end = 0
+    for start, end in iter_components(line):
+        if start > last_end:
+            span = (last_end, start)
+            yield LazyToken(
+                "text", number, base + last_end, base + start, line, span, RUN, parser
+            )
+        kind = component_type(line, start, end)
+        yield LazyToken(
+            kind, number, base + start, base + end, line, (start, end), COMPONENT, parser
+        )
+        last_end = end
+    if last_end < size:
+        span = (last_end, size)
+        yield LazyToken(
+            "text", number, base + last_end, base + size, line, span, RUN, parser
+        )
+
+    if "If @" in line:
+        for start, end, _ in iter_conditions(line, final):
+            yield LazyToken(
+                "condition",
+                number,
+                base + start,
+                base + end,
+                line,
+                (start, end),
+                CONDITION_MATCH,
+                parser,
+            )
+    if "(or @" in line:
+        for match in SUBSTITUTION.finditer(line):
+            start, end = match.span()
+            yield LazyToken(
+                "substitution",
+                number,
+                base + start,
+                base + end,
+                line,
+                (start, end),
+                SUBSTITUTION_MATCH,
+                parser,
+            )
+    if "![" in line:
+        for start, end, _ in iter_images(line):
+            yield LazyToken(
+                "image",
+                number,
+                base + start,
+                base + end,
+                line,
+                (start, end),
+                IMAGE_MATCH,
+                parser,
+            )
+
+
+def tokenize(text, parser, final=True):
+    if parser.limits is not None:
+        return hardened.tokenize(text, parser, parser.limits, final, scan_line)
+    return lexer.tokenize(text, parser, final, scan_line)
@@ -0,0 +1,95 @@
+import os
+import pickle
+import sqlite3
+
+from .cache import text_digest
+from .files import iter_cook_files
+
+# Bump whenever the shape or content of parse results changes, so entries
+# written by an older parser are ignored.
+PARSER_VERSION = "1"
+
+
+class DiskCache:
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS recipes ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, "
+            "digest BLOB, version TEXT, recipe BLOB)"
+        )
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._connection.commit()
+        self._connection.close()
+
+    def version(self, parser):
+        return f"{PARSER_VERSION}:{'/'.join(map(str, parser.options()))}"
+
+    def parse_file(self, parser, path, encoding="utf-8"):
+        path = os.fspath(path)
+        stat = os.stat(path)
+        version = self.version(parser)
+        row = self._connection.execute(
+            "SELECT mtime_ns, size, digest, version, recipe FROM recipes "
+            "WHERE path = ?",
+            (path,),
+        ).fetchone()
+
+        if row is not None and row[3] == version:
+            if row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+                self.hits += 1
+                return pickle.loads(row[4])
+
+        with open(path, encoding=encoding) as recipe_file:
+            text = recipe_file.read()
+        digest = text_digest(text)
+
+        if row is not None and row[3] == version and row[2] == digest:
+            # Touched but unchanged: refresh the stat fields only.
+            self._connection.execute(
+                "UPDATE recipes SET mtime_ns = ?, size = ? WHERE path = ?",
+                (stat.st_mtime_ns, stat.st_size, path),
+            )
+            self.hits += 1
+            return pickle.loads(row[4])
+
+        self.misses += 1
+        recipe = parser.parse_recipe(text)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO recipes VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                path,
+                stat.st_mtime_ns,
+                stat.st_size,
+                digest,
+                version,
+                pickle.dumps(recipe, pickle.HIGHEST_PROTOCOL),
+            ),
+        )
+        return recipe
+
+    def parse_directory(self, parser, root, encoding="utf-8"):
+        try:
+            for path in iter_cook_files(root):
+                yield path, self.parse_file(parser, path, encoding)
+        finally:
+            self._connection.commit()
+
+    def prune(self, paths):
+        keep = set(map(os.fspath, paths))
+        stored = [row[0] for row in self._connection.execute("SELECT path FROM recipes")]
+        stale = [(path,) for path in stored if path not in keep]
+        self._connection.executemany("DELETE FROM recipes WHERE path = ?", stale)
+        self._connection.commit()
+        return len(stale)
@@ -0,0 +1,139 @@
+import random
+
+# Seeded generator for synthetic .cook corpora, shared by the tests and the
+# benchmarks. The same profile, count and seed always produce the same
+# texts, so timings from different releases are measured on identical input.
+
+INGREDIENTS = [
+    "flour",
+    "sugar",
+    "eggs",
+    "butter",
+    "milk",
+    "salt",
+    "olive oil",
+    "garlic",
+    "onion",
+    "tomatoes",
+    "maple syrup",
+    "baking powder",
+    "chicken breast",
+    "black pepper",
+    "parmesan cheese",
+    "basil",
+]
+UNITS = ["g", "kg", "ml", "l", "tbsp", "tsp", "cup", "oz", "lb", ""]
+QUANTITIES = ["1", "2", "3", "1/2", "1/4", "250", "500", "1.5", "2-3"]
+COOKWARE = ["pot", "pan", "bowl", "oven", "large pan", "baking sheet", "whisk"]
+TIMER_UNITS = ["minutes", "hours", "seconds"]
+VERBS = ["Mix", "Add", "Stir", "Bake", "Chop", "Whisk", "Fold", "Boil", "Fry"]
+WORDS = (
+    "until smooth and golden then set aside while the rest of the dish "
+    "comes together gently over low heat"
+).split()
+METADATA = ["source", "servings", "time required", "course", "author"]
+
+# steps: step lines per recipe, markup: chance that a word slot carries
+# markup, comment_lines: length of block comments, comment_every: one block
+# comment every n steps (0 for none).
+PROFILES = {
+    "small": {"steps": 6, "markup": 0.25, "comment_lines": 1, "comment_every": 0},
+    "medium": {"steps": 40, "markup": 0.25, "comment_lines": 2, "comment_every": 10},
+    "huge": {"steps": 800, "markup": 0.25, "comment_lines": 2, "comment_every": 50},
+    "dense": {"steps": 40, "markup": 0.9, "comment_lines": 1, "comment_every": 0},
+    "comments": {"steps": 20, "markup": 0.2, "comment_lines": 60, "comment_every": 2},
+    "adversarial": {"steps": 40, "markup": 0.0, "comment_lines": 0, "comment_every": 0},
+}
+
+
+def ingredient(rng):
+    name = rng.choice(INGREDIENTS)
+    roll = rng.random()
+    if roll < 0.15 and " " not in name:
+        return f"@{name}"
+    if roll < 0.25:
+        return f"@{name}{{}}"
+    unit = rng.choice(UNITS)
+    quantity = rng.choice(QUANTITIES)
+    return f"@{name}{{{quantity}%{unit}}}" if unit else f"@{name}{{{quantity}}}"
+
+
+def cookware(rng):
+    name = rng.choice(COOKWARE)
+    return f"#{name}{{}}" if " " in name or rng.random() < 0.3 else f"#{name}"
+
+
+def timer(rng):
+    amount = rng.randint(1, 90)
+    unit = rng.choice(TIMER_UNITS)
+    if rng.random() < 0.5:
+        return f"~{{{amount}%{unit}}}"
+    return f"~{rng.choice(VERBS).lower()}{{{amount}%{unit}}}"
+
+
+MARKUP = [ingredient, ingredient, ingredient, cookware, timer]
+
+
+def step(rng, markup):
+    parts = [rng.choice(VERBS)]
+    for _ in range(rng.randint(6, 16)):
+        if rng.random() < markup:
+            parts.append(rng.choice(MARKUP)(rng))
+        else:
+            parts.append(rng.choice(WORDS))
+    line = " ".join(parts) + "."
+    roll = rng.random()
+    if roll < 0.05:
+        line += f" If @{rng.choice(INGREDIENTS)}{{}} is ready, skip the next step."
+    elif roll < 0.1:
+        line += " Use @butter{50g} (or @margarine{50g}) for frying."
+    elif roll < 0.13:
+        line += " ![Plate](images/plate.jpg)"
+    if rng.random() < 0.1:
+        line += " -- " + " ".join(rng.choices(WORDS, k=5))
+    return line
+
+
+def block_comment(rng, lines):
+    body = [" ".join(rng.choices(WORDS, k=10)) for _ in range(lines)]
+    return "[- " + "\n".join(body) + " -]"
+
+
+def adversarial_line(rng):
+    # Near-miss markup: sigils without closing braces, stray comment openers
+    # and long unbroken runs that make backtracking patterns work hard.
+    kind = rng.randrange(5)
+    if kind == 0:
+        return "@" + " ".join(rng.choices(WORDS, k=60)) + " {" * 20
+    if kind == 1:
+        return "#" + "-".join(rng.choices(WORDS, k=80))
+    if kind == 2:
+        return "~" + "{" * 200 + "%" * 50
+    if kind == 3:
+        return "[- " + " ".join(rng.choices(WORDS, k=40)) + " - ] -" * 10
+    return " ".join("@" + word for word in rng.choices(WORDS, k=120)) + "."
+
+
+def generate_recipe(rng, profile):
+    settings = PROFILES[profile]
+    lines = [f"-- {' '.join(rng.choices(WORDS, k=6))}"]
+    for key in rng.sample(METADATA, rng.randint(1, len(METADATA))):
+        lines.append(f">> {key}: {' '.join(rng.choices(WORDS, k=2))}")
+    for index in range(settings["steps"]):
+        if profile == "adversarial":
+            lines.append(adversarial_line(rng))
+        else:
+            lines.append(step(rng, settings["markup"]))
+        every = settings["comment_every"]
+        if every and index % every == every - 1:
+            lines.append(block_comment(rng, settings["comment_lines"]))
+        if rng.random() < 0.2:
+            lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(profile, count, seed=0):
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile}")
+    rng = random.Random(f"{profile}:{seed}")
+    return [generate_recipe(rng, profile) for _ in range(count)]
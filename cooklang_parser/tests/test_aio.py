@@ -0,0 +1,159 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from cooklang_parser.aio import AsyncParser, aparse_recipe, read_stream
+from cooklang_parser.parser import CooklangParser
+
+TEA = ">> title: Tea\nSteep @tea bag{1} for ~{3%minutes}.\n"
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser()
+
+
+@pytest.fixture
+def recipe_tree(tmp_path):
+    (tmp_path / "breads").mkdir()
+    for index in range(12):
+        (tmp_path / "breads" / f"bread{index:02d}.cook").write_text(
+            f"Mix @flour{{{index + 1}00%g}} in a #bowl."
+        )
+    (tmp_path / "tea.cook").write_text(TEA)
+    (tmp_path / "notes.txt").write_text("Not a recipe")
+    return tmp_path
+
+
+@pytest.fixture
+def async_parser(parser):
+    with ThreadPoolExecutor(2) as executor:
+        yield AsyncParser(parser, executor=executor, limit=3)
+
+
+def test_aparse_recipe(parser):
+    recipe = asyncio.run(aparse_recipe(TEA))
+    assert recipe == parser.parse_recipe(TEA)
+    metadata = asyncio.run(aparse_recipe(TEA, sections=["metadata"]))
+    assert metadata == {"metadata": {"title": "Tea"}}
+
+
+def test_parse_recipe_and_file(async_parser, parser, recipe_tree):
+    async def run():
+        return await asyncio.gather(
+            async_parser.parse_recipe(TEA),
+            async_parser.parse_file(recipe_tree / "tea.cook"),
+        )
+
+    assert asyncio.run(run()) == [parser.parse_recipe(TEA)] * 2
+
+
+def test_parse_directory_ordered(async_parser, parser, recipe_tree):
+    async def run():
+        return [item async for item in async_parser.parse_directory(recipe_tree)]
+
+    results = asyncio.run(run())
+    assert results == list(parser.parse_directory(recipe_tree))
+
+
+def test_parse_directory_unordered(async_parser, parser, recipe_tree):
+    async def run():
+        directory = async_parser.parse_directory(recipe_tree, ordered=False)
+        return [item async for item in directory]
+
+    results = asyncio.run(run())
+    assert sorted(results, key=lambda item: item[0]) == sorted(
+        parser.parse_directory(recipe_tree), key=lambda item: item[0]
+    )
+
+
+def test_parse_directory_stops_early(async_parser, recipe_tree):
+    async def run():
+        directory = async_parser.parse_directory(recipe_tree)
+        async for path, _ in directory:
+            await directory.aclose()
+            return path
+
+    assert os.path.basename(asyncio.run(run())) == "tea.cook"
+
+
+def test_limit_bounds_running_parses(recipe_tree):
+    running = []
+    peak = []
+
+    class Parser(CooklangParser):
+        def parse_file(self, path, encoding="utf-8"):
+            running.append(path)
+            peak.append(len(running))
+            try:
+                return super().parse_file(path, encoding)
+            finally:
+                running.remove(path)
+
+    async def run():
+        with ThreadPoolExecutor(8) as executor:
+            async_parser = AsyncParser(Parser(), executor=executor, limit=2)
+            return [item async for item in async_parser.parse_directory(recipe_tree)]
+
+    assert len(asyncio.run(run())) == 13
+    assert max(peak) <= 2
+
+
+def test_parse_stream(async_parser, parser):
+    data = TEA.encode("utf-8")
+
+    async def chunks():
+        for start in range(0, len(data), 5):
+            yield data[start : start + 5]
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return [
+            await async_parser.parse_stream(chunks()),
+            await async_parser.parse_stream(reader),
+        ]
+
+    assert asyncio.run(run()) == [parser.parse_recipe(TEA)] * 2
+
+
+def test_read_stream_multibyte_and_limit():
+    data = "Add @crème fraîche{2%tbsp}.".encode("utf-8")
+
+    async def chunks():
+        for index in range(len(data)):
+            yield data[index : index + 1]
+
+    assert asyncio.run(read_stream(chunks())) == data.decode("utf-8")
+    with pytest.raises(ValueError):
+        asyncio.run(read_stream(chunks(), max_bytes=10))
+
+
+def test_default_process_pool(parser, recipe_tree):
+    async def run():
+        async with AsyncParser(workers=2) as async_parser:
+            return [item async for item in async_parser.parse_directory(recipe_tree)]
+
+    assert asyncio.run(run()) == list(parser.parse_directory(recipe_tree))
+
+
+def test_aclose_does_not_block_the_loop(parser):
+    threads = []
+
+    class Executor(ThreadPoolExecutor):
+        def shutdown(self, *args, **kwargs):
+            threads.append(threading.current_thread())
+            super().shutdown(*args, **kwargs)
+
+    async def run():
+        async_parser = AsyncParser(parser)
+        async_parser._executor = Executor(1)
+        async with async_parser:
+            await async_parser.parse_recipe(TEA)
+        assert async_parser._executor is None
+
+    asyncio.run(run())
+    assert threads and threads[0] is not threading.main_thread()
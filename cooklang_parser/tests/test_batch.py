@@ -0,0 +1,58 @@
+import pytest
+from cooklang_parser.parser import CooklangParser
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser()
+
+
+TEXTS = [
+    "Boil @water{200ml} in a #kettle.",
+    "If @egg{} is cooked, ~soon.",
+    ">> title: Tea\nSteep @tea bag{1} for ~{3%minutes}.",
+    "",
+]
+
+
+def test_parse_many_serial(parser):
+    results = list(parser.parse_many(TEXTS, workers=1))
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert results[0].recipe == parser.parse_recipe(TEXTS[0])
+    assert results[0].error is None
+    assert results[3].recipe == {}
+
+
+def test_parse_many_reports_errors(parser):
+    results = list(parser.parse_many(TEXTS, workers=1))
+    assert results[1].recipe is None
+    assert isinstance(results[1].error, ValueError)
+    assert results[2].recipe["metadata"] == {"title": "Tea"}
+
+
+def test_parse_many_process_pool_ordered(parser):
+    texts = TEXTS * 10
+    results = list(parser.parse_many(texts, workers=2, chunksize=3))
+    assert [result.index for result in results] == list(range(len(texts)))
+    for result in results:
+        if result.error is None:
+            assert result.recipe == parser.parse_recipe(texts[result.index])
+        else:
+            assert isinstance(result.error, ValueError)
+
+
+def test_parse_many_process_pool_unordered(parser):
+    texts = TEXTS * 10
+    results = list(parser.parse_many(iter(texts), workers=2, ordered=False))
+    assert sorted(result.index for result in results) == list(range(len(texts)))
+
+
+def test_parse_many_uses_parser_engine():
+    parser = CooklangParser(engine="lexer")
+    results = list(parser.parse_many([TEXTS[2]], workers=2))
+    assert results[0].recipe == parser.parse_recipe(TEXTS[2])
+
+
+def test_parse_many_invalid_chunksize(parser):
+    with pytest.raises(ValueError):
+        list(parser.parse_many(TEXTS, chunksize=0))
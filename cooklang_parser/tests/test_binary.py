@@ -0,0 +1,111 @@
+import io
+import json
+
+import pytest
+from cooklang_parser import binary
+from cooklang_parser.parser import CooklangParser
+
+TEXT = """
+-- Breakfast
+>> source: https://example.com
+>> servings: 2
+Place @bacon strips{500%g} on a #baking sheet{} and glaze with @maple syrup{1/2%tbsp}.
+If @eggs{} is cooked, add +love{}. ![Plate](images/plate.jpg) [- check -]
+Use @butter{50g} (or @margarine{50g}) for ~frying{3%minutes} and ~{2%minutes} in a #pot.
+"""
+
+
+@pytest.fixture(params=["extractors", "lexer"])
+def parser(request):
+    return CooklangParser(engine=request.param)
+
+
+def test_round_trip(parser):
+    recipe = parser.parse_recipe(TEXT)
+    data = binary.dumps(recipe)
+    assert data.startswith(binary.HEADER)
+    loaded = binary.loads(data)
+    assert loaded == recipe
+    assert list(loaded) == list(recipe)
+    assert json.dumps(loaded) == json.dumps(recipe)
+    assert len(data) < len(json.dumps(recipe)) / 2
+
+
+def test_empty_recipe():
+    assert binary.loads(binary.dumps({})) == {}
+
+
+@pytest.mark.parametrize(
+    "recipe",
+    [
+        {"cookware": [""]},
+        {"steps": [{"type": "text", "value": ""}]},
+        {"metadata": {"": ""}, "images": []},
+    ],
+)
+def test_empty_strings(recipe):
+    assert binary.loads(binary.dumps(recipe)) == recipe
+
+
+def test_empty_comment(parser):
+    recipe = parser.parse_recipe("[- -]")
+    assert binary.loads(binary.dumps(recipe)) == recipe
+
+
+def test_sections(parser):
+    recipe = parser.parse_recipe(TEXT)
+    data = binary.dumps(recipe)
+    loaded = binary.loads(data, sections=("metadata", "images"))
+    assert loaded == {"metadata": recipe["metadata"], "images": recipe["images"]}
+
+
+def test_normalized_quantities_use_generic_encoding():
+    recipe = CooklangParser(normalize_quantities=True).parse_recipe(TEXT)
+    record = binary.encode_record(recipe)
+    assert record[0] & binary.GENERIC
+    assert binary.decode_record(record) == recipe
+
+
+def test_generic_values():
+    value = {
+        "metadata": {"a\0b": "nul"},
+        "steps": "not a list",
+        "values": [0, -3, 2**40, 1.25, True, False, None, ("x", "y"), [], {}],
+    }
+    assert binary.loads(binary.dumps(value)) == value
+
+
+def test_unsupported_value():
+    with pytest.raises(TypeError):
+        binary.dumps({"value": object()})
+
+
+def test_stream(parser):
+    recipes = [parser.parse_recipe(TEXT), {}, parser.parse_recipe("Boil @water{1%l}.")]
+    file = io.BytesIO()
+    writer = binary.RecipeWriter(file)
+    writer.write_many(recipes)
+    assert writer.count == 3
+    file.seek(0)
+    assert list(binary.RecipeReader(file)) == recipes
+    file.seek(0)
+    assert [recipe.keys() for recipe in binary.RecipeReader(file, ["steps"])] == [
+        {"steps"},
+        set(),
+        {"steps"},
+    ]
+
+
+def test_bad_header():
+    with pytest.raises(ValueError):
+        binary.loads(b"{}")
+    with pytest.raises(ValueError):
+        binary.loads(binary.MAGIC + bytes([binary.VERSION + 1]))
+
+
+def test_truncated_stream(parser):
+    file = io.BytesIO()
+    binary.RecipeWriter(file).write(parser.parse_recipe(TEXT))
+    file = io.BytesIO(file.getvalue()[:-3])
+    with pytest.raises(ValueError):
+        list(binary.RecipeReader(file))
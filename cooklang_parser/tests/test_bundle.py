@@ -0,0 +1,131 @@
+import io
+
+import pytest
+from cooklang_parser import bundle
+from cooklang_parser.bundle import BundleReader, BundleWriter, write_bundle
+from cooklang_parser.parser import CooklangParser
+
+RECIPES = [
+    ("pancakes.cook", ">> servings: 4\nMix @flour{200g} and @milk{300%ml}."),
+    ("empty.cook", ""),
+    ("tea.cook", "Boil @water{} in a #kettle for ~{3%minutes}.\n"),
+    ("crème brûlée.cook", "Caramelise @sugar{2%tbsp} with a #torch.\n\n"),
+]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "recipes.bundle"
+    assert write_bundle(path, RECIPES) == len(RECIPES)
+    return path
+
+
+def test_parse_by_index_and_name(path):
+    parser = CooklangParser()
+    with BundleReader(path) as reader:
+        assert len(reader) == len(RECIPES)
+        for index, (name, text) in enumerate(RECIPES):
+            assert reader.text(index) == text
+            assert reader.text(name) == text
+            assert reader.parse(name) == parser.parse_recipe(text)
+            assert reader.index(name) == index
+        assert reader.names() == [name for name, _ in RECIPES]
+
+
+def test_parse_sections(path):
+    with BundleReader(path, CooklangParser(engine="lexer")) as reader:
+        assert reader.parse(0, "metadata") == {"metadata": {"servings": "4"}}
+
+
+def test_iterate(path):
+    parser = CooklangParser()
+    with BundleReader(path) as reader:
+        assert list(reader) == [parser.parse_recipe(text) for _, text in RECIPES]
+        results = list(reader.parse_many(workers=1))
+        assert [result.index for result in results] == list(range(len(RECIPES)))
+        assert [result.recipe for result in results] == list(reader)
+
+
+def test_missing_recipe(path):
+    with BundleReader(path) as reader:
+        with pytest.raises(IndexError):
+            reader.text(len(RECIPES))
+        with pytest.raises(IndexError):
+            reader.text(-1)
+        with pytest.raises(KeyError):
+            reader.parse("missing.cook")
+
+
+def test_big_endian_offsets(tmp_path, monkeypatch):
+    # Offsets are swapped on big-endian hosts; pretending to be one swaps
+    # them on both sides, which must still round-trip.
+    monkeypatch.setattr(bundle.sys, "byteorder", "big")
+    path = tmp_path / "recipes.bundle"
+    write_bundle(path, RECIPES)
+    with BundleReader(path) as reader:
+        assert [reader.text(name) for name, _ in RECIPES] == [
+            text for _, text in RECIPES
+        ]
+
+
+def test_layout(path):
+    data = path.read_bytes()
+    assert data.startswith(bundle.HEADER)
+    texts = data[len(bundle.HEADER) :].split(bundle.DELIMITER)
+    assert [text.decode("utf-8") for text in texts[: len(RECIPES)]] == [
+        text for _, text in RECIPES
+    ]
+
+
+def test_default_names(tmp_path):
+    path = tmp_path / "recipes.bundle"
+    with open(path, "wb") as bundle_file:
+        writer = BundleWriter(bundle_file)
+        assert writer.add("Add @salt{}.") == 0
+        assert writer.add("Add @pepper{}.") == 1
+        writer.finish()
+    with BundleReader(path) as reader:
+        assert reader.names() == ["0", "1"]
+        assert reader.parse("1")["ingredients"][0]["name"] == "pepper"
+
+
+def test_empty_bundle(tmp_path):
+    path = tmp_path / "recipes.bundle"
+    assert write_bundle(path, []) == 0
+    with BundleReader(path) as reader:
+        assert len(reader) == 0
+        assert reader.names() == []
+        assert list(reader) == []
+
+
+def test_invalid_recipes():
+    writer = BundleWriter(io.BytesIO())
+    writer.add("Mix.", "a")
+    with pytest.raises(ValueError):
+        writer.add("Stir.", "a")
+    with pytest.raises(ValueError):
+        writer.add("Stir.", "b\0")
+    with pytest.raises(ValueError):
+        writer.add("Stir.\x1e", "b")
+
+
+def test_not_a_bundle(tmp_path):
+    path = tmp_path / "recipe.cook"
+    path.write_text("Mix @flour{200g}.\n" * 10)
+    with pytest.raises(ValueError):
+        BundleReader(path)
+
+
+def test_truncated_bundle(path):
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        BundleReader(path)
+
+
+def test_close(path):
+    reader = BundleReader(path)
+    reader.text(0)
+    reader.close()
+    reader.close()
+    with pytest.raises(ValueError):
+        reader.text(0)
@@ -0,0 +1,70 @@
+import pickle
+
+import pytest
+from cooklang_parser.cache import ParseCache, shared_cache
+from cooklang_parser.parser import CooklangParser
+
+TEXT = ">> title: Tea\nBoil @water{200ml} in a #kettle for ~{5%minutes}."
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser(cache=ParseCache(maxsize=2))
+
+
+def test_cached_result_matches_uncached(parser):
+    expected = CooklangParser().parse_recipe(TEXT)
+    assert parser.parse_recipe(TEXT) == expected
+    assert parser.parse_recipe(TEXT) == expected
+    assert parser.cache.info() == (1, 1, 2, 1)
+
+
+def test_cached_results_are_copies(parser):
+    first = parser.parse_recipe(TEXT)
+    first["metadata"]["title"] = "Coffee"
+    first["ingredients"].clear()
+    second = parser.parse_recipe(TEXT)
+    assert second["metadata"] == {"title": "Tea"}
+    assert second["ingredients"][0]["name"] == "water"
+    second["steps"][1]["name"] = "milk"
+    assert parser.parse_recipe(TEXT)["steps"][1]["name"] == "water"
+
+
+def test_lru_eviction(parser):
+    parser.parse_recipe("one")
+    parser.parse_recipe("two")
+    parser.parse_recipe("one")
+    parser.parse_recipe("three")
+    assert len(parser.cache) == 2
+    parser.parse_recipe("one")
+    assert parser.cache.hits == 2
+    parser.parse_recipe("two")
+    assert parser.cache.misses == 4
+
+
+def test_cache_keyed_on_engine():
+    cache = ParseCache()
+    CooklangParser(cache=cache).parse_recipe(TEXT)
+    CooklangParser(engine="lexer", cache=cache).parse_recipe(TEXT)
+    assert cache.info().misses == 2
+
+
+def test_cache_options():
+    assert CooklangParser(cache=True).cache is shared_cache
+    assert CooklangParser(cache=16).cache.maxsize == 16
+    assert CooklangParser(cache=False).cache is None
+    with pytest.raises(ValueError):
+        ParseCache(maxsize=0)
+
+
+def test_clear(parser):
+    parser.parse_recipe(TEXT)
+    parser.cache.clear()
+    assert parser.cache.info() == (0, 0, 2, 0)
+
+
+def test_parser_with_cache_pickles(parser):
+    parser.parse_recipe(TEXT)
+    clone = pickle.loads(pickle.dumps(parser))
+    assert len(clone.cache) == 0
+    assert clone.parse_recipe(TEXT) == parser.parse_recipe(TEXT)
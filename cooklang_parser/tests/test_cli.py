@@ -0,0 +1,121 @@
+import json
+import os
+
+import pytest
+from cli.main import main
+from cooklang_parser.parser import CooklangParser
+
+TEA = ">> title: Tea\nSteep @tea bag{1} for ~{3%minutes}.\n"
+BREAD = "Mix @flour{500%g} in a #bowl.\n"
+
+
+@pytest.fixture
+def recipe_tree(tmp_path):
+    (tmp_path / "breads").mkdir()
+    (tmp_path / "breads" / "bread.cook").write_text(BREAD)
+    (tmp_path / "tea.cook").write_text(TEA)
+    (tmp_path / "notes.txt").write_text("Not a recipe @flour{1}")
+    return tmp_path
+
+
+def test_single_file(recipe_tree, capsys):
+    assert main([str(recipe_tree / "tea.cook")]) == 0
+    assert json.loads(capsys.readouterr().out) == json.loads(
+        json.dumps(CooklangParser().parse_recipe(TEA))
+    )
+
+
+def test_directory_json(recipe_tree, capsys):
+    assert main([str(recipe_tree), "--indent", "2"]) == 0
+    output = json.loads(capsys.readouterr().out)
+    assert sorted(output) == [
+        os.path.join(str(recipe_tree), "breads", "bread.cook"),
+        os.path.join(str(recipe_tree), "tea.cook"),
+    ]
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_jsonl(recipe_tree, capsys, workers):
+    assert main([str(recipe_tree), "-f", "jsonl", "-j", workers]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [os.path.basename(record["path"]) for record in records] == [
+        "tea.cook",
+        "bread.cook",
+    ]
+    assert records[1]["recipe"]["cookware"] == ["bowl"]
+
+
+def test_unordered(recipe_tree, capsys):
+    assert main([str(recipe_tree), "-f", "jsonl", "-j", "2", "--unordered"]) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(os.path.basename(record["path"]) for record in records) == [
+        "bread.cook",
+        "tea.cook",
+    ]
+
+
+def test_sections_and_normalize(recipe_tree, capsys):
+    path = str(recipe_tree / "breads" / "bread.cook")
+    assert main([path, "--sections", "ingredients", "--normalize"]) == 0
+    output = json.loads(capsys.readouterr().out)
+    assert list(output) == ["ingredients"]
+    ingredient = output["ingredients"][0]
+    assert ingredient["amount"] == {"min": 500, "max": 500, "unit": "g"}
+    assert ingredient["base_amount"] == {"min": 500, "max": 500, "unit": "g"}
+
+
+def test_normalized_fractions(tmp_path, capsys):
+    path = tmp_path / "milk.cook"
+    path.write_text("Add @milk{1/3%cup} and @eggs{2-3}.\n")
+    assert main([str(path), "-f", "jsonl", "--normalize"]) == 0
+    record = json.loads(capsys.readouterr().out)
+    eggs, milk = record["recipe"]["ingredients"]
+    assert milk["amount"] == {"min": "1/3", "max": "1/3", "unit": "cup"}
+    assert milk["base_amount"] == {
+        "min": "157725491/2000000",
+        "max": "157725491/2000000",
+        "unit": "ml",
+    }
+    assert eggs["amount"] == {"min": 2, "max": 3, "unit": None}
+    assert eggs["base_amount"] is None
+
+
+def test_structured_steps(recipe_tree, capsys):
+    path = str(recipe_tree / "breads" / "bread.cook")
+    assert main([path, "--sections", "steps", "--structured-steps"]) == 0
+    steps = json.loads(capsys.readouterr().out)["steps"]
+    assert {"components", "ingredients", "cookware", "timers"} == set(steps[0])
+
+
+def test_timer_seconds(recipe_tree, capsys):
+    path = str(recipe_tree / "tea.cook")
+    assert main([path, "--timer-seconds"]) == 0
+    output = json.loads(capsys.readouterr().out)
+    assert output["steps"][3]["seconds"] == {"min": 180, "max": 180, "unit": "s"}
+    assert output["timing"]["total_seconds"] == 180
+
+
+def test_errors(recipe_tree, capsys):
+    (recipe_tree / "broken.cook").write_bytes(b"\xff\xfe")
+    assert main([str(recipe_tree), "-f", "jsonl"]) == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[0]["error"].startswith("UnicodeDecodeError")
+    assert "recipe" in records[1]
+
+
+def test_unknown_section(recipe_tree, capsys):
+    assert main([str(recipe_tree), "--sections", "title"]) == 2
+    assert "unknown sections: title" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("chunksize", ["0", "-1"])
+def test_invalid_chunksize(recipe_tree, capsys, chunksize):
+    assert main([str(recipe_tree), "-j", "2", "--chunksize", chunksize]) == 2
+    assert "--chunksize must be positive" in capsys.readouterr().err
+
+
+def test_output_file(recipe_tree, tmp_path):
+    output = tmp_path / "out.jsonl"
+    assert main([str(recipe_tree), "-f", "jsonl", "-o", str(output)]) == 0
+    assert len(output.read_text().splitlines()) == 2
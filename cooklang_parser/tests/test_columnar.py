@@ -0,0 +1,106 @@
+import math
+
+import pytest
+from cooklang_parser.columnar import ColumnarCorpus
+from cooklang_parser.parser import CooklangParser
+
+TEXTS = [
+    "Mix @flour{750g} and @water{500ml} in a #bowl.",
+    "Mix @flour{200g} with @butter{1/2%cup} in a #bowl and bake in a #oven.",
+    "Knead @flour{1%kg} for ~{10%minutes}.",
+    "Season with @salt{}.",
+]
+
+
+@pytest.fixture
+def corpus():
+    return ColumnarCorpus.from_texts(CooklangParser(), TEXTS)
+
+
+def test_columns(corpus):
+    assert len(corpus) == 4
+    assert list(corpus.ingredient_offsets) == [0, 2, 4, 5, 6]
+    assert corpus.ingredients(1) == [
+        {"name": "butter", "quantity": 0.5, "unit": "cup"},
+        {"name": "flour", "quantity": 200.0, "unit": "g"},
+    ]
+    assert math.isnan(corpus.ingredients(3)[0]["quantity"])
+    assert corpus.cookware(1) == ["bowl", "oven"]
+    assert corpus.timers(2) == [("", "10%minutes")]
+
+
+def test_select_by_quantity(corpus):
+    assert corpus.select("flour", unit="g", min_quantity=500) == [0, 2]
+    assert corpus.select("flour", unit="kg", max_quantity=0.5) == [1]
+    assert corpus.select("flour", unit="g") == [0, 1, 2]
+    assert corpus.select("flour") == [0, 1, 2]
+    assert corpus.select("flour", max_quantity=1) == [2]
+    assert corpus.select("flour", unit="ml") == []
+    assert corpus.select("flour", unit="pinch") == []
+    assert corpus.select("sugar") == []
+
+
+@pytest.mark.parametrize("options", [{}, {"normalize_quantities": True}])
+def test_select_converts_units(options):
+    texts = [
+        "Knead @flour{1%kg}.",
+        "Knead @flour{600%grams}.",
+        "Knead @flour{600%g}.",
+        "Knead @Flour{700%g}.",
+        "Knead @flour{400%g}.",
+    ]
+    corpus = ColumnarCorpus.from_texts(CooklangParser(**options), texts)
+    assert corpus.select("flour", unit="g", min_quantity=500) == [0, 1, 2, 3]
+    assert corpus.select("FLOUR", unit="kg", max_quantity=0.65) == [1, 2, 4]
+    assert corpus.ingredient_base_quantity[0] == 1000.0
+    assert corpus.units.decode(corpus.ingredient_base_unit[0]) == "g"
+
+
+def test_select_normalized_ranges():
+    parser = CooklangParser(normalize_quantities=True)
+    corpus = ColumnarCorpus.from_texts(parser, ["Knead @flour{2-3%kg}."])
+    assert corpus.select("flour", unit="g", min_quantity=2000) == [0]
+    assert corpus.select("flour", unit="g", min_quantity=2500) == []
+
+
+def test_select_unknown_unit():
+    salt = {"name": "salt", "quantity": "2", "unit": "pinch"}
+    corpus = ColumnarCorpus.from_pairs(
+        [("a", {"ingredients": [salt]}), ("b", {"ingredients": [dict(salt, unit="g")]})]
+    )
+    assert corpus.select("Salt", unit="pinch", min_quantity=2) == [0]
+    assert corpus.select("salt", unit="pinches") == []
+
+
+def test_select_cookware(corpus):
+    assert corpus.select_cookware("bowl") == [0, 1]
+    assert corpus.select_cookware("wok") == []
+
+
+def test_ingredient_totals(corpus):
+    assert corpus.ingredient_totals(unit="g") == {"flour": 950.0}
+
+
+def test_select_total_time(corpus):
+    assert corpus.select_total_time(min_seconds=0) == []
+    parser = CooklangParser(timer_seconds=True)
+    texts = TEXTS + ["Rest for ~{1%hour}, then bake for ~{30-40%min}."]
+    corpus = ColumnarCorpus.from_texts(parser, texts)
+    assert corpus.total_seconds[2] == 600.0
+    assert math.isnan(corpus.total_seconds[3])
+    assert corpus.total_seconds[4] == 5400.0
+    assert corpus.select_total_time(min_seconds=0) == [2, 4]
+    assert corpus.select_total_time(max_seconds=3600) == [2]
+    assert corpus.select_total_time(min_seconds=3600) == [4]
+
+
+def test_from_pairs():
+    parser = CooklangParser()
+    corpus = ColumnarCorpus.from_pairs(
+        (name, parser.parse_recipe(text)) for name, text in zip("abcd", TEXTS)
+    )
+    assert [corpus.keys[recipe] for recipe in corpus.select("flour")] == [
+        "a",
+        "b",
+        "c",
+    ]
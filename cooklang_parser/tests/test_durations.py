@@ -0,0 +1,141 @@
+import time
+from fractions import Fraction
+
+import pytest
+from cooklang_parser.parser import CooklangParser
+from cooklang_parser.quantity import (
+    Quantity,
+    convert,
+    parse_duration,
+    parse_quantity,
+)
+
+TEXT = """
+Boil @water{1%l} for ~{10%minutes}.
+Simmer for ~sauce{1/2%hour}, then rest for ~{10-15%min}.
+
+Bake for ~bread{1 1/2 hours} and serve after ~{a while}.
+"""
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser(timer_seconds=True)
+
+
+@pytest.mark.parametrize(
+    "duration, seconds, maximum",
+    [
+        ("10%minutes", 600, 600),
+        ("45 sec", 45, 45),
+        ("30%s", 30, 30),
+        ("1/2%hour", 1800, 1800),
+        ("1 1/2 hours", 5400, 5400),
+        ("1.5%h", 5400, 5400),
+        ("½%hr", 1800, 1800),
+        ("10-15%min", 600, 900),
+        ("2 to 3 days", 172800, 259200),
+        ("20%Minutes", 1200, 1200),
+    ],
+)
+def test_parse_duration(duration, seconds, maximum):
+    assert parse_duration(duration) == Quantity(seconds, maximum, "s")
+
+
+@pytest.mark.parametrize("duration", ["", "ten minutes", "10", "10%g", "1/0%min"])
+def test_parse_duration_invalid(duration):
+    assert parse_duration(duration) is None
+
+
+@pytest.mark.parametrize("engine", ["extractors", "lexer", "hardened"])
+def test_hostile_duration(engine):
+    # Durations go through parse_quantity, which must not backtrack over
+    # runs of spaces.
+    parse_duration.cache_clear()
+    parse_quantity.cache_clear()
+    text = "~{1" + " " * 2000 + "x!}"
+    start = time.perf_counter()
+    recipe = CooklangParser(engine=engine, timer_seconds=True).parse_recipe(text)
+    assert time.perf_counter() - start < 0.5
+    assert recipe["steps"][0]["seconds"] is None
+    assert "timing" not in recipe
+
+
+def test_convert_time():
+    assert convert(90, "min", "h") == Fraction(3, 2)
+    with pytest.raises(ValueError):
+        convert(1, "h", "g", density=1)
+
+
+def test_default_output_unchanged():
+    recipe = CooklangParser().parse_recipe(TEXT)
+    assert "timing" not in recipe
+    assert all("seconds" not in step for step in recipe["steps"])
+
+
+def test_timer_seconds(parser):
+    recipe = parser.parse_recipe(TEXT)
+    timers = [step for step in recipe["steps"] if step["type"] == "timer"]
+    assert [timer["seconds"] for timer in timers] == [
+        Quantity(600, 600, "s"),
+        Quantity(1800, 1800, "s"),
+        Quantity(600, 900, "s"),
+        Quantity(5400, 5400, "s"),
+        None,
+    ]
+
+
+def test_timing(parser):
+    assert parser.parse_recipe(TEXT)["timing"] == {
+        "timers": 4,
+        "total_seconds": 8400,
+        "max_total_seconds": 8700,
+        "longest_seconds": 5400,
+    }
+
+
+def test_no_timing_without_durations(parser):
+    assert "timing" not in parser.parse_recipe("Wait for ~{a while}.")
+    assert "timing" not in parser.parse_recipe("Mix @flour{2%cups}.")
+
+
+@pytest.mark.parametrize("engine", ["lexer", "hardened"])
+def test_engines_agree(parser, engine):
+    other = CooklangParser(engine=engine, timer_seconds=True)
+    assert other.parse_recipe(TEXT) == parser.parse_recipe(TEXT)
+
+
+def test_structured_steps(parser):
+    structured = CooklangParser(timer_seconds=True, structured_steps=True)
+    recipe = structured.parse_recipe(TEXT)
+    assert recipe["timing"] == parser.parse_recipe(TEXT)["timing"]
+
+
+def test_sections(parser):
+    assert parser.parse_recipe(TEXT, "steps")["timing"]["timers"] == 4
+    assert "timing" not in parser.parse_recipe(TEXT, "timers")
+
+
+def test_lazy(parser):
+    recipe = parser.parse_lazy(TEXT)
+    assert recipe["timing"] == parser.parse_recipe(TEXT)["timing"]
+    assert recipe.to_dict() == parser.parse_recipe(TEXT)
+    assert CooklangParser().parse_lazy(TEXT).timing == {}
+
+
+def test_incremental():
+    parser = CooklangParser(engine="lexer", timer_seconds=True)
+    document = parser.parse_incremental(TEXT)
+    offset = TEXT.index("10%minutes")
+    recipe = document.edit(offset, 2, "20")
+    assert recipe == parser.parse_recipe(document.text)
+    assert recipe["timing"]["total_seconds"] == 9000
+
+
+def test_no_models(parser):
+    with pytest.raises(ValueError):
+        parser.parse_model(TEXT)
+
+
+def test_options_include_timer_seconds(parser):
+    assert parser.options() != CooklangParser().options()
@@ -0,0 +1,114 @@
+import io
+import os
+
+import pytest
+from cooklang_parser.files import iter_cook_files, read_header
+from cooklang_parser.parser import CooklangParser
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser()
+
+
+@pytest.fixture
+def recipe_tree(tmp_path):
+    (tmp_path / "soups").mkdir()
+    (tmp_path / "soups" / "tomato.cook").write_text(
+        ">> title: Tomato Soup\nSimmer @tomatoes{6} in a #pot."
+    )
+    (tmp_path / "tea.cook").write_text("Steep @tea bag{1} for ~{3%minutes}.")
+    (tmp_path / "notes.txt").write_text("Not a recipe @flour{1}")
+    return tmp_path
+
+
+def test_iter_cook_files(recipe_tree):
+    paths = list(iter_cook_files(recipe_tree))
+    assert [os.path.relpath(path, recipe_tree) for path in paths] == [
+        "tea.cook",
+        os.path.join("soups", "tomato.cook"),
+    ]
+
+
+def test_parse_file(parser, recipe_tree):
+    recipe = parser.parse_file(recipe_tree / "tea.cook")
+    assert recipe == parser.parse_recipe("Steep @tea bag{1} for ~{3%minutes}.")
+
+
+def test_parse_directory(parser, recipe_tree):
+    results = dict(parser.parse_directory(recipe_tree))
+    assert len(results) == 2
+    tomato = results[os.path.join(recipe_tree, "soups", "tomato.cook")]
+    assert tomato["metadata"] == {"title": "Tomato Soup"}
+    assert tomato["cookware"] == ["pot"]
+
+
+def test_parse_directory_is_lazy(parser, recipe_tree):
+    results = parser.parse_directory(recipe_tree)
+    path, recipe = next(results)
+    assert path.endswith("tea.cook")
+    assert recipe["ingredients"][0]["name"] == "tea bag"
+
+
+def test_parse_directory_process_pool(parser, recipe_tree):
+    serial = list(parser.parse_directory(recipe_tree))
+    assert list(parser.parse_directory(recipe_tree, workers=2)) == serial
+
+
+def test_parse_directory_raises_parse_errors(parser, tmp_path):
+    (tmp_path / "bad.cook").write_text("If @egg{} is cooked, ~soon.")
+    with pytest.raises(ValueError):
+        list(parser.parse_directory(tmp_path, workers=2))
+
+
+HEADERS = [
+    ">> title: Tea\n>> servings: 2\n\nSteep @tea bag{1} for ~{3%minutes}.\n",
+    "-- family recipe\n>> title: Soup\n[- >> draft: yes\nstill a comment -]\n"
+    ">> course: dinner\nSimmer @tomatoes{6}.\n>> late: ignored?\n",
+    "[- intro -] >> title: Inline\nBoil @water{1%l}.\n",
+    "Boil @water{1%l}.\n",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", HEADERS)
+def test_read_metadata_matches_header(parser, text):
+    header = text.split("Simmer")[0].split("Boil")[0].split("Steep")[0]
+    assert parser.read_metadata(io.StringIO(text)) == parser.extract_metadata(
+        parser.remove_comments(header)
+    )
+
+
+def test_read_metadata_equals_full_parse(parser, tmp_path):
+    path = tmp_path / "tea.cook"
+    path.write_text(HEADERS[1])
+    full = parser.parse_recipe(HEADERS[1].replace(">> late: ignored?\n", ""))
+    assert parser.read_metadata(path) == full["metadata"]
+    assert parser.read_metadata(str(path)) == full["metadata"]
+    with open(path, "rb") as recipe_file:
+        assert parser.read_metadata(recipe_file) == full["metadata"]
+
+
+def test_read_metadata_stops_at_content(parser):
+    read = []
+
+    def lines():
+        for line in [">> title: Tea\n", "-- note\n", "Steep @tea.\n", "more\n"]:
+            read.append(line)
+            yield line
+
+    assert parser.read_metadata(lines()) == {"title": "Tea"}
+    assert len(read) == 3
+
+
+def test_read_header_unterminated_block_comment():
+    text = ">> title: Tea\n[- never closed\n>> servings: 2\n"
+    assert read_header(io.StringIO(text)) == text
+
+
+def test_scan_metadata(parser, recipe_tree):
+    results = dict(parser.scan_metadata(recipe_tree))
+    assert results == {
+        os.path.join(recipe_tree, "soups", "tomato.cook"): {"title": "Tomato Soup"},
+        os.path.join(recipe_tree, "tea.cook"): {},
+    }
@@ -0,0 +1,136 @@
+import time
+
+import pytest
+from cooklang_parser import LimitExceeded, Limits
+from cooklang_parser.parser import CooklangParser
+from cooklang_parser.quantity import parse_duration, parse_quantity
+from cooklang_parser.tests.corpus import PROFILES, generate_corpus
+from cooklang_parser.tests.test_lexer import RECIPES
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser(engine="hardened")
+
+
+@pytest.mark.parametrize("text", RECIPES)
+def test_hardened_matches_lexer(parser, text):
+    assert parser.parse_recipe(text) == CooklangParser(engine="lexer").parse_recipe(
+        text
+    )
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_hardened_matches_lexer_on_corpus(parser, profile):
+    lexer = CooklangParser(engine="lexer")
+    for text in generate_corpus(profile, 10, seed=1):
+        assert parser.parse_recipe(text) == lexer.parse_recipe(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "@a{ " * 50 + "@b{1}",
+        "~{" * 50 + "~{5%minutes}",
+        "![" * 50 + "![cake](cake.jpg)",
+        "If @a{} is b, " * 20 + "stir.\nDone.",
+        "[--]" * 50 + "Add @salt{}.",
+        "#pan #large pot{} +a note{} + x{} #{}",
+    ],
+)
+def test_hardened_matches_lexer_on_unclosed_markup(parser, text):
+    assert parser.parse_recipe(text) == CooklangParser(engine="lexer").parse_recipe(
+        text
+    )
+
+
+def test_hardened_condition_action_components(parser):
+    text = "If @milk{} is boiled, add to #pot with ~{5%minutes} and +care{}."
+    condition = parser.parse_recipe(text)["conditions"][0]
+    assert condition["action"] == "add to pot with 5 minutes and care"
+
+
+def test_linear_with_quantity_options():
+    # Components are handed to the parser's quantity and duration parsing,
+    # which must stay linear too for the limits to bound the time taken.
+    parse_quantity.cache_clear()
+    parse_duration.cache_clear()
+    parser = CooklangParser(
+        engine="hardened", normalize_quantities=True, timer_seconds=True
+    )
+    spaces = " " * (parser.limits.max_line_length // 2 - 8)
+    text = (
+        f"@a{{1{spaces}{spaces}x!}}\n"
+        f"~{{1{spaces}{spaces}x!}}\n"
+        f"@b{{1{spaces}%{spaces}x!}}\n"
+    )
+    start = time.perf_counter()
+    recipe = parser.parse_recipe(text)
+    assert time.perf_counter() - start < 1
+    assert [item["amount"] for item in recipe["ingredients"]] == [None, None]
+    timers = [step for step in recipe["steps"] if step["type"] == "timer"]
+    assert timers[0]["seconds"] is None
+
+
+def test_default_limits(parser):
+    assert parser.limits == Limits()
+
+
+def test_limits_require_hardened_engine():
+    with pytest.raises(ValueError):
+        CooklangParser(limits=Limits())
+
+
+def test_max_bytes():
+    parser = CooklangParser(engine="hardened", limits=Limits(max_bytes=10))
+    assert parser.parse_recipe("Add salt.")
+    with pytest.raises(LimitExceeded):
+        parser.parse_recipe("Add @salt{}")
+    with pytest.raises(LimitExceeded):
+        # Limits are in bytes, not characters.
+        parser.parse_recipe("Add ééééé")
+
+
+def test_max_line_length():
+    parser = CooklangParser(engine="hardened", limits=Limits(max_line_length=5))
+    assert parser.parse_recipe("Mix.\nStir.\nBake.")
+    with pytest.raises(LimitExceeded):
+        parser.parse_recipe("Mix.\nStir well.")
+
+
+def test_max_tokens():
+    parser = CooklangParser(engine="hardened", limits=Limits(max_tokens=3))
+    assert parser.parse_recipe("Add @salt{} now")
+    with pytest.raises(LimitExceeded):
+        parser.parse_recipe("Add @salt{} and @pepper{}")
+
+
+def test_limits_disabled():
+    parser = CooklangParser(engine="hardened", limits=Limits(None, None, None))
+    recipe = parser.parse_recipe("@a{} " * 20000)
+    assert recipe["ingredients"] == [{"name": "a", "quantity": None, "unit": None}]
+
+
+def test_limit_exceeded_is_value_error():
+    assert issubclass(LimitExceeded, ValueError)
+
+
+@pytest.mark.parametrize(
+    "text", ["If @a{} is b, @!.", "If @a{} is b, ~!.", "Add @flour{1/0}."]
+)
+def test_malformed_markup_raises_value_error(parser, text):
+    with pytest.raises(ValueError):
+        parser.parse_recipe(text)
+
+
+def test_limits_in_cache_options():
+    hardened = CooklangParser(engine="hardened")
+    small = CooklangParser(engine="hardened", limits=Limits(max_bytes=10))
+    assert hardened.options() != small.options()
+    assert CooklangParser().options() == ("extractors", False)
+
+
+def test_hardened_incremental(parser):
+    recipe = parser.parse_incremental("Add @salt{}.\nStir.")
+    recipe.edit(0, 3, "Mix")
+    assert recipe.recipe == parser.parse_recipe("Mix @salt{}.\nStir.")
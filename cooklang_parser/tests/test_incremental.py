@@ -0,0 +1,109 @@
+import time
+
+import pytest
+from cooklang_parser.parser import CooklangParser
+
+TEXT = """>> title: Tea
+Boil @water{200ml} in a #kettle.
+[- steep
+longer for strong tea -]
+Steep @tea bag{1} for ~{3%minutes}.
+If @water{} is boiled, pour it"""
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser(engine="lexer")
+
+
+def apply(text, offset, deleted, inserted):
+    return text[:offset] + inserted + text[offset + deleted :]
+
+
+def test_initial_parse_matches_full_parse(parser):
+    document = parser.parse_incremental(TEXT)
+    assert document.recipe == parser.parse_recipe(TEXT)
+    assert document.text == TEXT
+
+
+@pytest.mark.parametrize(
+    "offset, deleted, inserted",
+    [
+        (TEXT.index("200ml"), 5, "1%l"),
+        (TEXT.index("#kettle"), 0, "#pot and a "),
+        (TEXT.index("[- steep"), 2, ""),
+        (TEXT.index("-]"), 2, "\nstill open"),
+        (len(TEXT), 0, "."),
+        (len(TEXT), 0, "\n"),
+        (0, len(TEXT), ""),
+        (TEXT.index("Boil"), 0, "-- a comment\n"),
+    ],
+)
+def test_edit_matches_full_parse(parser, offset, deleted, inserted):
+    document = parser.parse_incremental(TEXT)
+    expected_text = apply(TEXT, offset, deleted, inserted)
+    assert document.edit(offset, deleted, inserted) == parser.parse_recipe(
+        expected_text
+    )
+    assert document.text == expected_text
+
+
+def test_keystrokes(parser):
+    document = parser.parse_incremental("")
+    text = ""
+    for character in "Add @salt{1%g} to #pot.\nIf @salt{} is in, stir":
+        document.edit(len(text), 0, character)
+        text += character
+    assert document.recipe == parser.parse_recipe(text)
+    offset = text.index("salt")
+    document.edit(offset, 4, "sugar")
+    assert document.recipe == parser.parse_recipe(apply(text, offset, 4, "sugar"))
+
+
+def test_edit_out_of_range(parser):
+    document = parser.parse_incremental("Boil water.")
+    with pytest.raises(ValueError):
+        document.edit(5, 20, "")
+
+
+def test_failed_edit_keeps_document(parser):
+    document = parser.parse_incremental("Boil water.")
+    with pytest.raises(ValueError):
+        document.edit(0, 0, "If @egg{} is cooked, ~soon.\n")
+    assert document.text == "Boil water."
+    assert document.recipe == parser.parse_recipe("Boil water.")
+    assert document.edit(0, 4, "Heat") == parser.parse_recipe("Heat water.")
+
+
+def test_edits_across_long_document(parser):
+    text = "".join(f"Add @salt{{{number}%g}} to #pot.\n" for number in range(300))
+    document = parser.parse_incremental(text)
+    for number in (250, 3, 299, 120, 121, 0):
+        offset = text.index(f"{{{number}%g}}") + 1
+        deleted = len(str(number))
+        text = apply(text, offset, deleted, "7\n-- note\nAdd @salt{2")
+        recipe = document.edit(offset, deleted, "7\n-- note\nAdd @salt{2")
+        assert recipe == parser.parse_recipe(text)
+    assert document.text == text
+
+
+def test_edit_cost_does_not_grow_with_document(parser):
+    # Keystrokes at the top and in the middle of a long document, with one
+    # ingredient name in many amounts, cost about as much as in a short one.
+    def cost(count):
+        text = "".join(
+            f"Add @salt{{{number}%g}} to #pot{number}.\n" for number in range(count)
+        )
+        document = parser.parse_incremental(text)
+        middle = text.index("Add", len(text) // 2)
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for offset in (0, middle) * 10:
+                document.edit(offset, 0, "x")
+                document.edit(offset, 1, "")
+            best = min(best, time.perf_counter() - start)
+        assert document.recipe == parser.parse_recipe(text)
+        return best
+
+    assert cost(20000) < 3 * cost(200)
@@ -0,0 +1,85 @@
+import pytest
+from cooklang_parser.index import RecipeIndex, members, normalize_name
+from cooklang_parser.parser import CooklangParser
+
+TEXTS = [
+    "Mix @flour{750g} and @water{500ml} in a #bowl.",
+    "Mix @Flour{200g} with @butter{1/2%cup} in a #bowl and bake in an #oven.",
+    "Knead @flour{1%kg} with @salt{} and @water{300%ml}.",
+    "Season @tomatoes{2} with @salt{} and @olive  oil{1%tbsp}.",
+    "Serve.",
+]
+
+
+@pytest.fixture
+def index():
+    return RecipeIndex.from_texts(CooklangParser(), TEXTS)
+
+
+def test_names(index):
+    assert len(index) == 5
+    assert index.names(1) == (("butter", "flour"), ("bowl", "oven"))
+    assert index.names(3) == (("olive oil", "salt", "tomatoes"), ())
+    assert normalize_name("  Olive   OIL ") == "olive oil"
+
+
+def test_superset(index):
+    assert index.superset(["flour"]) == [0, 1, 2]
+    assert index.superset(["FLOUR", "water"]) == [0, 2]
+    assert index.superset(["flour"], cookware=["oven"]) == [1]
+    assert index.superset(["saffron"]) == []
+    assert index.superset() == [0, 1, 2, 3, 4]
+
+
+def test_subset(index):
+    assert index.subset(["flour", "water"]) == [0, 4]
+    assert index.subset(["flour", "water", "salt", "pepper"]) == [0, 2, 4]
+    assert index.subset([]) == [4]
+
+
+def test_subset_missing(index):
+    assert index.subset(["flour", "water"], missing=1) == [0, 1, 2, 4]
+    assert index.subset(["salt"], missing=2) == [0, 1, 2, 3, 4]
+    assert index.missing(3, ["salt"]) == ["olive oil", "tomatoes"]
+
+
+def test_subset_cookware(index):
+    assert index.subset(["flour", "butter", "water"], cookware=["bowl"]) == [0, 4]
+    assert index.subset(["flour", "butter"], 1, cookware=["Bowl", "oven"]) == [0, 1, 4]
+
+
+def test_add_and_remove(index):
+    index.remove(0)
+    assert len(index) == 4
+    assert 0 not in index
+    assert index.superset(["flour"]) == [1, 2]
+    assert index.subset(["flour", "water"]) == [4]
+    recipe = index.add(CooklangParser().parse_recipe(TEXTS[0]), key="bread")
+    assert recipe == 5
+    assert index.keys[recipe] == "bread"
+    assert index.subset(["flour", "water"]) == [4, 5]
+    index.remove(3)
+    assert "olive oil" not in index.ingredients
+    with pytest.raises(KeyError):
+        index.remove(3)
+
+
+def test_dense_postings():
+    index = RecipeIndex()
+    for recipe in range(1000):
+        names = ["salt"] if recipe % 3 else ["salt", "pepper"]
+        index.add({"ingredients": [{"name": name} for name in names]})
+    assert index.ingredients["salt"].bitmap is not None
+    assert index.ingredients["pepper"].bitmap is not None
+    index.remove(999)
+    assert len(index.subset(["salt"])) == 666
+    assert index.subset(["salt"], missing=1) == list(range(999))
+    assert members((1 << 100) | 5) == [0, 2, 100]
+
+
+def test_from_pairs():
+    parser = CooklangParser()
+    index = RecipeIndex.from_pairs(
+        (name, parser.parse_recipe(text)) for name, text in zip("abcde", TEXTS)
+    )
+    assert [index.keys[recipe] for recipe in index.superset(["salt"])] == ["c", "d"]
@@ -0,0 +1,154 @@
+import pytest
+from cooklang_parser import indexfile
+from cooklang_parser.index import RecipeIndex
+from cooklang_parser.indexfile import (
+    MAGIC,
+    VERSION,
+    IndexReader,
+    IndexWriter,
+    write_index,
+)
+from cooklang_parser.parser import CooklangParser
+
+TEXTS = {
+    "bread": "Mix @flour{750%g} and @water{500%ml} in a #bowl.",
+    "cake": "Mix @Flour{200%g} with @butter{1/2%cup} in a #bowl, bake in an #oven.",
+    "dough": "Knead @flour{1%kg} with @salt{} and @water{300%ml}.",
+    "salad": "Season @tomatoes{2} with @salt{} and @olive oil{1%tbsp}.",
+    "toast": "Serve.",
+}
+
+
+@pytest.fixture
+def pairs():
+    parser = CooklangParser()
+    return [(key, parser.parse_recipe(text)) for key, text in TEXTS.items()]
+
+
+@pytest.fixture
+def reader(tmp_path, pairs):
+    path = tmp_path / "recipes.ckix"
+    assert write_index(path, pairs) == 5
+    with IndexReader(path) as reader:
+        yield reader
+
+
+def test_tables(reader):
+    assert len(reader) == 5
+    assert list(reader.keys) == list(TEXTS)
+    assert list(reader.ingredient_names) == [
+        "butter",
+        "flour",
+        "olive oil",
+        "salt",
+        "tomatoes",
+        "water",
+    ]
+    assert list(reader.cookware_names) == ["bowl", "oven"]
+    assert list(reader.units) == ["cup", "g", "kg", "ml", "tbsp"]
+    assert reader.ingredient_names.find("salt") == 3
+    assert reader.ingredient_names.find("pepper") is None
+
+
+def test_recipes(reader, pairs):
+    for recipe, (key, parsed_recipe) in enumerate(pairs):
+        assert reader.recipe(recipe) == parsed_recipe
+        assert reader.recipe(key) == parsed_recipe
+    cookware = reader.recipe("cake", sections=["cookware"])
+    assert cookware == {"cookware": ["bowl", "oven"]}
+    assert reader.ingredients("dough") == [
+        ("flour", "kg"),
+        ("salt", None),
+        ("water", "ml"),
+    ]
+    with pytest.raises(IndexError):
+        reader.recipe(5)
+    with pytest.raises(KeyError):
+        reader.recipe("soup")
+
+
+def test_queries_match_index(reader, pairs):
+    index = RecipeIndex.from_pairs(pairs)
+    for recipe in range(5):
+        assert reader.names(recipe) == index.names(recipe)
+    pantries = [[], ["flour", "water"], ["FLOUR", "salt", "water", "pepper"], ["salt"]]
+    for pantry in pantries:
+        assert reader.superset(pantry) == index.superset(pantry)
+        for missing in range(3):
+            assert reader.subset(pantry, missing) == index.subset(pantry, missing)
+            assert reader.subset(pantry, missing, ["bowl"]) == index.subset(
+                pantry, missing, ["bowl"]
+            )
+    assert reader.superset(["flour"], cookware=["oven"]) == [1]
+    assert reader.missing("salad", ["salt"]) == ["olive oil", "tomatoes"]
+
+
+def test_dense_postings(tmp_path):
+    path = tmp_path / "salt.ckix"
+    with open(path, "wb") as index_file:
+        writer = IndexWriter(index_file)
+        for recipe in range(1000):
+            names = ["salt"] if recipe % 3 else ["salt", "pepper"]
+            ingredients = [
+                {"name": name, "quantity": "", "unit": None} for name in names
+            ]
+            writer.add({"ingredients": ingredients})
+        writer.finish()
+    with IndexReader(path) as reader:
+        assert reader.keys[999] == "999"
+        assert len(reader.subset(["salt"])) == 666
+        assert reader.superset(["pepper"]) == list(range(0, 1000, 3))
+
+
+def test_posting_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(indexfile, "POSTING_CACHE", 4)
+    pairs = [
+        (str(recipe), {"cookware": [f"pan {recipe % 100}"]}) for recipe in range(1000)
+    ]
+    path = tmp_path / "pans.ckix"
+    write_index(path, pairs)
+    index = RecipeIndex.from_pairs(pairs)
+    with IndexReader(path) as reader:
+        for _ in range(2):
+            for size in range(100):
+                assert reader.superset(cookware=[f"pan {size}"]) == index.superset(
+                    cookware=[f"pan {size}"]
+                )
+                assert 0 < len(reader._bits) <= 4
+
+
+def test_empty(tmp_path):
+    path = tmp_path / "empty.ckix"
+    assert write_index(path, []) == 0
+    with IndexReader(path) as reader:
+        assert len(reader) == 0
+        assert reader.subset(["salt"]) == []
+        assert reader.superset() == []
+
+
+def test_empty_strings(tmp_path):
+    # A record whose only string is "" must not read as one without strings.
+    recipe = CooklangParser().parse_recipe("[- -]")
+    path = tmp_path / "comment.ckix"
+    assert write_index(path, [("comment", recipe), ("cookware", {"cookware": [""]})])
+    with IndexReader(path) as reader:
+        assert reader.recipe("comment") == recipe
+        assert reader.recipe("cookware") == {"cookware": [""]}
+        assert reader.subset([]) == [0, 1]
+
+
+def test_not_an_index(tmp_path):
+    path = tmp_path / "recipe.cook"
+    path.write_text(TEXTS["bread"] * 10)
+    with pytest.raises(ValueError):
+        IndexReader(path)
+
+
+def test_other_version(tmp_path):
+    path = tmp_path / "old.ckix"
+    assert write_index(path, []) == 0
+    data = bytearray(path.read_bytes())
+    data[len(MAGIC)] = VERSION - 1
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        IndexReader(path)
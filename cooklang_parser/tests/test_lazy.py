@@ -0,0 +1,76 @@
+import json
+import pickle
+
+import pytest
+from cooklang_parser.lazy import ParsedRecipe
+from cooklang_parser.parser import CooklangParser
+from cooklang_parser.profiling import ParseProfile
+
+TEXT = """
+-- This is a hearty breakfast recipe
+>> source: https://example.com
+[- >> hidden: yes -]
+Place @bacon strips{500%g} on a #baking sheet{} and glaze with @maple syrup{1/2%tbsp}.
+Boil @eggs{2} for ~eggs{3%minutes}. ![Breakfast](images/breakfast.jpg)
+"""
+
+
+@pytest.fixture(params=["extractors", "lexer"])
+def parser(request):
+    return CooklangParser(engine=request.param)
+
+
+def test_equals_parse_recipe(parser):
+    recipe = parser.parse_lazy(TEXT)
+    assert isinstance(recipe, ParsedRecipe)
+    assert recipe == parser.parse_recipe(TEXT)
+    assert dict(recipe) == parser.parse_recipe(TEXT)
+    assert len(recipe) == len(parser.parse_recipe(TEXT))
+
+
+def test_missing_sections_behave_like_dict(parser):
+    recipe = parser.parse_lazy(TEXT)
+    assert "conditions" not in recipe
+    assert recipe.get("conditions") is None
+    with pytest.raises(KeyError):
+        recipe["conditions"]
+    with pytest.raises(KeyError):
+        recipe["title"]
+    assert recipe.conditions == []
+    assert parser.parse_lazy("").to_dict() == {}
+
+
+def test_attributes(parser):
+    recipe = parser.parse_lazy(TEXT)
+    assert recipe.metadata == {"source": "https://example.com"}
+    assert recipe.cookware == ["baking sheet"]
+    with pytest.raises(AttributeError):
+        recipe.title
+
+
+def test_sections_computed_on_demand():
+    profile = ParseProfile()
+    recipe = CooklangParser(profiler=profile).parse_lazy(TEXT)
+    assert recipe["images"] == [
+        {"description": "Breakfast", "path": "images/breakfast.jpg"}
+    ]
+    recipe.get("images")
+    assert set(profile.stages) == {"remove_comments", "extract_images"}
+    assert profile.stages["extract_images"].calls == 1
+    recipe.get("cookware")
+    assert profile.stages["remove_comments"].calls == 1
+
+
+def test_metadata_without_block_comments_uses_raw_text():
+    profile = ParseProfile()
+    parser = CooklangParser(profiler=profile)
+    recipe = parser.parse_lazy(">> title: Tea\n-- note\nSteep @tea{1}.")
+    assert recipe["metadata"] == {"title": "Tea"}
+    assert set(profile.stages) == {"extract_metadata"}
+
+
+def test_to_dict_and_pickle(parser):
+    recipe = parser.parse_lazy(TEXT)
+    recipe.get("steps")
+    assert json.dumps(recipe.to_dict()) == json.dumps(parser.parse_recipe(TEXT))
+    assert pickle.loads(pickle.dumps(recipe)) == recipe
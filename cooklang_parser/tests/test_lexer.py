@@ -0,0 +1,127 @@
+import pytest
+from cooklang_parser.parser import CooklangParser
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser(engine="lexer")
+
+
+RECIPES = [
+    "",
+    "Let it cool.",
+    ">> title: Recipe Title\n>> Servings: 4",
+    "Mix @flour{200g} with water and heat in a #pan for ~{10%minutes}.\nLet it cool.",
+    """
+    -- This is a hearty breakfast recipe
+    >> source: https://example.com
+    >> time required: 1.5 hours
+    Poke holes in @potatoes{2} with a fork.
+    Place @bacon strips{500%g} on a baking sheet and glaze with @maple syrup{1/2%tbsp}.
+    Slowly add @milk{1%litre} [- TODO litres -], keep mixing until smooth.
+    Place the potatoes into a #pot and bring to a boil.
+    If @Egg{} is Cooked, skip the next step.
+    Boil @eggs{2} for ~eggs{3%minutes}.
+    """,
+    """
+    Use @butter{50g} (or @margarine{50g}) for frying in a #large pan{}.
+    Add a +pinch{} of love. ![A delicious dish](images/dish.jpg)
+    If @butter{} is melted, add @flour{}
+    """,
+    "If @egg{} is cooked, proceed. If @milk{} is boiled, add to the mixture",
+    "Mix @a{1} [- a block\nspanning lines -] and @b{2}.\nDone.",
+    "Mix [- never closed\n@x{1}\n",
+    "Mix [- never closed\n-- a comment\nmore @b{2}\n",
+    "-- first\n[- second -]\n-- third\nStep with #pan{}",
+]
+
+
+@pytest.mark.parametrize("text", RECIPES)
+def test_lexer_matches_extractors(parser, text):
+    assert parser.parse_recipe(text) == CooklangParser().parse_recipe(text)
+
+
+def test_tokenize_stream(parser):
+    tokens = list(parser.tokenize(">> title: Soup\nAdd @salt{1%g} to #pot."))
+    assert [(token.type, token.line) for token in tokens] == [
+        ("metadata", 0),
+        ("text", 1),
+        ("ingredient", 1),
+        ("text", 1),
+        ("cookware", 1),
+        ("text", 1),
+    ]
+    assert tokens[0].value == ("title", "Soup")
+    assert tokens[2].value == {
+        "type": "ingredient",
+        "name": "salt",
+        "quantity": "1",
+        "unit": "g",
+    }
+    assert tokens[2].text == "@salt{1%g}"
+
+
+def test_tokenize_comments(parser):
+    tokens = list(parser.tokenize("-- note\nBoil [- quietly -] the water."))
+    assert [(token.type, token.value) for token in tokens] == [
+        ("comment", "note"),
+        ("block_comment", "quietly"),
+        ("text", "Boil  the water."),
+    ]
+
+
+def test_tokenize_multiline_block_comment(parser):
+    tokens = list(parser.tokenize("Stir [- slowly\nand gently -] well."))
+    assert [(token.type, token.value, token.line) for token in tokens] == [
+        ("block_comment", "slowly\nand gently", 0),
+        ("text", "Stir  well.", 1),
+    ]
+
+
+def test_condition_without_period_only_at_end(parser):
+    text = "If @egg{} is cooked, serve\nPlate it."
+    assert "conditions" not in parser.parse_recipe(text)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        CooklangParser(engine="fast")
+
+
+def test_token_spans(parser):
+    text = ">> title: Soup\n  Add @salt{1%g} to #pot.\n-- done"
+    for token in parser.tokenize(text):
+        assert text[token.start : token.end] == token.text
+    tokens = list(parser.tokenize(text))
+    assert [(token.type, token.start, token.end) for token in tokens] == [
+        ("metadata", 0, 14),
+        ("text", 17, 21),
+        ("ingredient", 21, 31),
+        ("text", 31, 35),
+        ("cookware", 35, 39),
+        ("text", 39, 40),
+        ("comment", 41, 48),
+    ]
+
+
+def test_token_spans_around_block_comments(parser):
+    text = "Mix [- a -]@a{} [- open\nstill -] with #pot{}.\n[- x -] Add +b{}."
+    spans = {
+        token.type: text[token.start : token.end] for token in parser.tokenize(text)
+    }
+    assert spans["ingredient"] == "@a{}"
+    assert spans["cookware"] == "#pot{}"
+    assert spans["note"] == "+b{}"
+    block_comments = [
+        text[token.start : token.end]
+        for token in parser.tokenize(text)
+        if token.type == "block_comment"
+    ]
+    assert block_comments == ["[- a -]", "[- open\nstill -]", "[- x -]"]
+
+
+def test_token_spans_in_unterminated_block_comment(parser):
+    text = "Stir.\nMix [- never closed\n@x{1}\n"
+    (token,) = [token for token in parser.tokenize(text) if token.type == "ingredient"]
+    assert text[token.start : token.end] == "@x{1}"
+    assert token.line == 2
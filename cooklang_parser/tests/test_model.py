@@ -0,0 +1,60 @@
+import pytest
+from cooklang_parser.model import Cookware, Ingredient, Recipe, Text, Timer
+from cooklang_parser.parser import CooklangParser
+
+TEXT = """
+-- Breakfast
+>> source: https://example.com
+Place @bacon strips{500%g} on a #baking sheet{} and glaze with @maple syrup{1/2%tbsp}.
+If @eggs{} is cooked, add +love{}. ![Plate](images/plate.jpg)
+Use @butter{50g} (or @margarine{50g}) for ~frying{3%minutes}.
+"""
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser()
+
+
+def test_to_dict_round_trip(parser):
+    recipe = parser.parse_model(TEXT)
+    assert recipe.to_dict() == parser.parse_recipe(TEXT)
+
+
+def test_empty_recipe(parser):
+    assert parser.parse_model("").to_dict() == {}
+
+
+def test_components(parser):
+    recipe = parser.parse_model(TEXT)
+    assert recipe.steps[0] == Text("Place")
+    assert recipe.steps[1] == Ingredient("bacon strips", "500", "g")
+    assert recipe.steps[3] == Cookware("baking sheet")
+    assert Timer("frying", "3%minutes") in recipe.steps
+    assert recipe.cookware == ("baking sheet",)
+    assert recipe.metadata == {"source": "https://example.com"}
+
+
+def test_identical_ingredients_are_shared(parser):
+    recipe = parser.parse_model(TEXT)
+    butter = [item for item in recipe.ingredients if item.name == "butter"][0]
+    assert recipe.substitutions[0].primary is butter
+    assert butter in recipe.steps
+
+
+def test_slots(parser):
+    recipe = parser.parse_model(TEXT)
+    with pytest.raises(AttributeError):
+        recipe.extra = True
+    assert not hasattr(recipe.ingredients[0], "__dict__")
+
+
+def test_from_dict_unnamed_timer():
+    recipe = Recipe.from_dict({"steps": [{"type": "timer", "duration": "5%minutes"}]})
+    assert recipe.to_dict() == {"steps": [{"type": "timer", "duration": "5%minutes"}]}
+
+
+def test_hash(parser):
+    recipe = parser.parse_model(TEXT)
+    assert hash(recipe) == hash(parser.parse_model(TEXT))
+    assert len({recipe, parser.parse_model(TEXT), parser.parse_model("")}) == 2
@@ -0,0 +1,118 @@
+import pickle
+
+import pytest
+from cooklang_parser.parser import CooklangParser
+from cooklang_parser.profiling import ParseProfile
+
+TEXT = """
+-- Breakfast
+>> source: https://example.com
+Place @bacon strips{500%g} on a #baking sheet{} for ~{10%minutes}.
+"""
+
+EXTRACTOR_STAGES = {
+    "parse_recipe",
+    "extract_comments",
+    "remove_comments",
+    "extract_metadata",
+    "extract_ingredients",
+    "extract_cookware",
+    "extract_steps",
+    "extract_timers",
+    "extract_conditions",
+    "extract_ingredient_substitutions",
+    "extract_images",
+}
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser(profiler=ParseProfile())
+
+
+def test_disabled_by_default():
+    assert CooklangParser().profiler is None
+
+
+def test_output_unchanged(parser):
+    assert parser.parse_recipe(TEXT) == CooklangParser().parse_recipe(TEXT)
+
+
+def test_records_every_extractor(parser):
+    parser.parse_recipe(TEXT)
+    parser.parse_recipe(TEXT)
+    stages = parser.profiler.stages
+    assert set(stages) == EXTRACTOR_STAGES
+    assert all(stats.calls == 2 for stats in stages.values())
+    assert stages["parse_recipe"].input_bytes == 2 * len(TEXT.encode("utf-8"))
+    assert stages["parse_recipe"].output_size == 2 * 6
+    assert stages["extract_ingredients"].output_size == 2
+    assert stages["extract_comments"].output_size == 2
+    assert stages["parse_recipe"].seconds >= stages["extract_steps"].seconds > 0
+
+
+def test_lexer_stage():
+    parser = CooklangParser(engine="lexer", profiler=ParseProfile())
+    parser.parse_recipe(TEXT)
+    assert set(parser.profiler.stages) == {"parse_recipe", "lexer"}
+
+
+def test_cache_hits_skip_extractors():
+    parser = CooklangParser(cache=8, profiler=ParseProfile())
+    parser.parse_recipe(TEXT)
+    parser.parse_recipe(TEXT)
+    stages = parser.profiler.stages
+    assert stages["parse_recipe"].calls == 2
+    assert stages["extract_steps"].calls == 1
+
+
+def test_keep_recipes():
+    parser = CooklangParser(profiler=ParseProfile(keep_recipes=True))
+    parser.parse_recipe(TEXT)
+    parser.parse_recipe("Boil @water{1%l}.")
+    recipes = parser.profiler.recipes
+    assert len(recipes) == 2
+    assert recipes[1]["input_bytes"] == len("Boil @water{1%l}.")
+    assert set(recipes[0]["stages"]) == EXTRACTOR_STAGES - {"parse_recipe"}
+
+
+def test_custom_hook():
+    calls = []
+
+    class Hook:
+        def record(self, stage, seconds, input_bytes, output_size):
+            calls.append((stage, output_size))
+
+    CooklangParser(profiler=Hook()).parse_recipe("Boil @water{1%l}.")
+    assert calls[-1] == ("parse_recipe", 2)
+    assert ("extract_ingredients", 1) in calls
+
+
+def test_merge_and_as_dict(parser):
+    parser.parse_recipe(TEXT)
+    other = ParseProfile().merge(parser.profiler).merge(parser.profiler)
+    summary = other.as_dict()
+    assert summary["extract_steps"]["calls"] == 2
+    assert set(summary["extract_steps"]) == {
+        "calls",
+        "seconds",
+        "max_seconds",
+        "input_bytes",
+        "output_size",
+    }
+    other.clear()
+    assert other.as_dict() == {}
+
+
+def test_pickle(parser):
+    parser.parse_recipe(TEXT)
+    copy = pickle.loads(pickle.dumps(parser))
+    assert copy.profiler.as_dict() == parser.profiler.as_dict()
+
+
+def test_parse_many_aggregates_workers(parser):
+    texts = [TEXT, "Boil @water{1%l}."] * 5
+    results = list(parser.parse_many(texts, workers=2, chunksize=3))
+    assert all(result.error is None for result in results)
+    assert parser.profiler.stages["parse_recipe"].calls == len(texts)
+    assert parser.profiler.stages["extract_steps"].calls == len(texts)
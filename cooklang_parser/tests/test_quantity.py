@@ -0,0 +1,144 @@
+import time
+from fractions import Fraction
+
+import pytest
+from cooklang_parser.parser import CooklangParser
+from cooklang_parser.quantity import (
+    Quantity,
+    canonical_unit,
+    convert,
+    normalize,
+    parse_quantity,
+)
+
+TEXT = """
+Mix @flour{1 1/2%cups} with @sugar{200%g} and @eggs{2-3}.
+Add @salt{} and @milk{½%l}, then @butter{50g} (or @margarine{60g}).
+Season to taste with @pepper{some}.
+"""
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser(normalize_quantities=True)
+
+
+@pytest.mark.parametrize(
+    "details, expected",
+    [
+        ("2", Quantity(Fraction(2), Fraction(2), None)),
+        ("1/2%tbsp", Quantity(Fraction(1, 2), Fraction(1, 2), "tbsp")),
+        ("1 1/2%cups", Quantity(Fraction(3, 2), Fraction(3, 2), "cup")),
+        ("0,5%l", Quantity(Fraction(1, 2), Fraction(1, 2), "l")),
+        ("1.25 kg", Quantity(Fraction(5, 4), Fraction(5, 4), "kg")),
+        ("½%cup", Quantity(Fraction(1, 2), Fraction(1, 2), "cup")),
+        ("1½%cup", Quantity(Fraction(3, 2), Fraction(3, 2), "cup")),
+        ("2-3%tbsp", Quantity(Fraction(2), Fraction(3), "tbsp")),
+        ("2 to 3 tbsp", Quantity(Fraction(2), Fraction(3), "tbsp")),
+        ("3%pinches", Quantity(Fraction(3), Fraction(3), None)),
+    ],
+)
+def test_parse_quantity(details, expected):
+    assert parse_quantity(details) == expected
+
+
+@pytest.mark.parametrize("details", ["", "some", "a handful", "1/0%g"])
+def test_parse_quantity_not_numeric(details):
+    assert parse_quantity(details) is None
+
+
+@pytest.mark.parametrize(
+    "details",
+    [
+        "1" + " " * 2000 + "x!",
+        "1" + " " * 2000 + "%" + " " * 2000 + "x!",
+        "1 " * 2000 + "cup",
+        "1" + " -" * 2000,
+    ],
+)
+def test_parse_quantity_hostile_input(details):
+    # Runs of spaces used to be shared out between several \s* in every
+    # possible way before the match failed, which took seconds.
+    start = time.perf_counter()
+    assert parse_quantity.__wrapped__(details) is None
+    assert time.perf_counter() - start < 0.5
+
+
+def test_canonical_unit():
+    assert canonical_unit("Grams") == canonical_unit("gr") == "g"
+    assert canonical_unit("tbsp.") == "tbsp"
+    assert canonical_unit("pinch") is None
+
+
+def test_convert():
+    assert convert(1, "kg", "g") == 1000
+    assert convert(3, "tsp", "tbsp") == 1
+    assert convert(16, "oz", "lb") == 1
+    assert convert("1/2", "cup", "ml") == Fraction(473176473, 4000000)
+
+
+def test_convert_across_kinds_needs_density():
+    with pytest.raises(ValueError):
+        convert(1, "cup", "g")
+    assert convert(250, "ml", "g", density=1) == 250
+    assert convert(100, "g", "ml", density="0.5") == 200
+
+
+def test_convert_unknown_unit():
+    with pytest.raises(ValueError):
+        convert(1, "pinch", "g")
+
+
+def test_normalize():
+    assert normalize(parse_quantity("2%kg")) == Quantity(2000, 2000, "g")
+    assert normalize(parse_quantity("1-2%l")) == Quantity(1000, 2000, "ml")
+    assert normalize(parse_quantity("2")) is None
+    assert normalize(None) is None
+
+
+def test_default_output_unchanged():
+    recipe = CooklangParser().parse_recipe(TEXT)
+    assert all(set(item) == {"name", "quantity", "unit"} for item in recipe["ingredients"])
+
+
+def test_ingredients_normalized(parser):
+    ingredients = {item["name"]: item for item in parser.parse_recipe(TEXT)["ingredients"]}
+    assert ingredients["flour"]["amount"] == Quantity(Fraction(3, 2), Fraction(3, 2), "cup")
+    assert ingredients["sugar"]["base_amount"] == Quantity(200, 200, "g")
+    assert ingredients["eggs"]["amount"] == Quantity(2, 3, None)
+    assert ingredients["eggs"]["base_amount"] is None
+    assert ingredients["salt"]["amount"] is None
+    assert ingredients["pepper"]["amount"] is None
+
+
+def test_steps_and_substitutions_normalized(parser):
+    recipe = parser.parse_recipe(TEXT)
+    milk = next(step for step in recipe["steps"] if step.get("name") == "milk")
+    assert milk["base_amount"] == Quantity(500, 500, "ml")
+    substitution = recipe["substitutions"][0]
+    assert substitution["primary"]["base_amount"] == Quantity(50, 50, "g")
+    assert substitution["substitute"]["amount"] == Quantity(60, 60, "g")
+
+
+def test_engines_agree(parser):
+    lexer = CooklangParser(engine="lexer", normalize_quantities=True)
+    assert lexer.parse_recipe(TEXT) == parser.parse_recipe(TEXT)
+
+
+def test_incremental(parser):
+    lexer = CooklangParser(engine="lexer", normalize_quantities=True)
+    document = lexer.parse_incremental(TEXT)
+    offset = TEXT.index("200")
+    recipe = document.edit(offset, 3, "300")
+    assert recipe == lexer.parse_recipe(document.text)
+    sugar = next(item for item in recipe["ingredients"] if item["name"] == "sugar")
+    assert sugar["base_amount"] == Quantity(300, 300, "g")
+
+
+def test_no_models(parser):
+    with pytest.raises(ValueError):
+        parser.parse_model(TEXT)
+
+
+def test_options_include_normalization(parser):
+    assert parser.options() != CooklangParser().options()
@@ -0,0 +1,84 @@
+from itertools import combinations
+
+import pytest
+from cooklang_parser.parser import SECTION_NAMES, CooklangParser
+from cooklang_parser.profiling import ParseProfile
+
+TEXTS = [
+    """
+-- This is a hearty breakfast recipe
+>> source: https://example.com
+>> servings: 4
+Place @bacon strips{500%g} on a #baking sheet{} and glaze with @maple syrup{1/2%tbsp}.
+Slowly add @milk{1%litre} [- TODO check units -], keep mixing until smooth.
+If @eggs{} is cooked, skip the next step.
+Use @butter{50g} (or @margarine{50g}) for frying.
+Boil @eggs{2} for ~eggs{3%minutes}. ![Breakfast](images/breakfast.jpg)
+""",
+    """>> title: Tea
+[- >> hidden: yes
+-] >> after: comment
+Steep @tea bag{1} in a #cup for ~{3%minutes}.
+-- >> commented: out
+""",
+    "Boil @water{200ml} in a #kettle.",
+    "",
+]
+
+
+@pytest.fixture(params=["extractors", "lexer"])
+def parser(request):
+    return CooklangParser(engine=request.param)
+
+
+def expected(parser, text, sections):
+    full = parser.parse_recipe(text)
+    return {section: value for section, value in full.items() if section in sections}
+
+
+@pytest.mark.parametrize("size", [1, 2])
+def test_sections_match_full_parse(parser, size):
+    for text in TEXTS:
+        for sections in combinations(sorted(SECTION_NAMES), size):
+            assert parser.parse_recipe(text, sections) == expected(parser, text, sections)
+
+
+def test_all_sections(parser):
+    for text in TEXTS:
+        assert parser.parse_recipe(text, SECTION_NAMES) == parser.parse_recipe(text)
+
+
+def test_single_section_name(parser):
+    assert parser.parse_recipe(TEXTS[1], "metadata") == {
+        "metadata": {"title": "Tea", "after": "comment"}
+    }
+
+
+def test_unknown_section(parser):
+    with pytest.raises(ValueError):
+        parser.parse_recipe(TEXTS[0], ["metadata", "title"])
+
+
+def test_metadata_skips_remove_comments():
+    parser = CooklangParser(profiler=ParseProfile())
+    parser.parse_recipe(TEXTS[2] + "\n-- note", ["metadata"])
+    assert set(parser.profiler.stages) == {"parse_recipe", "extract_metadata"}
+    parser.parse_recipe(TEXTS[1], ["metadata", "comments"])
+    assert "remove_comments" in parser.profiler.stages
+
+
+def test_comments_skip_remove_comments():
+    parser = CooklangParser(profiler=ParseProfile())
+    parser.parse_recipe(TEXTS[0], ["comments"])
+    assert set(parser.profiler.stages) == {"parse_recipe", "extract_comments"}
+
+
+def test_cache_keeps_sections_apart():
+    parser = CooklangParser(cache=8)
+    assert parser.parse_recipe(TEXTS[0], ["metadata"]) == expected(
+        parser, TEXTS[0], ["metadata"]
+    )
+    assert parser.parse_recipe(TEXTS[0]) == CooklangParser().parse_recipe(TEXTS[0])
+    assert parser.parse_recipe(TEXTS[0], ["ingredients"]) == expected(
+        parser, TEXTS[0], ["ingredients"]
+    )
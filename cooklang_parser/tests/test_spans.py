@@ -0,0 +1,67 @@
+import pytest
+from cooklang_parser.parser import CooklangParser
+from cooklang_parser.spans import LazyToken
+from cooklang_parser.tests.corpus import PROFILES, generate_corpus
+from cooklang_parser.tests.test_lexer import RECIPES
+
+
+@pytest.fixture(params=["lexer", "hardened"])
+def parser(request):
+    return CooklangParser(engine=request.param)
+
+
+def eager_and_lazy(parser, text):
+    fields = ("type", "line", "start", "end", "text", "value")
+    return [
+        [tuple(getattr(token, field) for field in fields) for token in tokens]
+        for tokens in (parser.tokenize(text), parser.tokenize(text, lazy=True))
+    ]
+
+
+@pytest.mark.parametrize("text", RECIPES)
+def test_lazy_tokens_match_eager(parser, text):
+    eager, lazy = eager_and_lazy(parser, text)
+    assert lazy == eager
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_lazy_tokens_match_eager_on_corpus(parser, profile):
+    for text in generate_corpus(profile, 5, seed=2):
+        eager, lazy = eager_and_lazy(parser, text)
+        assert lazy == eager
+
+
+def test_lazy_tokens_are_not_materialized(parser):
+    text = "Add @salt{1%g} to #pot. ![Soup](soup.jpg)\n>> servings: 2"
+    tokens = list(parser.tokenize(text, lazy=True))
+    assert all(isinstance(token, LazyToken) for token in tokens)
+    assert [token.type for token in tokens] == [
+        "text",
+        "ingredient",
+        "text",
+        "cookware",
+        "text",
+        "image",
+        "metadata",
+    ]
+    ingredient = tokens[1]
+    assert ingredient._value is None
+    assert ingredient.value["unit"] == "g"
+    assert ingredient.value is ingredient.value
+    assert text[ingredient.start : ingredient.end] == ingredient.text
+
+
+def test_hash_without_cookware_is_text(parser):
+    (token,) = [
+        token for token in parser.tokenize("Use #- {}", lazy=True) if token.start == 4
+    ]
+    assert token.type == "text"
+    assert token.value == {"type": "text", "value": "#- {}"}
+
+
+def test_lazy_hardened_malformed_value():
+    parser = CooklangParser(engine="hardened")
+    tokens = list(parser.tokenize("If @a{} is b, @!.", lazy=True))
+    (condition,) = [token for token in tokens if token.type == "condition"]
+    with pytest.raises(ValueError):
+        condition.value
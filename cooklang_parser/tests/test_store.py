@@ -0,0 +1,75 @@
+import os
+
+import pytest
+from cooklang_parser import store
+from cooklang_parser.parser import CooklangParser
+from cooklang_parser.store import DiskCache
+
+
+@pytest.fixture
+def parser():
+    return CooklangParser()
+
+
+@pytest.fixture
+def recipe_tree(tmp_path):
+    root = tmp_path / "recipes"
+    root.mkdir()
+    (root / "tea.cook").write_text("Steep @tea bag{1} for ~{3%minutes}.")
+    (root / "soup.cook").write_text("Simmer @tomatoes{6} in a #pot.")
+    return root
+
+
+def test_second_run_hits_cache(parser, recipe_tree, tmp_path):
+    database = tmp_path / "cache.sqlite"
+    with DiskCache(database) as cache:
+        first = dict(cache.parse_directory(parser, recipe_tree))
+        assert (cache.hits, cache.misses) == (0, 2)
+    with DiskCache(database) as cache:
+        second = dict(cache.parse_directory(parser, recipe_tree))
+        assert (cache.hits, cache.misses) == (2, 0)
+    assert first == second
+    assert second[os.path.join(recipe_tree, "soup.cook")] == parser.parse_recipe(
+        "Simmer @tomatoes{6} in a #pot."
+    )
+
+
+def test_changed_file_is_reparsed(parser, recipe_tree, tmp_path):
+    path = recipe_tree / "tea.cook"
+    with DiskCache(tmp_path / "cache.sqlite") as cache:
+        cache.parse_file(parser, path)
+        path.write_text("Steep @green tea{2} for ~{2%minutes}.")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        recipe = cache.parse_file(parser, path)
+        assert recipe["ingredients"][0]["name"] == "green tea"
+        assert cache.misses == 2
+
+
+def test_touched_file_uses_content_hash(parser, recipe_tree, tmp_path):
+    path = recipe_tree / "tea.cook"
+    with DiskCache(tmp_path / "cache.sqlite") as cache:
+        cache.parse_file(parser, path)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache.parse_file(parser, path)
+        cache.parse_file(parser, path)
+        assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_version_change_invalidates(parser, recipe_tree, tmp_path, monkeypatch):
+    database = tmp_path / "cache.sqlite"
+    with DiskCache(database) as cache:
+        cache.parse_file(parser, recipe_tree / "tea.cook")
+        cache.parse_file(CooklangParser(engine="lexer"), recipe_tree / "tea.cook")
+        assert cache.misses == 2
+    monkeypatch.setattr(store, "PARSER_VERSION", "next")
+    with DiskCache(database) as cache:
+        cache.parse_file(parser, recipe_tree / "tea.cook")
+        assert cache.misses == 1
+
+
+def test_prune(parser, recipe_tree, tmp_path):
+    with DiskCache(tmp_path / "cache.sqlite") as cache:
+        list(cache.parse_directory(parser, recipe_tree))
+        assert cache.prune([os.path.join(recipe_tree, "tea.cook")]) == 1
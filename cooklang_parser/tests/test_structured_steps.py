@@ -0,0 +1,79 @@
+import pytest
+from cooklang_parser.parser import CooklangParser
+
+TEXT = """>> servings: 2
+Crack @eggs{3} into a #bowl.
+Whisk with @milk{100%ml}.
+
+-- let it rest
+Heat @butter{10g} in a #pan.
+
+[- a note
+spanning lines -] Cook for ~{3%minutes} [- and
+this -] then serve.
+>> time: 10 minutes
+Garnish."""
+
+
+@pytest.fixture(params=["extractors", "lexer", "hardened"])
+def parser(request):
+    return CooklangParser(engine=request.param, structured_steps=True)
+
+
+def test_paragraphs(parser):
+    steps = parser.parse_recipe(TEXT)["steps"]
+    assert len(steps) == 4
+    first, second, third, fourth = steps
+    assert [component["type"] for component in first["components"]] == [
+        "text",
+        "ingredient",
+        "text",
+        "cookware",
+        "text",
+        "text",
+        "ingredient",
+        "text",
+    ]
+    assert first["ingredients"] == [1, 6]
+    assert first["cookware"] == [3]
+    assert first["timers"] == []
+    assert second["components"][1]["name"] == "butter"
+    assert third["timers"] == [1]
+    assert third["components"][1]["duration"] == "3%minutes"
+    assert fourth["components"] == [{"type": "text", "value": "Garnish."}]
+
+
+def test_flattened_steps_match_flat_output(parser):
+    flat = CooklangParser(engine=parser.engine).parse_recipe(TEXT)["steps"]
+    steps = parser.parse_recipe(TEXT)["steps"]
+    assert [component for step in steps for component in step["components"]] == flat
+
+
+def test_other_sections_unchanged(parser):
+    recipe = parser.parse_recipe(TEXT)
+    flat = CooklangParser(engine=parser.engine).parse_recipe(TEXT)
+    del recipe["steps"], flat["steps"]
+    assert recipe == flat
+
+
+def test_sections_and_lazy(parser):
+    steps = parser.parse_recipe(TEXT)["steps"]
+    assert parser.parse_recipe(TEXT, "steps") == {"steps": steps}
+    assert parser.parse_lazy(TEXT)["steps"] == steps
+
+
+def test_no_steps(parser):
+    assert "steps" not in parser.parse_recipe(">> servings: 2\n\n-- nothing")
+
+
+def test_cache_options():
+    assert (
+        CooklangParser(structured_steps=True).options() != CooklangParser().options()
+    )
+
+
+def test_flat_steps_only(parser):
+    with pytest.raises(ValueError):
+        parser.parse_model(TEXT)
+    with pytest.raises(ValueError):
+        parser.parse_incremental(TEXT)
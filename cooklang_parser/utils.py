@@ -1,9 +1,8 @@
-import re
 from fractions import Fraction
+from .patterns import QUANTITY_UNIT
 
-
-def parse_quantity_unit(details):
-    possible_units = [
+POSSIBLE_UNITS = frozenset(
+    [
         "g",
         "gram",
         "grams",
@@ -36,13 +35,16 @@ def parse_quantity_unit(details):
         "litre",
         "litres",
     ]
+)
+
 
-    match = re.match(r"(\d+/\d+|\d+)?%?(\s*[a-zA-Z]+)?", details, re.IGNORECASE)
+def parse_quantity_unit(details):
+    match = QUANTITY_UNIT.match(details)
     if match:
         quantity, unit = match.groups()
         quantity = quantity.strip() if quantity else None
         unit = unit.strip() if unit else None
-        if unit and unit.lower() not in possible_units:
+        if unit and unit.lower() not in POSSIBLE_UNITS:
             unit = None
         if quantity:
             try:
@@ -51,3 +53,54 @@ def parse_quantity_unit(details):
                 pass
         return quantity, unit
     return details, None
+
+
+STEP_INDEXES = {"ingredient": "ingredients", "cookware": "cookware", "timer": "timers"}
+
+
+def group_steps(components, starts):
+    # Splits the flat list of step components into one step per paragraph,
+    # starts being the index of each paragraph's first component. Every
+    # step lists the positions of its ingredients, cookware and timers
+    # among its components.
+    steps = []
+    ends = starts[1:] + [len(components)]
+    for start, end in zip(starts, ends):
+        step = {
+            "components": components[start:end],
+            "ingredients": [],
+            "cookware": [],
+            "timers": [],
+        }
+        for index, component in enumerate(step["components"]):
+            key = STEP_INDEXES.get(component["type"])
+            if key is not None:
+                step[key].append(index)
+        steps.append(step)
+    return steps
+
+
+def timer_totals(steps):
+    # Sums the parsed durations of the timers among the steps, flat or
+    # grouped by paragraph. The total is the sum of the lower bounds of
+    # ranged durations and max_total the sum of their upper bounds; timers
+    # without a duration in seconds are skipped.
+    count = 0
+    total = max_total = longest = 0
+    for step in steps:
+        for component in step.get("components", (step,)):
+            seconds = component.get("seconds") if component["type"] == "timer" else None
+            if seconds is None:
+                continue
+            count += 1
+            total += seconds.value
+            max_total += seconds.maximum
+            longest = max(longest, seconds.maximum)
+    if not count:
+        return {}
+    return {
+        "timers": count,
+        "total_seconds": total,
+        "max_total_seconds": max_total,
+        "longest_seconds": longest,
+    }